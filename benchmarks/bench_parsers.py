@@ -0,0 +1,179 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selectolax.parser import HTMLParser
+from extractors.extractor import FlyerDataExtractor
+from parsers.main_page_parser import MainPageParser
+from parsers.detail_page_parser import DetailPageParser
+from benchmarks.synthetic import generate_detail_page, generate_main_page
+
+current_dir = os.path.dirname(__file__)
+DEFAULT_SIZES = [10, 100, 1000, 10000, 50000]
+
+
+def measure(function, repeats: int) -> dict:
+    """
+    Measures the wall-clock time and peak traced memory of a function.
+
+    The function is run `repeats` times for timing and once more under `tracemalloc`
+    for the memory peak, so tracing does not distort the timings.
+
+    Args:
+        function (Callable[[], Any]): The function to measure.
+        repeats (int): Number of timed runs.
+
+    Returns:
+        dict: Median, min and max run time in seconds and peak memory in bytes.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "max_s": max(timings),
+        "peak_memory_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes: list[int], repeats: int) -> list[dict]:
+    """
+    Benchmarks the parsers and the extractor on synthetic pages of every size.
+
+    Args:
+        sizes (list[int]): Numbers of sidebar links / brochure nodes per page.
+        repeats (int): Number of timed runs per benchmark.
+
+    Returns:
+        list[dict]: One result per benchmark and size, including items per second.
+    """
+    main_page_parser = MainPageParser("https://www.prospektmaschine.de/")
+    extractor = FlyerDataExtractor()
+    detail_page_parser = DetailPageParser("Kaufland", extractor)
+    results = []
+    for size in sizes:
+        main_page = generate_main_page(size)
+        detail_page = generate_detail_page(size)
+        grid = HTMLParser(detail_page).css_first(".letaky-grid")
+        brochures = grid.css(".brochure-thumb")
+        benchmarks = {
+            "MainPageParser.parse": lambda: main_page_parser.parse(main_page),
+            "DetailPageParser.parse": lambda: detail_page_parser.parse(detail_page),
+            "FlyerDataExtractor.extract": lambda: extractor.extract(brochures, "Kaufland"),
+            "FlyerDataExtractor.extract_grid": lambda: extractor.extract_grid(grid, "Kaufland"),
+        }
+        for name, function in benchmarks.items():
+            result = measure(function, repeats)
+            result.update({
+                "benchmark": name,
+                "size": size,
+                "page_bytes": len((main_page if name.startswith("MainPage") else detail_page).encode("utf-8")),
+                "items_per_s": size / result["median_s"] if result["median_s"] else None,
+            })
+            results.append(result)
+            print(
+                f"{name:<34} size={size:<6} median={result['median_s'] * 1000:9.2f} ms "
+                f"items/s={result['items_per_s']:12.0f} peak={result['peak_memory_bytes'] / 1024:10.1f} KiB"
+            )
+    return results
+
+
+def git_commit() -> str:
+    """
+    Retrieves the commit the benchmarks run on.
+
+    Returns:
+        str: The short commit hash, or "unknown" outside of a git checkout.
+    """
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=current_dir
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> bool:
+    """
+    Prints the change of every benchmark against a baseline results file.
+
+    Args:
+        results (list[dict]): The fresh benchmark results.
+        baseline_path (str): Path of a results file written by a previous run.
+        threshold (float): Relative slowdown (e.g. 0.1 for 10%) reported as a regression.
+
+    Returns:
+        bool: True if any benchmark regressed beyond the threshold.
+    """
+    with open(baseline_path, encoding="UTF-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_results = {(r["benchmark"], r["size"]): r for r in baseline["results"]}
+    regressed = False
+    print(f"\nComparison against {baseline.get('commit', '?')} ({baseline_path}):")
+    for result in results:
+        old = baseline_results.get((result["benchmark"], result["size"]))
+        if not old:
+            continue
+        change = result["median_s"] / old["median_s"] - 1 if old["median_s"] else 0.0
+        memory_change = result["peak_memory_bytes"] / old["peak_memory_bytes"] - 1 if old["peak_memory_bytes"] else 0.0
+        marker = "REGRESSION" if change > threshold else ""
+        regressed = regressed or bool(marker)
+        print(f"{result['benchmark']:<34} size={result['size']:<6} time {change:+7.1%} memory {memory_change:+7.1%} {marker}")
+    return regressed
+
+
+def main():
+    """
+    Runs the offline parser micro-benchmarks and writes a machine-readable results file.
+
+    Command-line arguments:
+        --sizes (list[int]): Page sizes in brochure nodes / sidebar links (default is 10 100 1000 10000 50000).
+        --repeats (int): Number of timed runs per benchmark (default is 5).
+        --output (str): Path of the JSON results file (default is 'benchmarks/results/<commit>.json').
+        --compare (str): Path of a previous results file to compare against (default is None).
+        --threshold (float): Relative slowdown reported as regression by --compare (default is 0.1).
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the flyer parsers on synthetic pages")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Page sizes in brochure nodes (default: 10 100 1000 10000 50000)")
+    parser.add_argument("--repeats", type=int, default=5, help="Number of timed runs per benchmark (default: 5)")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", type=str, default=None, help="Path of a previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as regression (default: 0.1)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = run_benchmarks(args.sizes, args.repeats)
+    output_path = args.output or os.path.join(current_dir, "results", f"{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="UTF-8") as output_file:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+            "results": results,
+        }, output_file, indent=2)
+    print(f"\nResults saved to {output_path}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_detail_page
+from benchmarks.bench_parsers import git_commit
+
+current_dir = os.path.dirname(__file__)
+repo_dir = os.path.dirname(os.path.abspath(current_dir))
+MAIN = os.path.join(repo_dir, "main.py")
+
+
+def scenarios(work_dir: str) -> dict[str, list[str]]:
+    """
+    Builds the command lines whose startup is measured.
+
+    Args:
+        work_dir (str): Temporary directory receiving the sample page and the outputs.
+
+    Returns:
+        dict[str, list[str]]: Interpreter arguments keyed by scenario name.
+    """
+    page_path = os.path.join(work_dir, "kaufland.html")
+    with open(page_path, "w", encoding="UTF-8") as page_file:
+        page_file.write(generate_detail_page(20, "Kaufland"))
+    return {
+        "interpreter": ["-c", "pass"],
+        "main --help": [MAIN, "--help"],
+        "main parse": [MAIN, "parse", page_path, "--output", os.path.join(work_dir, "output.json")],
+        "crawl stack import": ["-c", "import parsers.controllers.parser_controller"],
+    }
+
+
+def measure_startup(arguments: list[str], repeats: int) -> dict:
+    """
+    Measures the wall-clock time of a fresh interpreter running the given arguments.
+
+    Args:
+        arguments (list[str]): Interpreter arguments.
+        repeats (int): Number of timed runs.
+
+    Returns:
+        dict: Median, min and max run time in seconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *arguments], cwd=repo_dir, stdout=subprocess.DEVNULL, check=True)
+        timings.append(time.perf_counter() - start)
+    return {"median_s": statistics.median(timings), "min_s": min(timings), "max_s": max(timings)}
+
+
+def slowest_imports(arguments: list[str], top: int) -> list[dict]:
+    """
+    Lists the top-level imports with the highest cumulative import time (`python -X importtime`).
+
+    Args:
+        arguments (list[str]): Interpreter arguments.
+        top (int): Number of listed modules.
+
+    Returns:
+        list[dict]: Module name and cumulative import time in seconds, slowest first.
+    """
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        cwd=repo_dir, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True,
+    )
+    imports = []
+    for line in process.stderr.splitlines():
+        _, _, timing = line.partition("import time:")
+        fields = timing.split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        module = fields[2].rstrip()
+        if module.startswith("  "):
+            continue
+        imports.append({"module": module.strip(), "cumulative_s": int(fields[1]) / 1e6})
+    return sorted(imports, key=lambda entry: entry["cumulative_s"], reverse=True)[:top]
+
+
+def run_benchmarks(repeats: int, top: int) -> list[dict]:
+    """
+    Measures the startup time and the slowest imports of every scenario.
+
+    Args:
+        repeats (int): Number of timed runs per scenario.
+        top (int): Number of slowest imports listed per scenario.
+
+    Returns:
+        list[dict]: One result per scenario.
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for name, arguments in scenarios(work_dir).items():
+            result = measure_startup(arguments, repeats)
+            result.update({"benchmark": name, "slowest_imports": slowest_imports(arguments, top)})
+            results.append(result)
+            imports = ", ".join(f"{entry['module']} {entry['cumulative_s'] * 1000:.1f}" for entry in result["slowest_imports"])
+            print(f"{name:<20} median={result['median_s'] * 1000:8.1f} ms  slowest imports (ms): {imports}")
+    return results
+
+
+def compare(results: list[dict], baseline_path: str, threshold: float) -> bool:
+    """
+    Prints the change of every scenario against a baseline results file.
+
+    Args:
+        results (list[dict]): The fresh benchmark results.
+        baseline_path (str): Path of a results file written by a previous run.
+        threshold (float): Relative slowdown (e.g. 0.1 for 10%) reported as a regression.
+
+    Returns:
+        bool: True if any scenario regressed beyond the threshold.
+    """
+    with open(baseline_path, encoding="UTF-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    baseline_results = {r["benchmark"]: r for r in baseline["results"]}
+    regressed = False
+    print(f"\nComparison against {baseline.get('commit', '?')} ({baseline_path}):")
+    for result in results:
+        old = baseline_results.get(result["benchmark"])
+        if not old:
+            continue
+        change = result["median_s"] / old["median_s"] - 1 if old["median_s"] else 0.0
+        marker = "REGRESSION" if change > threshold else ""
+        regressed = regressed or bool(marker)
+        print(f"{result['benchmark']:<20} time {change:+7.1%} {marker}")
+    return regressed
+
+
+def main():
+    """
+    Measures the startup time of the command-line entry points and writes a machine-readable results file.
+
+    Command-line arguments:
+        --repeats (int): Number of timed runs per scenario (default is 10).
+        --top (int): Number of slowest imports listed per scenario (default is 5).
+        --output (str): Path of the JSON results file (default is 'benchmarks/results/startup-<commit>.json').
+        --compare (str): Path of a previous results file to compare against (default is None).
+        --threshold (float): Relative slowdown reported as regression by --compare (default is 0.2).
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the startup time of the command-line entry points")
+    parser.add_argument("--repeats", type=int, default=10, help="Number of timed runs per scenario (default: 10)")
+    parser.add_argument("--top", type=int, default=5, help="Number of slowest imports listed per scenario (default: 5)")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON results file (default: benchmarks/results/startup-<commit>.json)")
+    parser.add_argument("--compare", type=str, default=None, help="Path of a previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown reported as regression (default: 0.2)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    results = run_benchmarks(args.repeats, args.top)
+    output_path = args.output or os.path.join(current_dir, "results", f"startup-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="UTF-8") as output_file:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeats": args.repeats,
+            "results": results,
+        }, output_file, indent=2)
+    print(f"\nResults saved to {output_path}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
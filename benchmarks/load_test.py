@@ -0,0 +1,218 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import platform
+import resource
+import statistics
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fetchers.fetcher import Fetcher
+from fetchers.retry import RetryPolicy
+from benchmarks.mock_server import MockServer
+from benchmarks.bench_parsers import git_commit
+from parsers.controllers.parser_controller import ParserController
+
+current_dir = os.path.dirname(__file__)
+DEFAULT_CONCURRENCY = [1, 4, 16, 64]
+
+
+class TimedFetcher(Fetcher):
+    """
+    A Fetcher recording the latency of every HTTP response it receives.
+
+    The latency is measured by HTTPX event hooks from sending the request until the whole
+    body is read, so the wait for a concurrency slot or a rate-limit token is not included.
+
+    Attributes:
+        latencies (list[float]): Response latencies in seconds.
+        pages (int): Number of successfully fetched pages.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+        self.pages = 0
+
+    def get_client(self) -> httpx.AsyncClient:
+        client = super().get_client()
+        if self._on_request not in client.event_hooks["request"]:
+            client.event_hooks = {"request": [self._on_request], "response": [self._on_response]}
+        return client
+
+    async def _on_request(self, request: httpx.Request):
+        request.extensions["load_test_start"] = time.perf_counter()
+
+    async def _on_response(self, response: httpx.Response):
+        await response.aread()
+        self.latencies.append(time.perf_counter() - response.request.extensions["load_test_start"])
+
+    async def _request(self, client: httpx.AsyncClient, url: str, cached=None, region: str = None, attempt: int = 0) -> str:
+        html = await super()._request(client, url, cached, region, attempt)
+        self.pages += 1
+        return html
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """
+    Computes a percentile by the nearest-rank method.
+
+    Args:
+        values (list[float]): The samples.
+        fraction (float): The percentile as a fraction (e.g. 0.99).
+
+    Returns:
+        float: The percentile, 0 if there are no samples.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def _serve(server_options: dict, port_queue: multiprocessing.Queue):
+    """
+    Runs the mock server in a child process so it does not compete with the crawler's event loop.
+    """
+    server = MockServer(**server_options)
+
+    async def serve():
+        await server.start()
+        port_queue.put(server.port)
+        await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def run_once(base_url: str, categories: list[str], concurrency: int, max_retries: int, trace_memory: bool) -> dict:
+    """
+    Crawls the mock server once with `ParserController.process`.
+
+    Args:
+        base_url (str): Base URL of the mock server.
+        categories (list[str]): Categories to crawl.
+        concurrency (int): Maximum number of concurrent requests of the Fetcher.
+        max_retries (int): Maximum number of retries of failed requests.
+        trace_memory (bool): Measure the peak Python memory with tracemalloc (slows the run down).
+
+    Returns:
+        dict: Throughput, latency and memory figures of the run.
+    """
+    logger = logging.getLogger("load_test")
+    logger.setLevel(logging.ERROR)
+    fetcher = TimedFetcher(
+        logger=logger,
+        max_concurrency=concurrency,
+        retry_policy=RetryPolicy(max_retries=max_retries, backoff_base=0.01, backoff_max=0.1),
+    )
+    controller = ParserController(base_url, categories, logger=logger, fetcher=fetcher)
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        await controller.process()
+    finally:
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace_memory else None
+        if trace_memory:
+            tracemalloc.stop()
+        await controller.close()
+    flyers = sum(len(page_flyers) for page_flyers in controller.processed_data)
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "requests": len(fetcher.latencies),
+        "pages": fetcher.pages,
+        "flyers": flyers,
+        "pages_per_s": fetcher.pages / elapsed,
+        "flyers_per_s": flyers / elapsed,
+        "latency_p50_s": percentile(fetcher.latencies, 0.5),
+        "latency_p99_s": percentile(fetcher.latencies, 0.99),
+        "latency_mean_s": statistics.fmean(fetcher.latencies) if fetcher.latencies else 0.0,
+        "peak_memory_bytes": peak,
+        "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+    }
+
+
+def main():
+    """
+    Crawls a local mock prospektmaschine server at several concurrency levels and reports how the crawler scales.
+
+    Command-line arguments:
+        --concurrency (list[int]): Fetcher concurrency levels to run (default is 1 4 16 64).
+        --categories (int): Number of categories served and crawled (default is 3).
+        --shops (int): Total number of shops served (default is 100).
+        --shops_per_category (int): Number of shops listed by each category (default is 50).
+        --brochures (int): Number of brochures per shop page (default is 20).
+        --latency (float): Mean response latency of the server in seconds (default is 0.05).
+        --error_rate (float): Probability of a 503 response (default is 0).
+        --max_retries (int): Maximum number of retries of failed requests (default is 3).
+        --trace_memory: Measure peak Python memory with tracemalloc (slows the runs down).
+        --output (str): Path of the JSON results file (default is 'benchmarks/results/load-<commit>.json').
+    """
+    parser = argparse.ArgumentParser(description="Load-test the crawler against a local mock server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY, help="Fetcher concurrency levels (default: 1 4 16 64)")
+    parser.add_argument("--categories", type=int, default=3, help="Number of categories (default: 3)")
+    parser.add_argument("--shops", type=int, default=100, help="Total number of shops (default: 100)")
+    parser.add_argument("--shops_per_category", type=int, default=50, help="Shops listed by each category (default: 50)")
+    parser.add_argument("--brochures", type=int, default=20, help="Brochures per shop page (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean response latency in seconds (default: 0.05)")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Probability of a 503 response (default: 0)")
+    parser.add_argument("--max_retries", type=int, default=3, help="Maximum number of retries (default: 3)")
+    parser.add_argument("--trace_memory", action="store_true", help="Measure peak Python memory with tracemalloc")
+    parser.add_argument("--output", type=str, default=None, help="Path of the JSON results file (default: benchmarks/results/load-<commit>.json)")
+    args = parser.parse_args()
+
+    server_options = {
+        "categories": args.categories,
+        "shops": args.shops,
+        "shops_per_category": args.shops_per_category,
+        "brochures": args.brochures,
+        "latency": args.latency,
+        "error_rate": args.error_rate,
+    }
+    port_queue = multiprocessing.Queue()
+    server_process = multiprocessing.Process(target=_serve, args=(server_options, port_queue), daemon=True)
+    server_process.start()
+    try:
+        server = MockServer(port=port_queue.get(timeout=10))
+        categories = [category + "/" for category in MockServer(categories=args.categories).category_names()]
+        results = []
+        for concurrency in args.concurrency:
+            result = asyncio.run(run_once(server.get_base_url(), categories, concurrency, args.max_retries, args.trace_memory))
+            results.append(result)
+            peak = f"{result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB" if args.trace_memory else "-"
+            print(
+                f"concurrency={concurrency:<4} pages/s={result['pages_per_s']:8.1f} flyers/s={result['flyers_per_s']:9.1f} "
+                f"p50={result['latency_p50_s'] * 1000:7.1f} ms p99={result['latency_p99_s'] * 1000:7.1f} ms "
+                f"peak={peak} rss={result['max_rss_bytes'] / 2 ** 20:7.1f} MiB"
+            )
+    finally:
+        server_process.terminate()
+        server_process.join()
+
+    commit = git_commit()
+    output_path = args.output or os.path.join(current_dir, "results", f"load-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="UTF-8") as output_file:
+        json.dump({
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "server": server_options,
+            "results": results,
+        }, output_file, indent=2)
+    print(f"\nResults saved to {output_path}")
+
+
+if __name__ == "__main__":
+    main()
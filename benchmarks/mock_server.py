@@ -0,0 +1,210 @@
+import os
+import sys
+import random
+import asyncio
+import argparse
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import generate_detail_page
+
+
+class MockServer:
+    """
+    A local stand-in for prospektmaschine.de serving synthetic categories and shops.
+
+    The server speaks plain HTTP/1.1 with keep-alive on top of `asyncio.start_server`:
+
+    - `/` lists the categories in `#categories`,
+    - `/<category>/` lists the category's shops in `#sidebar`,
+    - `/<shop>/` is a shop detail page with `brochures` flyers in its `.letaky-grid`.
+
+    Every response is delayed by a random latency (exponentially distributed around
+    `latency` seconds, capped at ten times the mean) and fails with `503` with probability
+    `error_rate`. Shops are spread over categories so that every shop appears in
+    `shops_per_category * categories / shops` categories on average.
+
+    Attributes:
+        host (str): Interface the server listens on.
+        port (int): Port the server listens on (0 picks a free port, updated by `start`).
+        categories (int): Number of categories.
+        shops (int): Total number of shops.
+        shops_per_category (int): Number of shops listed by each category.
+        brochures (int): Number of brochures on each shop detail page.
+        latency (float): Mean response latency in seconds.
+        error_rate (float): Probability of a `503 Service Unavailable` response.
+        requests (int): Number of requests served so far.
+    """
+
+    def __init__(
+            self,
+            host: str = "127.0.0.1",
+            port: int = 0,
+            categories: int = 3,
+            shops: int = 100,
+            shops_per_category: int = 50,
+            brochures: int = 20,
+            latency: float = 0.05,
+            error_rate: float = 0.0,
+            seed: int = 0):
+        """
+        Initializes the MockServer.
+
+        Args:
+            host (str, optional): Interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): Port to listen on, 0 picks a free port. Defaults to 0.
+            categories (int, optional): Number of categories. Defaults to 3.
+            shops (int, optional): Total number of shops. Defaults to 100.
+            shops_per_category (int, optional): Number of shops listed by each category. Defaults to 50.
+            brochures (int, optional): Number of brochures per shop page (payload size). Defaults to 20.
+            latency (float, optional): Mean response latency in seconds. Defaults to 0.05.
+            error_rate (float, optional): Probability of a 503 response. Defaults to 0.
+            seed (int, optional): Seed of the random generator. Defaults to 0.
+        """
+        self.host = host
+        self.port = port
+        self.categories = categories
+        self.shops = shops
+        self.shops_per_category = min(shops_per_category, shops)
+        self.brochures = brochures
+        self.latency = latency
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._server = None
+        self._pages = {}
+
+    def get_base_url(self) -> str:
+        """
+        Retrieves the base URL of the running server.
+
+        Returns:
+            str: The base URL ending with "/".
+        """
+        return f"http://{self.host}:{self.port}/"
+
+    def category_names(self) -> list[str]:
+        return [f"category-{index}" for index in range(self.categories)]
+
+    async def start(self):
+        """
+        Starts listening. The chosen port is stored in `port`.
+        """
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        """
+        Stops the server and closes its connections.
+        """
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Serves the requests of a keep-alive connection until the client closes it.
+        """
+        try:
+            while True:
+                request = await reader.readuntil(b"\r\n\r\n")
+                request_line, *header_lines = request.decode("latin-1").split("\r\n")
+                headers = {
+                    name.strip().lower(): value.strip()
+                    for name, _, value in (line.partition(":") for line in header_lines if line)
+                }
+                _, path, _ = request_line.split(" ", 2)
+                status, body = self._route(unquote(path))
+                await asyncio.sleep(min(self._rng.expovariate(1 / self.latency), self.latency * 10) if self.latency else 0)
+                if self._rng.random() < self.error_rate:
+                    status, body = 503, b"Service Unavailable"
+                self.requests += 1
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: text/html; charset=utf-8\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _route(self, path: str) -> tuple[int, bytes]:
+        """
+        Builds (and caches) the page for a request path.
+
+        Returns:
+            tuple[int, bytes]: The status code and the response body.
+        """
+        if path not in self._pages:
+            self._pages[path] = self._render(path.strip("/"))
+        return self._pages[path]
+
+    def _render(self, slug: str) -> tuple[int, bytes]:
+        if not slug:
+            links = "".join(f'<li><a href="/{name}/">{name}</a></li>' for name in self.category_names())
+            return 200, f'<html><body><nav id="categories"><ul>{links}</ul></nav></body></html>'.encode("utf-8")
+        if slug.startswith("category-"):
+            index = int(slug.rsplit("-", 1)[1])
+            if index >= self.categories:
+                return 404, b"Not Found"
+            first_shop = index * self.shops // max(self.categories, 1)
+            shops = [(first_shop + offset) % self.shops for offset in range(self.shops_per_category)]
+            links = "".join(f'<li><a href="shop-{shop}/">Shop {shop}</a></li>' for shop in shops)
+            return 200, f'<html><body><aside id="sidebar"><ul>{links}</ul></aside></body></html>'.encode("utf-8")
+        if slug.startswith("shop-"):
+            shop = int(slug.rsplit("-", 1)[1])
+            return 200, generate_detail_page(self.brochures, f"Shop {shop}", seed=shop).encode("utf-8")
+        return 404, b"Not Found"
+
+
+def main():
+    """
+    Runs the mock prospektmaschine server until interrupted.
+
+    Command-line arguments:
+        --port (int): Port to listen on (default is 8080).
+        --categories (int): Number of categories (default is 3).
+        --shops (int): Total number of shops (default is 100).
+        --shops_per_category (int): Number of shops listed by each category (default is 50).
+        --brochures (int): Number of brochures per shop page (default is 20).
+        --latency (float): Mean response latency in seconds (default is 0.05).
+        --error_rate (float): Probability of a 503 response (default is 0).
+    """
+    parser = argparse.ArgumentParser(description="Serve synthetic prospektmaschine pages locally")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on (default: 8080)")
+    parser.add_argument("--categories", type=int, default=3, help="Number of categories (default: 3)")
+    parser.add_argument("--shops", type=int, default=100, help="Total number of shops (default: 100)")
+    parser.add_argument("--shops_per_category", type=int, default=50, help="Shops listed by each category (default: 50)")
+    parser.add_argument("--brochures", type=int, default=20, help="Brochures per shop page (default: 20)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mean response latency in seconds (default: 0.05)")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Probability of a 503 response (default: 0)")
+    args = parser.parse_args()
+    server = MockServer(
+        port=args.port,
+        categories=args.categories,
+        shops=args.shops,
+        shops_per_category=args.shops_per_category,
+        brochures=args.brochures,
+        latency=args.latency,
+        error_rate=args.error_rate,
+    )
+    print(f"Serving {args.categories} categories and {args.shops} shops on {server.get_base_url()}")
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
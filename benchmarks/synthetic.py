@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+
+SHOP_NAMES = ["Kaufland", "Lidl", "Aldi Nord", "Aldi Süd", "Netto", "Penny", "Rewe", "Edeka", "Globus", "Real"]
+
+
+def generate_main_page(shops: int, seed: int = 0) -> str:
+    """
+    Generates a synthetic prospektmaschine-style category main page.
+
+    Args:
+        shops (int): Number of shop links in the `#sidebar`.
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        str: The HTML of the main page.
+    """
+    rng = random.Random(seed)
+    links = "".join(
+        f'<li><a href="/{_shop_slug(index)}/">{_shop_name(index)}</a><span>{rng.randint(1, 30)}</span></li>'
+        for index in range(shops)
+    )
+    return (
+        "<!DOCTYPE html><html><head><title>Hypermärkte</title></head><body>"
+        '<header><nav id="categories"><ul><li><a href="/hypermarkte/">Hypermärkte</a></li>'
+        '<li><a href="/drogerie/">Drogerie</a></li></ul></nav></header>'
+        f'<aside id="sidebar"><ul>{links}</ul></aside>'
+        '<main><p>Aktuelle Prospekte</p></main>'
+        "</body></html>"
+    )
+
+
+def generate_detail_page(brochures: int, shop_name: str = "Kaufland", seed: int = 0) -> str:
+    """
+    Generates a synthetic prospektmaschine-style shop detail page.
+
+    Args:
+        brochures (int): Number of `.brochure-thumb` nodes in the `.letaky-grid`.
+        shop_name (str, optional): The shop name used in titles. Defaults to "Kaufland".
+        seed (int, optional): Seed of the random generator. Defaults to 0.
+
+    Returns:
+        str: The HTML of the detail page.
+    """
+    rng = random.Random(seed)
+    grid = "".join(_brochure(index, shop_name, rng) for index in range(brochures))
+    return (
+        "<!DOCTYPE html><html><head><title>" + shop_name + "</title></head><body>"
+        '<aside id="sidebar"><ul><li><a href="/kaufland/">Kaufland</a></li></ul></aside>'
+        f'<div class="page-header"><h1>{shop_name} Prospekte</h1></div>'
+        f'<div class="letaky-grid">{grid}</div>'
+        "<footer><p>prospektmaschine</p></footer>"
+        "</body></html>"
+    )
+
+
+def _brochure(index: int, shop_name: str, rng: random.Random) -> str:
+    start = date(2025, 1, 1) + timedelta(days=rng.randint(0, 364))
+    end = start + timedelta(days=rng.randint(3, 14))
+    image = f"https://img.prospektmaschine.de/{index % 997}/{rng.getrandbits(32):08x}.jpg@204x290.webp"
+    return (
+        '<div class="brochure-thumb col-xs-6 col-sm-3">'
+        f'<a href="/{_shop_slug(index)}/{index}/">'
+        f'<picture><source srcset="{image}" type="image/webp"><img src="{image}" data-src="{image}" alt="{shop_name}"></picture>'
+        "</a>"
+        '<div class="letak-description">'
+        f'<div class="grid-item-content"><strong>{shop_name} Prospekt {index}</strong></div>'
+        '<div class="grid-item-content">'
+        f'<small class="hidden-sm">gültig ab {start:%d.%m.}</small>'
+        f'<small class="visible-sm">{start:%d.%m.} - {end:%d.%m.%Y}</small>'
+        "</div></div></div>"
+    )
+
+
+def _shop_name(index: int) -> str:
+    return f"{SHOP_NAMES[index % len(SHOP_NAMES)]} {index}"
+
+
+def _shop_slug(index: int) -> str:
+    return _shop_name(index).lower().replace(" ", "-")
@@ -0,0 +1,143 @@
+import asyncio
+from collections import deque
+
+
+class ByteBudget:
+    """
+    An asynchronous budget of bytes held by fetched pages that are not processed yet.
+
+    Before a fetch, `acquire` reserves the expected page size, waiting while the budget is
+    exhausted. Once the page has arrived, `adjust` corrects the reservation to its actual
+    size without waiting (the budget may be exceeded by one page's misestimate), and
+    `release` returns it after the page was processed. The expected size is the mean of the
+    pages seen so far.
+
+    A reservation is always granted while nothing else is reserved, so a single page larger
+    than the whole budget is processed alone instead of blocking forever. Waiters are served
+    strictly in order of arrival, so large pages are not starved by small ones.
+
+    Attributes:
+        _capacity (int): Number of bytes that may be reserved at the same time.
+        _reserved (int): Number of currently reserved bytes.
+        _peak (int): Highest number of bytes reserved at the same time.
+        _estimate (int): Expected size of the next page in bytes.
+        _observed (int): Number of pages whose actual size was reported.
+        _observed_bytes (int): Total size of those pages.
+        _waiters (deque[tuple[int, asyncio.Future]]): Sizes and futures of the waiting `acquire` calls.
+    """
+
+    def __init__(self, capacity: int, initial_estimate: int = 256 * 1024):
+        """
+        Initializes the ByteBudget.
+
+        Args:
+            capacity (int): Number of bytes that may be reserved at the same time. Must be positive.
+            initial_estimate (int, optional): Expected page size before any page was seen. Defaults to 256 KiB.
+        """
+        if capacity <= 0:
+            raise ValueError("Byte budget capacity must be positive")
+        self._capacity = capacity
+        self._reserved = 0
+        self._peak = 0
+        self._estimate = initial_estimate
+        self._observed = 0
+        self._observed_bytes = 0
+        self._waiters = deque()
+
+    def get_reserved(self) -> int:
+        """
+        Retrieves the number of currently reserved bytes.
+
+        Returns:
+            int: The reserved bytes.
+        """
+        return self._reserved
+
+    def get_peak(self) -> int:
+        """
+        Retrieves the highest number of bytes reserved at the same time.
+
+        Returns:
+            int: The peak reservation in bytes.
+        """
+        return self._peak
+
+    def get_estimate(self) -> int:
+        """
+        Retrieves the expected size of the next page.
+
+        Returns:
+            int: The estimate in bytes.
+        """
+        return self._estimate
+
+    async def acquire(self, size: int = None) -> int:
+        """
+        Reserves bytes for a page, waiting until the budget has room for them.
+
+        Args:
+            size (int, optional): Number of bytes to reserve. Defaults to None (the current estimate).
+
+        Returns:
+            int: The reserved number of bytes, to be passed on to `adjust` and `release`.
+        """
+        size = self._estimate if size is None else size
+        if not self._waiters and self._fits(size):
+            self._reserve(size)
+            return size
+        waiter = (size, asyncio.get_running_loop().create_future())
+        self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].done() and not waiter[1].cancelled():
+                self.release(size)
+            else:
+                self._waiters.remove(waiter)
+                self._wake()
+            raise
+        return size
+
+    def adjust(self, reserved: int, size: int) -> int:
+        """
+        Corrects a reservation to the actual size of the page, without waiting.
+
+        Args:
+            reserved (int): The reservation returned by `acquire`.
+            size (int): The actual size of the page in bytes.
+
+        Returns:
+            int: The new reservation, to be passed on to `release`.
+        """
+        self._observed += 1
+        self._observed_bytes += size
+        self._estimate = self._observed_bytes // self._observed
+        self._reserve(size - reserved)
+        self._wake()
+        return size
+
+    def release(self, reserved: int):
+        """
+        Returns a reservation to the budget and wakes the waiting fetches.
+
+        Args:
+            reserved (int): The reservation returned by `acquire` or `adjust`.
+        """
+        self._reserved -= reserved
+        self._wake()
+
+    def _reserve(self, size: int):
+        self._reserved += size
+        self._peak = max(self._peak, self._reserved)
+
+    def _fits(self, size: int) -> bool:
+        return not self._reserved or self._reserved + size <= self._capacity
+
+    def _wake(self):
+        """
+        Grants the reservations of the waiters at the head of the queue while they fit.
+        """
+        while self._waiters and self._fits(self._waiters[0][0]):
+            size, future = self._waiters.popleft()
+            self._reserve(size)
+            future.set_result(None)
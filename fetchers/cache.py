@@ -0,0 +1,269 @@
+import os
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+
+
+@dataclass
+class CachedResponse:
+    """
+    A cached HTTP response body together with its validation metadata.
+
+    Attributes:
+        url (str): The URL the response belongs to.
+        body (str): The response text.
+        etag (str): The `ETag` header of the response (empty if missing).
+        last_modified (str): The `Last-Modified` header of the response (empty if missing).
+        expires_at (float): Unix time until which the response is fresh without revalidation (0 if it must be revalidated).
+        stored_at (float): Unix time when the response was stored or last revalidated.
+        variant (str): How the body was cut (e.g. to a region), part of the cache key (empty for whole bodies).
+    """
+    url: str
+    body: str
+    etag: str = ""
+    last_modified: str = ""
+    expires_at: float = 0.0
+    stored_at: float = 0.0
+    variant: str = ""
+
+    def is_fresh(self) -> bool:
+        """
+        Checks whether the response can be served without contacting the server.
+
+        Returns:
+            bool: True if the response has not expired yet.
+        """
+        return time.time() < self.expires_at
+
+    def conditional_headers(self) -> dict[str, str]:
+        """
+        Builds the conditional request headers used to revalidate the response.
+
+        Returns:
+            dict[str, str]: `If-None-Match` and/or `If-Modified-Since` headers.
+        """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    A persistent, size-bounded on-disk cache of HTTP responses with LRU eviction.
+
+    Every entry is stored as two files named by the SHA-256 of its URL and variant: `<key>.body`
+    with the response text and `<key>.json` with the validation metadata. The variant tells apart
+    bodies of the same URL cut differently (e.g. to a region or a size cap), so a cut body is only
+    served to fetches cutting it the same way. The modification time of the
+    body file tracks the last access, so the LRU order survives between runs.
+
+    Attributes:
+        _cache_dir (str): Directory holding the cache files.
+        _max_bytes (int): Maximum total size of the cached bodies in bytes.
+        _entries (OrderedDict[str, int]): Body sizes keyed by cache key, least recently used first.
+        _size (int): Current total size of the cached bodies in bytes.
+        logger (logging.Logger): Logger instance for error logging.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 256 * 1024 * 1024, logger: logging.Logger = None):
+        """
+        Initializes the ResponseCache and loads the LRU index from the cache directory.
+
+        Args:
+            cache_dir (str): Directory holding the cache files. Created if missing.
+            max_bytes (int, optional): Maximum total size of the cached bodies in bytes. Defaults to 256 MB.
+            logger (logging.Logger, optional): Logger instance for error logging. Defaults to None.
+        """
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self.logger = logger
+        self._entries = OrderedDict()
+        self._size = 0
+        os.makedirs(cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Rebuilds the in-memory LRU index from the body files in the cache directory.
+        """
+        entries = []
+        for file_name in os.listdir(self._cache_dir):
+            if not file_name.endswith(".body"):
+                continue
+            stat = os.stat(os.path.join(self._cache_dir, file_name))
+            entries.append((stat.st_mtime, file_name[:-len(".body")], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+
+    def _key(self, url: str, variant: str = "") -> str:
+        if variant:
+            url = f"{url}\n{variant}"
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, extension: str) -> str:
+        return os.path.join(self._cache_dir, f"{key}.{extension}")
+
+    def get(self, url: str, variant: str = "") -> CachedResponse | None:
+        """
+        Retrieves the cached response for a URL and marks it as recently used.
+
+        Args:
+            url (str): The URL to look up.
+            variant (str, optional): How the body was cut. Defaults to "" (the whole body).
+
+        Returns:
+            CachedResponse | None: The cached response, or None if the URL is not cached.
+        """
+        key = self._key(url, variant)
+        if key not in self._entries:
+            return None
+        try:
+            with open(self._path(key, "json"), encoding="UTF-8") as meta_file:
+                meta = json.load(meta_file)
+            with open(self._path(key, "body"), encoding="UTF-8") as body_file:
+                body = body_file.read()
+        except (OSError, ValueError) as e:
+            if self.logger:
+                self.logger.warning(f"Dropping unreadable cache entry for {url}: {e}")
+            self._remove(key)
+            return None
+        self._touch(key)
+        meta["variant"] = variant
+        return CachedResponse(body=body, **meta)
+
+    def store(self, url: str, body: str, headers, variant: str = "") -> CachedResponse | None:
+        """
+        Stores a response unless its headers forbid caching, evicting least recently used entries if needed.
+
+        Responses without a validator (`ETag`/`Last-Modified`) or freshness lifetime are not stored,
+        because they could never be served from the cache.
+
+        Args:
+            url (str): The URL of the response.
+            body (str): The response text.
+            headers (Mapping[str, str]): The response headers.
+            variant (str, optional): How the body was cut. Defaults to "" (the whole body).
+
+        Returns:
+            CachedResponse | None: The stored entry, or None if the response is not cacheable.
+        """
+        cache_control = self._parse_cache_control(headers.get("Cache-Control", ""))
+        if "no-store" in cache_control:
+            return None
+        now = time.time()
+        entry = CachedResponse(
+            url=url,
+            body=body,
+            etag=headers.get("ETag", ""),
+            last_modified=headers.get("Last-Modified", ""),
+            expires_at=self._expires_at(cache_control, now),
+            stored_at=now,
+            variant=variant,
+        )
+        if not (entry.etag or entry.last_modified or entry.expires_at):
+            return None
+        encoded_body = body.encode("utf-8")
+        if len(encoded_body) > self._max_bytes:
+            return None
+        key = self._key(url, variant)
+        self._remove(key)
+        self._write_atomic(self._path(key, "body"), encoded_body)
+        meta = asdict(entry)
+        del meta["body"]
+        self._write_atomic(self._path(key, "json"), json.dumps(meta).encode("utf-8"))
+        self._entries[key] = len(encoded_body)
+        self._size += len(encoded_body)
+        self._evict()
+        return entry
+
+    def revalidated(self, entry: CachedResponse, headers) -> CachedResponse:
+        """
+        Updates a cached entry after the server confirmed it with `304 Not Modified`.
+
+        Args:
+            entry (CachedResponse): The cached entry that was revalidated.
+            headers (Mapping[str, str]): The headers of the 304 response.
+
+        Returns:
+            CachedResponse: The updated cache entry.
+        """
+        cache_control = self._parse_cache_control(headers.get("Cache-Control", ""))
+        now = time.time()
+        entry.etag = headers.get("ETag", entry.etag)
+        entry.last_modified = headers.get("Last-Modified", entry.last_modified)
+        entry.expires_at = self._expires_at(cache_control, now)
+        entry.stored_at = now
+        meta = asdict(entry)
+        del meta["body"]
+        self._write_atomic(self._path(self._key(entry.url, entry.variant), "json"), json.dumps(meta).encode("utf-8"))
+        return entry
+
+    def _parse_cache_control(self, value: str) -> dict[str, str]:
+        """
+        Parses a `Cache-Control` header into a dictionary of directives.
+
+        Args:
+            value (str): The header value, e.g. "public, max-age=60".
+
+        Returns:
+            dict[str, str]: Lower-cased directive names mapped to their values (empty string if valueless).
+        """
+        directives = {}
+        for directive in value.split(","):
+            name, _, directive_value = directive.strip().partition("=")
+            if name:
+                directives[name.lower()] = directive_value.strip('"')
+        return directives
+
+    def _expires_at(self, cache_control: dict[str, str], now: float) -> float:
+        """
+        Computes until when a response is fresh from its `Cache-Control` directives.
+
+        Returns:
+            float: Unix time of expiry, or 0 if the response must always be revalidated.
+        """
+        if "no-cache" in cache_control:
+            return 0.0
+        try:
+            max_age = int(cache_control.get("max-age", 0))
+        except ValueError:
+            return 0.0
+        return now + max_age if max_age > 0 else 0.0
+
+    def _touch(self, key: str):
+        self._entries.move_to_end(key)
+        try:
+            os.utime(self._path(key, "body"))
+        except OSError:
+            pass
+
+    def _remove(self, key: str):
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+        for extension in ("body", "json"):
+            try:
+                os.remove(self._path(key, extension))
+            except FileNotFoundError:
+                pass
+
+    def _evict(self):
+        """
+        Removes least recently used entries until the cache fits into its size limit.
+        """
+        while self._size > self._max_bytes and self._entries:
+            key = next(iter(self._entries))
+            self._remove(key)
+
+    def _write_atomic(self, path: str, data: bytes):
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
@@ -1,26 +1,124 @@
+import time
+import codecs
 import httpx
 import asyncio
 import logging
+from typing import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from importlib.util import find_spec
+from .cache import CachedResponse, ResponseCache
+from .rate_limiter import HostRateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .region_reader import RegionReader
+from .latency import AdaptiveTimeout, HedgePolicy, LatencyTracker
+from metrics.registry import MetricsRegistry
+from storage.page_archive import PageArchive
 
 class Fetcher:
     """
     A class for fetching web pages asynchronously using HTTPX.
 
+    The Fetcher owns a single long-lived, pooled `httpx.AsyncClient` which is reused by
+    every request so connections and TLS sessions are shared between the main page fetch
+    and the detail page fan-out. The client is created lazily and released by `close`
+    (or by using the Fetcher as an async context manager).
+
+    With `stream_regions` the body of a page fetched for a known region (e.g. ".letaky-grid")
+    is read chunk by chunk and the download stops as soon as the region's closing tag has
+    arrived; only the region is returned (and cached or archived). `max_response_bytes` caps
+    the decoded size of every streamed response, longer bodies are truncated with a warning
+    and neither cached nor archived. The region and the size cap are part of the cache key, 
+    so a cut body is never served to a fetch cutting it differently.
+    Compression is negotiated by HTTPX (`Accept-Encoding`) and decoded while streaming.
+
+    To keep a few slow responses from dictating the run time, the latencies of every host are
+    tracked: with an `adaptive_timeout` requests time out relative to the host's observed
+    latency percentiles instead of after the fixed `timeout`, and with a `hedge_policy` a request
+    still unanswered after about the host's p95 latency is sent a second time, the first
+    response winning and the other request being cancelled.
+
     Attributes:
         _timeout (int): The request timeout in seconds.
+        _max_concurrency (int): Maximum number of requests in flight at the same time.
+        _http2 (bool): Whether HTTP/2 multiplexing is enabled.
+        _semaphore (asyncio.Semaphore): Semaphore bounding the number of in-flight requests.
+        _rate_limiter (HostRateLimiter): Per-host token bucket rate limiter (None if disabled).
+        _client (httpx.AsyncClient): The shared HTTPX client (None until first use).
+        _cache (ResponseCache): On-disk response cache used for conditional revalidation (None if disabled).
+        _retry_policy (RetryPolicy): Policy deciding which failures are retried and the backoff between attempts.
+        _circuit_breaker (CircuitBreaker): Per-host circuit breaker (None if disabled).
+        _metrics (MetricsRegistry): Registry recording request latencies, status codes and bytes downloaded (None if disabled).
+        _archive (PageArchive): Archive recording every successfully fetched page for later replay (None if disabled).
+        _stream_regions (bool): Whether pages fetched for a region are streamed and cut to the region.
+        _max_response_bytes (int): Maximum decoded size of a streamed response (None means no limit).
+        _adaptive_timeout (AdaptiveTimeout): Policy deriving per-host timeouts from latencies (None means the fixed timeout).
+        _hedge_policy (HedgePolicy): Policy deciding when slow requests are hedged (None disables hedging).
+        _latency_tracker (LatencyTracker): Recent response latencies per host (None if neither policy is set).
         logger (logging.Logger): Logger instance for error logging.
     """
 
-    def __init__(self, timeout:int=10, logger: logging.Logger = None):
+    def __init__(
+            self,
+            timeout:int=10,
+            logger: logging.Logger = None,
+            max_concurrency: int = 10,
+            rate_limit: float = None,
+            http2: bool = False,
+            cache: ResponseCache = None,
+            retry_policy: RetryPolicy = None,
+            circuit_breaker: CircuitBreaker = None,
+            metrics: MetricsRegistry = None,
+            archive: PageArchive = None,
+            stream_regions: bool = False,
+            max_response_bytes: int = None,
+            adaptive_timeout: AdaptiveTimeout = None,
+            hedge_policy: HedgePolicy = None):
         """
         Initializes the Fetcher with a specified timeout and logger.
 
         Args:
             timeout (int, optional): The timeout for HTTP requests in seconds. Defaults to 10.
             logger (logging.Logger, optional): A logger instance for error logging. Defaults to None.
+            max_concurrency (int, optional): Maximum number of requests in flight. Defaults to 10.
+            rate_limit (float, optional): Maximum requests per second per host. Defaults to None (no rate limiting).
+            http2 (bool, optional): Enables HTTP/2 multiplexing (requires the `h2` package). Defaults to False.
+            cache (ResponseCache, optional): On-disk response cache. Defaults to None (no caching).
+            retry_policy (RetryPolicy, optional): Retry and backoff policy. Defaults to None (RetryPolicy with default settings).
+            circuit_breaker (CircuitBreaker, optional): Per-host circuit breaker. Defaults to None (disabled).
+            metrics (MetricsRegistry, optional): Registry recording request metrics. Defaults to None (no metrics).
+            archive (PageArchive, optional): Archive recording fetched pages. Defaults to None (no recording).
+            stream_regions (bool, optional): Streams pages fetched for a region and stops once it is complete. Defaults to False.
+            max_response_bytes (int, optional): Maximum decoded size of a response; enables streaming. Defaults to None (no limit).
+            adaptive_timeout (AdaptiveTimeout, optional): Per-host timeouts from observed latencies. Defaults to None (fixed timeout).
+            hedge_policy (HedgePolicy, optional): Hedges slow requests. Defaults to None (no hedging).
         """
         self._timeout = timeout
         self.logger = logger
+        self._max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = HostRateLimiter(rate_limit) if rate_limit else None
+        self._http2 = http2
+        self._client = None
+        self._cache = cache
+        self._retry_policy = retry_policy or RetryPolicy()
+        self._circuit_breaker = circuit_breaker
+        self._metrics = metrics
+        self._archive = archive
+        self._stream_regions = stream_regions
+        self._max_response_bytes = max_response_bytes
+        self._adaptive_timeout = adaptive_timeout
+        self._hedge_policy = hedge_policy
+        self._latency_tracker = LatencyTracker() if adaptive_timeout or hedge_policy else None
+        if http2 and find_spec("h2") is None:
+            if self.logger:
+                self.logger.warning("HTTP/2 requested but the 'h2' package is not installed, falling back to HTTP/1.1")
+            self._http2 = False
+
+    async def __aenter__(self) -> "Fetcher":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
 
     def set_timeout(self, timeout:int):
         """
@@ -30,7 +128,9 @@ class Fetcher:
             timeout (int): The timeout value in seconds.
         """
         self._timeout = timeout
-    
+        if self._client is not None:
+            self._client.timeout = httpx.Timeout(timeout)
+
     def get_timeout(self) -> int:
         """
         Retrieves the current timeout setting.
@@ -40,51 +140,462 @@ class Fetcher:
         """
         return self._timeout
 
-    async def fetch(self, url: str) -> str:
+    def get_max_concurrency(self) -> int:
+        """
+        Retrieves the maximum number of requests in flight.
+
+        Returns:
+            int: The maximum number of concurrent requests.
+        """
+        return self._max_concurrency
+
+    def get_client(self) -> httpx.AsyncClient:
+        """
+        Retrieves the shared HTTPX client, creating it on first use.
+
+        Returns:
+            httpx.AsyncClient: The pooled HTTPX client.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.get_timeout(),
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=self._max_concurrency,
+                    max_keepalive_connections=self._max_concurrency,
+                ),
+            )
+        return self._client
+
+    async def close(self):
+        """
+        Closes the shared HTTPX client and releases its pooled connections.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def fetch(self, url: str, region: str = None) -> str:
         """
         Fetches the HTML content of a given URL asynchronously.
 
         Args:
             url (str): The URL to fetch.
+            region (str, optional): Selector ("#id" or ".class") of the only element the caller needs. 
+                Defaults to None (the whole page).
 
         Returns:
-            str: The HTML content of the fetched URL, or an empty string if an error occurs.
+            str: The HTML content of the fetched URL (only the region when streaming regions), or an empty string if an error occurs.
         """
-        async with  httpx.AsyncClient(timeout=self.get_timeout()) as client: 
-            return await self._fetch_single(client, url)
+        return await self._fetch_single(self.get_client(), url, region)
 
-    async def fetch_many(self, *urls) -> dict[str, str]:
+    @asynccontextmanager
+    async def stream(self, url: str) -> AsyncIterator[httpx.Response]:
+        """
+        Opens a streamed GET request within the concurrency limit, rate limit and circuit breaker of the Fetcher.
+
+        Used for downloads that are not pages (e.g. flyer images), so they share the limits 
+        of the crawl. The request is neither cached, archived nor retried. Its outcome is 
+        recorded by the circuit breaker: a response with a retryable status or a transport 
+        error counts as a failure of the host.
+
+        Args:
+            url (str): The URL to fetch.
+
+        Yields:
+            httpx.Response: The response, its status already checked, with the body still to be read.
+
+        Raises:
+            httpx.HTTPStatusError: If the response has an error status code.
+            httpx.RequestError: If the request fails or the host's circuit is open.
+        """
+        if self._circuit_breaker and not self._circuit_breaker.allow(url):
+            raise httpx.RequestError(f"Circuit open for host of {url}")
+        succeeded = None
+        try:
+            async with self._semaphore:
+                if self._rate_limiter:
+                    await self._rate_limiter.acquire(url)
+                async with self.get_client().stream("GET", url) as response:
+                    try:
+                        response.raise_for_status()
+                    except httpx.HTTPStatusError:
+                        succeeded = not self._retry_policy.is_retryable_status(response.status_code)
+                        raise
+                    succeeded = True
+                    yield response
+        except httpx.RequestError:
+            succeeded = False
+            raise
+        finally:
+            if self._circuit_breaker:
+                if succeeded is None:
+                    self._circuit_breaker.release_trial(url)
+                elif succeeded:
+                    self._circuit_breaker.record_success(url)
+                else:
+                    self._circuit_breaker.record_failure(url)
+
+    async def fetch_many(self, *urls, region: str = None) -> dict[str, str]:
         """
         Fetches multiple URLs asynchronously.
 
+        At most `max_concurrency` requests are in flight at the same time.
+
         Args:
             *urls (str): A variable number of URLs to fetch.
+            region (str, optional): Selector ("#id" or ".class") of the only element the caller needs. 
+                Defaults to None (the whole pages).
 
         Returns:
             dict[str, str]: A dictionary mapping URLs to their fetched HTML content.
         """
-        async with httpx.AsyncClient(timeout=self.get_timeout()) as client:
-            tasks = [self._fetch_single(client, url) for url in urls]
-            results = await asyncio.gather(*tasks)
-            return {url: result for url, result in zip(urls, results)}
-    
-    async def _fetch_single(self, client: httpx.AsyncClient, url: str) -> str:
+        client = self.get_client()
+        tasks = [self._fetch_single(client, url, region) for url in urls]
+        results = await asyncio.gather(*tasks)
+        return {url: result for url, result in zip(urls, results)}
+
+    async def _fetch_single(self, client: httpx.AsyncClient, url: str, region: str = None) -> str:
         """
-        Performs an individual HTTP GET request.
+        Performs an individual HTTP GET request, retrying transient failures.
+
+        The request waits for a free concurrency slot and for the host's rate limiter before being sent.
+        If a response cache is configured, fresh cached responses are served without a request,
+        stale ones are revalidated with `If-None-Match`/`If-Modified-Since` and a `304 Not Modified`
+        answer is served from disk.
+
+        Transport errors and retryable status codes (e.g. 429, 503) are retried according to the
+        retry policy, honoring `Retry-After`. The concurrency slot is released while waiting.
+        Requests to a host whose circuit breaker is open fail fast without being sent.
+        With an adaptive timeout, every retry of a timed out request gets twice the time.
+        Successfully fetched pages (including cache hits, but no truncated bodies) are appended to the archive, if one is configured.
+        The whole fetch, including retries and backoff, is recorded in the `fetch_duration_seconds` histogram.
 
         Args:
             client (httpx.AsyncClient): The HTTPX client instance.
             url (str): The URL to fetch.
+            region (str, optional): Selector of the only element the caller needs. Defaults to None.
 
         Returns:
             str: The response text if successful, or an empty string if an error occurs.
         """
+        start = time.perf_counter()
         try:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
-        except httpx.HTTPStatusError as e:
-            self.logger.error(f"HTTP error fetching {url}: {e}")
-        except httpx.RequestError as e:
-            self.logger.error(f"Request error fetching {url}: {e}")
-        return ""
+            cached = self._cache.get(url, self._cache_variant(region)) if self._cache else None
+            if cached and cached.is_fresh():
+                if self._metrics:
+                    self._metrics.inc("cache_hits")
+                if self._archive:
+                    self._archive.record(url, cached.body)
+                return cached.body
+            for attempt in range(self._retry_policy.max_retries + 1):
+                if self._circuit_breaker and not self._circuit_breaker.allow(url):
+                    self.logger.error(f"Circuit open for host of {url}, skipping request")
+                    if self._metrics:
+                        self._metrics.inc("fetch_failures", reason="circuit_open")
+                    return ""
+                # Allowed while the circuit is open means this request is the half-open trial
+                trial = bool(self._circuit_breaker) and self._circuit_breaker.is_open(url)
+                retry_after = None
+                try:
+                    text = await self._request(client, url, cached, region, attempt)
+                    if self._circuit_breaker:
+                        self._circuit_breaker.record_success(url)
+                    return text
+                except httpx.HTTPStatusError as e:
+                    status_code = e.response.status_code
+                    if not self._retry_policy.is_retryable_status(status_code):
+                        if self._circuit_breaker:
+                            self._circuit_breaker.record_success(url)
+                        self.logger.error(f"HTTP error fetching {url}: {e}")
+                        if self._metrics:
+                            self._metrics.inc("fetch_failures", reason="status")
+                        return ""
+                    retry_after = e.response.headers.get("Retry-After")
+                    error = f"HTTP error fetching {url}: {e}"
+                except httpx.RequestError as e:
+                    error = f"Request error fetching {url}: {e!r}"
+                    if self._metrics:
+                        self._metrics.inc("request_errors", error=type(e).__name__)
+                except BaseException:
+                    if trial:
+                        self._circuit_breaker.release_trial(url)
+                    raise
+                if self._circuit_breaker:
+                    self._circuit_breaker.record_failure(url)
+                if attempt == self._retry_policy.max_retries:
+                    break
+                delay = self._retry_policy.get_delay(attempt, retry_after)
+                self.logger.warning(f"{error} (attempt {attempt + 1}), retrying in {delay:.2f}s")
+                if self._metrics:
+                    self._metrics.inc("retries")
+                await asyncio.sleep(delay)
+            self.logger.error(f"{error}, giving up after {attempt + 1} attempts")
+            if self._metrics:
+                self._metrics.inc("fetch_failures", reason="retries_exhausted")
+            return ""
+        finally:
+            if self._metrics:
+                self._metrics.observe("fetch_duration_seconds", time.perf_counter() - start)
+
+    async def _request(
+            self,
+            client: httpx.AsyncClient,
+            url: str,
+            cached: CachedResponse = None,
+            region: str = None,
+            attempt: int = 0) -> str:
+        """
+        Sends a GET request (hedged if the policy says so) and handles its response.
+
+        The response is stored in the cache and appended to the archive, if configured, unless 
+        its body was truncated at `max_response_bytes`, so an incomplete page is never served 
+        from the cache or replayed.
+
+        Args:
+            client (httpx.AsyncClient): The HTTPX client instance.
+            url (str): The URL to fetch.
+            cached (CachedResponse, optional): Stale cache entry to revalidate. Defaults to None.
+            region (str, optional): Selector of the only element the caller needs. Defaults to None.
+            attempt (int, optional): Zero-based number of the attempt, scaling an adaptive timeout. Defaults to 0.
+
+        Returns:
+            str: The response text.
+
+        Raises:
+            httpx.HTTPStatusError: If the response has an error status code.
+            httpx.RequestError: If the request fails.
+        """
+        headers = cached.conditional_headers() if cached else None
+        response, text, truncated = await self._hedged_send(client, url, headers, region, attempt)
+        if cached and response.status_code == httpx.codes.NOT_MODIFIED:
+            self._cache.revalidated(cached, response.headers)
+            if self._archive:
+                self._archive.record(url, cached.body)
+            return cached.body
+        response.raise_for_status()
+        if text is None:
+            text = response.text
+        if truncated:
+            return text
+        if self._cache:
+            self._cache.store(url, text, response.headers, self._cache_variant(region))
+        if self._archive:
+            self._archive.record(url, text)
+        return text
+
+    def _cache_variant(self, region: str = None) -> str:
+        """
+        Describes how the body of a fetch is cut, so the cache keeps region-only or size-capped 
+        bodies apart from whole ones and never serves them to a fetch cutting differently.
+
+        Args:
+            region (str, optional): Selector of the only element the caller needs. Defaults to None.
+
+        Returns:
+            str: The cache variant (empty for whole, uncapped bodies).
+        """
+        parts = []
+        if self._stream_regions and region:
+            parts.append(f"region={region}")
+        if self._max_response_bytes:
+            parts.append(f"max_bytes={self._max_response_bytes}")
+        return ";".join(parts)
+
+    async def _hedged_send(
+            self,
+            client: httpx.AsyncClient,
+            url: str,
+            headers: dict,
+            region: str = None,
+            attempt: int = 0) -> tuple[httpx.Response, str | None, bool]:
+        """
+        Sends a request and, if it is still unanswered after the hedge delay, a duplicate of it.
+
+        The hedge delay counts from when the request got its concurrency slot and rate limit 
+        token, so requests merely queued locally are not hedged. If the host's latency is not 
+        known yet when the request is sent, it waits for the first estimate (or its response) 
+        instead of hedging blindly. The hedge queues for a slot like any request and is taken from the hedge policy's 
+        cap on extra requests only once it is sent; if the cap is exhausted by then, it is dropped. 
+        The first of the two requests to succeed wins and the other one is cancelled. If one of 
+        them fails, the other one is awaited; the first error is raised if both fail.
+
+        Args:
+            client (httpx.AsyncClient): The HTTPX client instance.
+            url (str): The URL to fetch.
+            headers (dict): Extra request headers (None for none).
+            region (str, optional): Selector of the only element the caller needs. Defaults to None.
+            attempt (int, optional): Zero-based number of the attempt. Defaults to 0.
+
+        Returns:
+            tuple[httpx.Response, str | None, bool]: The response, its text if it was streamed and whether it was truncated.
+        """
+        policy = self._hedge_policy
+        if policy is None:
+            return await self._send(client, url, headers, region, attempt)
+        policy.record_request()
+
+        def admit_hedge() -> bool:
+            if not policy.try_hedge():
+                return False
+            if self._metrics:
+                self._metrics.inc("hedged_requests")
+            return True
+
+        sent = asyncio.Event()
+        primary = asyncio.create_task(self._send(client, url, headers, region, attempt, on_send=sent.set))
+        pending = {primary}
+        sent_waiter = asyncio.create_task(sent.wait())
+        estimate_waiter = None
+        try:
+            await asyncio.wait({primary, sent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            start = time.monotonic()
+            done = set()
+            if not primary.done() and policy.get_delay(self._latency_tracker, url) is None:
+                estimate_waiter = asyncio.create_task(self._latency_tracker.wait_for_estimate(url))
+                await asyncio.wait({primary, estimate_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if not primary.done():
+                delay = policy.get_delay(self._latency_tracker, url)
+                done, pending = await asyncio.wait(pending, timeout=max(0.0, delay - (time.monotonic() - start)))
+            if primary.done():
+                done, pending = {primary}, set()
+            elif policy.can_hedge():
+                pending.add(asyncio.create_task(self._send(client, url, headers, region, attempt, on_send=admit_hedge)))
+            error = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task.result() is None:
+                            continue
+                        if task is not primary and self._metrics:
+                            self._metrics.inc("hedge_wins")
+                        return task.result()
+                    error = error or task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiters = [sent_waiter] + ([estimate_waiter] if estimate_waiter else [])
+            for task in waiters + list(pending):
+                task.cancel()
+            await asyncio.gather(*waiters, *pending, return_exceptions=True)
+
+    async def _send(
+            self,
+            client: httpx.AsyncClient,
+            url: str,
+            headers: dict,
+            region: str = None,
+            attempt: int = 0,
+            on_send: Callable[[], bool | None] = None) -> tuple[httpx.Response, str | None, bool] | None:
+        """
+        Sends a single GET request within the concurrency and rate limits.
+
+        The latency of successful responses is recorded for the adaptive timeout and the hedge policy. 
+        An adaptive timeout bounds the whole request, from sending it until its body is read; 
+        exceeding it raises `httpx.ReadTimeout` like an ordinary timeout, so the request is retried.
+
+        Args:
+            client (httpx.AsyncClient): The HTTPX client instance.
+            url (str): The URL to fetch.
+            headers (dict): Extra request headers (None for none).
+            region (str, optional): Selector of the only element the caller needs. Defaults to None.
+            attempt (int, optional): Zero-based number of the attempt. Defaults to 0.
+            on_send (Callable[[], bool | None], optional): Called once the concurrency slot and rate limit 
+                token are held; the request is dropped if it returns False. Defaults to None.
+
+        Returns:
+            tuple[httpx.Response, str | None, bool] | None: The response, its text if it was streamed 
+                (None otherwise, the body is read) and whether the body was truncated at `max_response_bytes`, 
+                or None if `on_send` dropped the request.
+
+        Raises:
+            httpx.RequestError: If the request fails.
+        """
+        async with self._semaphore:
+            if self._rate_limiter:
+                await self._rate_limiter.acquire(url)
+            if on_send and on_send() is False:
+                return None
+            timeout = httpx.USE_CLIENT_DEFAULT
+            deadline = None
+            if self._adaptive_timeout:
+                deadline = self._adaptive_timeout.get_timeout(self._latency_tracker, url, self._timeout, attempt)
+                timeout = deadline
+            start = time.perf_counter()
+            try:
+                async with asyncio.timeout(deadline):
+                    if self._max_response_bytes or (self._stream_regions and region):
+                        response, text, truncated = await self._stream(
+                            client, url, headers, region if self._stream_regions else None, timeout
+                        )
+                    else:
+                        response = await client.get(url, headers=headers, timeout=timeout)
+                        text, truncated = None, False
+            except TimeoutError:
+                raise httpx.ReadTimeout(f"No complete response from {url} within {deadline:.2f}s") from None
+            latency = time.perf_counter() - start
+            if self._latency_tracker and response.status_code < 400:
+                self._latency_tracker.record(url, latency)
+            if self._metrics:
+                self._metrics.observe("http_request_duration_seconds", latency)
+                self._metrics.inc("http_responses", status=response.status_code)
+                self._metrics.inc("http_response_bytes", response.num_bytes_downloaded)
+            return response, text, truncated
+
+    async def _stream(
+            self,
+            client: httpx.AsyncClient,
+            url: str,
+            headers: dict,
+            region: str = None,
+            timeout: float = httpx.USE_CLIENT_DEFAULT) -> tuple[httpx.Response, str, bool]:
+        """
+        Sends a GET request and reads the body chunk by chunk, stopping once the region is complete or the size cap is reached.
+
+        Leaving the response early closes its connection instead of returning it to the pool.
+
+        Args:
+            client (httpx.AsyncClient): The HTTPX client instance.
+            url (str): The URL to fetch.
+            headers (dict): Extra request headers (None for none).
+            region (str, optional): Selector of the element to cut out. Defaults to None (the whole body).
+            timeout (float, optional): Timeout of the request. Defaults to the client's timeout.
+
+        Returns:
+            tuple[httpx.Response, str, bool]: The closed response, the decoded text (empty for error statuses) 
+                and whether the body was truncated at `max_response_bytes`.
+        """
+        async with client.stream("GET", url, headers=headers, timeout=timeout) as response:
+            if not response.is_success:
+                return response, "", False
+            reader = RegionReader(region) if region else None
+            decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+            chunks = []
+            received = 0
+            truncated = False
+            async for data in response.aiter_bytes():
+                received += len(data)
+                if self._max_response_bytes and received > self._max_response_bytes:
+                    data = data[:len(data) - (received - self._max_response_bytes)]
+                    truncated = True
+                chunk = decoder.decode(data, final=truncated)
+                if reader:
+                    if reader.feed(chunk):
+                        if self._metrics:
+                            self._metrics.inc("streams_stopped_early")
+                        break
+                else:
+                    chunks.append(chunk)
+                if truncated:
+                    self.logger.warning(f"Response of {url} exceeds {self._max_response_bytes} bytes, truncating it")
+                    if self._metrics:
+                        self._metrics.inc("truncated_responses")
+                    break
+            else:
+                tail = decoder.decode(b"", final=True)
+                if reader:
+                    reader.feed(tail)
+                else:
+                    chunks.append(tail)
+        return response, reader.get_text() if reader else "".join(chunks), truncated
@@ -0,0 +1,159 @@
+import os
+import json
+import uuid
+import httpx
+import asyncio
+import hashlib
+import logging
+from urllib.parse import urlsplit
+from models.flyer_data import FlyerData
+from extractors.extractor import FlyerDataExtractor
+from .fetcher import Fetcher
+
+
+class ImageDownloader:
+    """
+    Downloads flyer images concurrently into a content-addressed store.
+
+    The better-quality image URL of every flyer is resolved from its thumbnail URL by the
+    FlyerDataExtractor. Images are streamed to a temporary file chunk by chunk while being
+    hashed, so whole images are never buffered in memory. The finished file is stored as
+    `<store_dir>/<aa>/<sha256><extension>`, where `aa` are the first two hex digits of its
+    SHA-256 digest, so identical images of different shops or runs are stored only once.
+    An append-only URL index (`urls.ndjson`) remembers which URL resolved to which file,
+    so URLs downloaded in previous runs are not requested again.
+
+    Attributes:
+        _fetcher (Fetcher): Fetcher sending the downloads through its pooled HTTP client, within its 
+            concurrency limit, rate limit and circuit breaker.
+        _extractor (FlyerDataExtractor): Extractor resolving the better-quality image URLs.
+        _store_dir (str): Root directory of the content-addressed store.
+        _semaphore (asyncio.Semaphore): Semaphore bounding the number of concurrent downloads.
+        _url_index (dict[str, str]): Stored file paths (relative to `_store_dir`) keyed by image URL.
+        _in_flight (dict[str, asyncio.Task]): Running downloads keyed by image URL.
+        logger (logging.Logger): Logger instance for error logging.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(
+            self,
+            fetcher: Fetcher,
+            store_dir: str,
+            max_concurrency: int = 8,
+            logger: logging.Logger = None,
+            data_extractor: FlyerDataExtractor = None):
+        """
+        Initializes the ImageDownloader and loads the URL index of the store.
+
+        Args:
+            fetcher (Fetcher): Fetcher sending the downloads within its limits.
+            store_dir (str): Root directory of the content-addressed store. Created if missing.
+            max_concurrency (int, optional): Maximum number of concurrent downloads. Defaults to 8.
+            logger (logging.Logger, optional): Logger instance for error logging. Defaults to None.
+            data_extractor (FlyerDataExtractor, optional): Extractor resolving image URLs. Defaults to None (Instantiaze FlyerDataExtractor class).
+        """
+        self._fetcher = fetcher
+        self._extractor = data_extractor or FlyerDataExtractor()
+        self._store_dir = store_dir
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._url_index = {}
+        self._in_flight = {}
+        self.logger = logger
+        os.makedirs(os.path.join(store_dir, "tmp"), exist_ok=True)
+        self._index_path = os.path.join(store_dir, "urls.ndjson")
+        self._load_index()
+
+    def _load_index(self):
+        """
+        Loads the URL index, ignoring entries whose file no longer exists.
+        """
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, encoding="UTF-8") as index_file:
+            for line in index_file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if os.path.exists(os.path.join(self._store_dir, entry["path"])):
+                    self._url_index[entry["url"]] = entry["path"]
+
+    def _record(self, url: str, relative_path: str):
+        self._url_index[url] = relative_path
+        with open(self._index_path, "a", encoding="UTF-8") as index_file:
+            index_file.write(json.dumps({"url": url, "path": relative_path}) + "\n")
+
+    async def download_flyers(self, flyers: list[FlyerData]):
+        """
+        Downloads the better-quality images of the flyers concurrently and sets their `thumbnail_path`.
+
+        Flyers whose image fails to download or to be stored (e.g. on a full disk) keep an empty 
+        `thumbnail_path`; the errors are logged.
+
+        Args:
+            flyers (list[FlyerData]): The flyers whose images are downloaded.
+        """
+        paths = await asyncio.gather(*(
+            self.download(self._extractor.get_image_url(flyer.thumbnail)) for flyer in flyers
+        ))
+        for flyer, path in zip(flyers, paths):
+            flyer.thumbnail_path = path
+
+    async def download(self, url: str) -> str:
+        """
+        Downloads an image into the store unless it is already there.
+
+        Concurrent requests for the same URL share a single download.
+
+        Args:
+            url (str): The URL of the image.
+
+        Returns:
+            str: The path of the stored image, or an empty string if the download fails.
+        """
+        if not url:
+            return ""
+        if url in self._url_index:
+            return os.path.join(self._store_dir, self._url_index[url])
+        if url not in self._in_flight:
+            task = asyncio.ensure_future(self._download(url))
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+            self._in_flight[url] = task
+        return await asyncio.shield(self._in_flight[url])
+
+    async def _download(self, url: str) -> str:
+        """
+        Streams an image to a temporary file while hashing it and moves it to its content address.
+
+        Args:
+            url (str): The URL of the image.
+
+        Returns:
+            str: The path of the stored image, or an empty string if the download or storing fails.
+        """
+        tmp_path = os.path.join(self._store_dir, "tmp", uuid.uuid4().hex)
+        hasher = hashlib.sha256()
+        try:
+            async with self._semaphore:
+                async with self._fetcher.stream(url) as response:
+                    with open(tmp_path, "wb") as tmp_file:
+                        async for chunk in response.aiter_bytes(self.CHUNK_SIZE):
+                            hasher.update(chunk)
+                            tmp_file.write(chunk)
+            digest = hasher.hexdigest()
+            extension = os.path.splitext(urlsplit(url).path)[1].lower()[:5]
+            relative_path = os.path.join(digest[:2], digest + extension)
+            path = os.path.join(self._store_dir, relative_path)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(tmp_path, path)
+            self._record(url, relative_path)
+        except (httpx.HTTPStatusError, httpx.RequestError, OSError) as e:
+            self.logger.error(f"Error downloading image {url}: {e!r}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return ""
+        return path
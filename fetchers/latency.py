@@ -0,0 +1,213 @@
+import asyncio
+from collections import deque
+from urllib.parse import urlsplit
+
+
+class LatencyTracker:
+    """
+    Keeps the latencies of the most recent responses of every host to estimate their percentiles.
+
+    Attributes:
+        window (int): Number of most recent latencies kept per host.
+        min_samples (int): Number of latencies a host needs before percentiles are estimated.
+        _latencies (dict[str, deque[float]]): Recent latencies in seconds per host.
+        _estimated (dict[str, asyncio.Event]): Events set once a host has `min_samples` latencies.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        """
+        Initializes the LatencyTracker.
+
+        Args:
+            window (int, optional): Number of most recent latencies kept per host. Defaults to 200.
+            min_samples (int, optional): Latencies needed before percentiles are estimated. Defaults to 20.
+        """
+        self.window = window
+        self.min_samples = min_samples
+        self._latencies = {}
+        self._estimated = {}
+
+    def _host(self, url: str) -> str:
+        return urlsplit(url).netloc
+
+    def record(self, url: str, latency: float):
+        """
+        Records the latency of a response.
+
+        Args:
+            url (str): The requested URL.
+            latency (float): Seconds from sending the request until the body was read.
+        """
+        host = self._host(url)
+        latencies = self._latencies.get(host)
+        if latencies is None:
+            latencies = self._latencies[host] = deque(maxlen=self.window)
+        latencies.append(latency)
+        if len(latencies) >= self.min_samples and host in self._estimated:
+            self._estimated[host].set()
+
+    async def wait_for_estimate(self, url: str):
+        """
+        Waits until the URL's host has enough latencies for percentiles to be estimated.
+
+        Args:
+            url (str): A URL of the host.
+        """
+        host = self._host(url)
+        event = self._estimated.get(host)
+        if event is None:
+            event = self._estimated[host] = asyncio.Event()
+            if len(self._latencies.get(host, ())) >= self.min_samples:
+                event.set()
+        await event.wait()
+
+    def get_quantile(self, url: str, fraction: float) -> float | None:
+        """
+        Estimates a latency percentile of the URL's host by the nearest-rank method.
+
+        Args:
+            url (str): A URL of the host.
+            fraction (float): The percentile as a fraction (e.g. 0.95).
+
+        Returns:
+            float | None: The latency in seconds, or None while the host has fewer than `min_samples` latencies.
+        """
+        latencies = self._latencies.get(self._host(url))
+        if not latencies or len(latencies) < self.min_samples:
+            return None
+        ordered = sorted(latencies)
+        return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+class AdaptiveTimeout:
+    """
+    Derives per-host request timeouts from the observed latencies instead of one fixed value.
+
+    The timeout of a first attempt is `multiplier` times the host's `percentile` latency, at
+    least `min_timeout`; every retry doubles it, so a page that is merely slow is not failed
+    over and over. It never exceeds the Fetcher's fixed timeout, which also applies while a
+    host has too few latencies for an estimate. The Fetcher enforces it as a deadline of the
+    whole request, body included, so a server trickling out bytes cannot stretch it.
+
+    Attributes:
+        percentile (float): The latency percentile the timeout is based on.
+        multiplier (float): Factor applied to the percentile.
+        min_timeout (float): Lower bound of a timeout in seconds.
+    """
+
+    def __init__(self, percentile: float = 0.99, multiplier: float = 3.0, min_timeout: float = 1.0):
+        """
+        Initializes the AdaptiveTimeout.
+
+        Args:
+            percentile (float, optional): The latency percentile the timeout is based on. Defaults to 0.99.
+            multiplier (float, optional): Factor applied to the percentile. Defaults to 3.
+            min_timeout (float, optional): Lower bound of a timeout in seconds. Defaults to 1.
+        """
+        self.percentile = percentile
+        self.multiplier = multiplier
+        self.min_timeout = min_timeout
+
+    def get_timeout(self, tracker: LatencyTracker, url: str, max_timeout: float, attempt: int = 0) -> float:
+        """
+        Computes the timeout of a request.
+
+        Args:
+            tracker (LatencyTracker): The observed latencies.
+            url (str): The URL about to be requested.
+            max_timeout (float): Upper bound, the Fetcher's fixed timeout.
+            attempt (int, optional): Zero-based number of the attempt. Defaults to 0.
+
+        Returns:
+            float: The timeout in seconds.
+        """
+        latency = tracker.get_quantile(url, self.percentile)
+        if latency is None:
+            return max_timeout
+        return min(max_timeout, max(self.min_timeout, latency * self.multiplier) * 2 ** attempt)
+
+
+class HedgePolicy:
+    """
+    Decides when a slow request is duplicated (hedged) and caps the extra load this causes.
+
+    A request still unanswered after the host's `percentile` latency, counted from when it was
+    actually sent rather than queued for a concurrency slot, is sent a second time; the first
+    response wins and the other request is cancelled. While the latency cannot be estimated
+    yet (e.g. during the first fan-out of a run), pending requests wait for the host's first
+    estimate, so they are still hedged once enough responses arrived. At most
+    `max_ratio` hedges are sent per request, counted over the Fetcher's lifetime, so a host
+    that becomes slow as a whole is not hit with twice the load.
+
+    Attributes:
+        percentile (float): The latency percentile after which a request is hedged.
+        max_ratio (float): Maximum number of hedges per request (e.g. 0.05 for 5% extra requests).
+        min_delay (float): Lower bound of the hedge delay in seconds.
+        _requests (int): Number of requests sent, hedges excluded.
+        _hedges (int): Number of hedges sent.
+    """
+
+    def __init__(self, percentile: float = 0.95, max_ratio: float = 0.05, min_delay: float = 0.01):
+        """
+        Initializes the HedgePolicy.
+
+        Args:
+            percentile (float, optional): The latency percentile after which a request is hedged. Defaults to 0.95.
+            max_ratio (float, optional): Maximum number of hedges per request. Defaults to 0.05.
+            min_delay (float, optional): Lower bound of the hedge delay in seconds. Defaults to 0.01.
+        """
+        self.percentile = percentile
+        self.max_ratio = max_ratio
+        self.min_delay = min_delay
+        self._requests = 0
+        self._hedges = 0
+
+    def record_request(self):
+        """
+        Counts a sent request (not a hedge) towards the hedge budget.
+        """
+        self._requests += 1
+
+    def get_delay(self, tracker: LatencyTracker, url: str) -> float | None:
+        """
+        Computes how long after being sent a request is hedged.
+
+        Args:
+            tracker (LatencyTracker): The observed latencies.
+            url (str): The requested URL.
+
+        Returns:
+            float | None: The delay in seconds, or None while the host's latency cannot be estimated.
+        """
+        latency = tracker.get_quantile(url, self.percentile)
+        return None if latency is None else max(self.min_delay, latency)
+
+    def can_hedge(self) -> bool:
+        """
+        Checks whether the cap allows one more hedge, without taking it.
+
+        Returns:
+            bool: True if a hedge could be sent.
+        """
+        return self._hedges + 1 <= self.max_ratio * self._requests
+
+    def try_hedge(self) -> bool:
+        """
+        Takes a hedge from the budget if the cap allows one more.
+
+        Returns:
+            bool: True if the hedge may be sent.
+        """
+        if not self.can_hedge():
+            return False
+        self._hedges += 1
+        return True
+
+    def get_hedges(self) -> int:
+        """
+        Retrieves the number of hedges sent.
+
+        Returns:
+            int: The number of hedges.
+        """
+        return self._hedges
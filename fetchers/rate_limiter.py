@@ -0,0 +1,101 @@
+import time
+import asyncio
+from urllib.parse import urlsplit
+
+
+class TokenBucket:
+    """
+    A token bucket limiting how often an operation may be performed.
+
+    Tokens are refilled continuously at `rate` tokens per second up to `capacity`.
+    Each call to `acquire` consumes one token, waiting for the refill if the bucket is empty.
+
+    Attributes:
+        _rate (float): Number of tokens refilled per second.
+        _capacity (float): Maximum number of tokens the bucket can hold (burst size).
+        _tokens (float): Number of currently available tokens.
+        _updated_at (float): Monotonic time of the last refill.
+        _lock (asyncio.Lock): Lock serializing waiters so tokens are handed out in order.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Initializes the TokenBucket with a refill rate and capacity.
+
+        Args:
+            rate (float): Number of tokens refilled per second. Must be positive.
+            capacity (float, optional): Maximum burst size. Defaults to None (same as `rate`, at least 1).
+        """
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self._rate = rate
+        self._capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        """
+        Adds the tokens accumulated since the last refill.
+        """
+        now = time.monotonic()
+        self._tokens = min(self._capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    async def acquire(self):
+        """
+        Waits until a token is available and consumes it.
+        """
+        async with self._lock:
+            self._refill()
+            while self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class HostRateLimiter:
+    """
+    A per-host rate limiter keeping one token bucket for every host it sees.
+
+    Attributes:
+        _rate (float): Requests per second allowed for each host.
+        _burst (float): Burst size of each host bucket.
+        _buckets (dict[str, TokenBucket]): Token buckets keyed by host name.
+    """
+
+    def __init__(self, rate: float, burst: float = None):
+        """
+        Initializes the HostRateLimiter.
+
+        Args:
+            rate (float): Requests per second allowed for each host.
+            burst (float, optional): Burst size of each host bucket. Defaults to None (same as `rate`).
+        """
+        self._rate = rate
+        self._burst = burst
+        self._buckets = {}
+
+    def get_bucket(self, url: str) -> TokenBucket:
+        """
+        Retrieves (or creates) the token bucket for the host of the given URL.
+
+        Args:
+            url (str): The URL whose host is rate limited.
+
+        Returns:
+            TokenBucket: The token bucket of the URL's host.
+        """
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self._rate, self._burst)
+        return self._buckets[host]
+
+    async def acquire(self, url: str):
+        """
+        Waits until a request to the URL's host is allowed.
+
+        Args:
+            url (str): The URL about to be requested.
+        """
+        await self.get_bucket(url).acquire()
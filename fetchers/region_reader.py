@@ -0,0 +1,159 @@
+import re
+
+_TAG = re.compile(r"<(/?)([a-zA-Z][\w:-]*)([^>]*)>")
+_ATTRIBUTE = re.compile(r"""([\w:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_RAW_TEXT_END = {
+    "script": re.compile(r"</script\s*>", re.IGNORECASE),
+    "style": re.compile(r"</style\s*>", re.IGNORECASE),
+}
+
+
+class RegionReader:
+    """
+    Locates an HTML element in a document received in chunks, to stop reading once it is complete.
+
+    The element is given by a simple selector, `#id` or `.class`. Chunks are scanned tag by tag
+    as they arrive. Once the opening tag of the element is found, tags of the same name are
+    counted until the matching closing tag, which completes the region. Comments and the
+    contents of `<script>` and `<style>` are skipped, a tag cut off at the end of a chunk is
+    scanned when the next chunk arrives.
+
+    Attributes:
+        _attribute (str): Attribute matched by the selector, "id" or "class".
+        _value (str): Value (id) or class name matched by the selector.
+        _chunks (list[str]): Chunks received since the last scan.
+        _text (str): The received text, not including `_chunks`.
+        _position (int): Offset in `_text` up to which tags have been scanned.
+        _tag (str): Name of the element's tag (None until the element is found).
+        _start (int): Offset of the element's opening tag (None until found).
+        _end (int): Offset after the element's closing tag (None until complete).
+        _depth (int): Number of open tags named `_tag` inside the region.
+    """
+
+    def __init__(self, selector: str):
+        """
+        Initializes the RegionReader.
+
+        Args:
+            selector (str): The element to locate, "#id" or ".class" (e.g. ".letaky-grid").
+
+        Raises:
+            ValueError: If the selector is neither an id nor a class selector.
+        """
+        if len(selector) < 2 or selector[0] not in "#.":
+            raise ValueError(f"Unsupported region selector {selector!r}, expected '#id' or '.class'")
+        self._attribute = "id" if selector[0] == "#" else "class"
+        self._value = selector[1:]
+        self._chunks = []
+        self._text = ""
+        self._position = 0
+        self._tag = None
+        self._start = None
+        self._end = None
+        self._depth = 0
+
+    def is_complete(self) -> bool:
+        """
+        Checks whether the element's closing tag has been received.
+
+        Returns:
+            bool: True once the region is complete.
+        """
+        return self._end is not None
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Adds a chunk of the document and scans it.
+
+        Args:
+            chunk (str): The next decoded chunk.
+
+        Returns:
+            bool: True once the region is complete; further chunks are not needed.
+        """
+        if self._end is None:
+            self._chunks.append(chunk)
+            # A tag needs its closing ">", scanning is pointless before one arrives
+            if ">" in chunk:
+                self._scan()
+        return self._end is not None
+
+    def get_text(self) -> str:
+        """
+        Retrieves the received text relevant to the parser.
+
+        Returns:
+            str: The region once its opening tag was received (truncated if it is incomplete),
+                otherwise everything received, so documents without the element parse as before.
+        """
+        self._join()
+        if self._start is None:
+            return self._text
+        return self._text[self._start:self._end]
+
+    def _join(self):
+        if self._chunks:
+            self._text += "".join(self._chunks)
+            self._chunks = []
+
+    def _scan(self):
+        """
+        Scans the received text for tags from the last complete tag on.
+        """
+        self._join()
+        text = self._text
+        position = self._position
+        while True:
+            position = text.find("<", position)
+            if position == -1:
+                position = len(text)
+                break
+            if text.startswith("<!--", position):
+                comment_end = text.find("-->", position + 4)
+                if comment_end == -1:
+                    break
+                position = comment_end + 3
+                continue
+            match = _TAG.match(text, position)
+            if match is None:
+                if text.find(">", position) == -1:
+                    break
+                position += 1
+                continue
+            closing, name, attributes = match.groups()
+            name = name.lower()
+            if not closing and name in _RAW_TEXT_END:
+                raw_text_end = _RAW_TEXT_END[name].search(text, match.end())
+                if raw_text_end is None:
+                    break
+                position = raw_text_end.end()
+                continue
+            if self._start is None:
+                if not closing and self._matches(attributes):
+                    self._tag, self._start, self._depth = name, position, 1
+                    if attributes.rstrip().endswith("/"):
+                        self._end = match.end()
+                        break
+            elif name == self._tag:
+                if closing:
+                    self._depth -= 1
+                elif not attributes.rstrip().endswith("/"):
+                    self._depth += 1
+                if self._depth == 0:
+                    self._end = match.end()
+                    break
+            position = match.end()
+        self._position = position
+
+    def _matches(self, attributes: str) -> bool:
+        """
+        Checks whether the attributes of an opening tag match the selector.
+        """
+        if self._value not in attributes:
+            return False
+        for name, *values in _ATTRIBUTE.findall(attributes):
+            if name.lower() != self._attribute:
+                continue
+            value = next((value for value in values if value), "")
+            return value == self._value if self._attribute == "id" else self._value in value.split()
+        return False
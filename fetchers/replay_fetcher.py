@@ -0,0 +1,75 @@
+import httpx
+from .fetcher import Fetcher
+from storage.page_archive import PageArchive
+
+
+class ReplayFetcher(Fetcher):
+    """
+    A Fetcher serving pages from a recorded PageArchive instead of the network.
+
+    The archive index is read when the fetcher is created, locating the latest recorded
+    version of every page (optionally up to a point in time). A page body is only read and
+    decompressed from the archive when it is fetched, so replaying holds no more pages in
+    memory than a live crawl. Pages missing from the archive are treated like failed fetches
+    and yield an empty string. No request is ever sent and no HTTP client is created.
+
+    Attributes:
+        _archive (PageArchive): The replayed archive.
+        _meta (dict): The archive's meta record (base URL and categories of the recorded crawl).
+        _locations (dict[str, tuple[int, int, int]]): Locations of the recorded pages in the archive keyed by URL.
+    """
+
+    def __init__(self, archive: PageArchive, until: str = None, **kwargs):
+        """
+        Initializes the ReplayFetcher.
+
+        Args:
+            archive (PageArchive): The archive to replay.
+            until (str, optional): ISO timestamp; pages recorded later are ignored. Defaults to None (latest versions).
+            **kwargs: Further Fetcher arguments (e.g. `logger`, `metrics`).
+        """
+        super().__init__(**kwargs)
+        self._archive = archive
+        self._meta, self._locations = archive.index(until)
+
+    def get_meta(self) -> dict:
+        """
+        Retrieves the meta record of the replayed crawl.
+
+        Returns:
+            dict: The meta record with `base_url` and `categories` (empty dict if the archive has none).
+        """
+        return self._meta
+
+    def get_client(self) -> None:
+        """
+        Replays need no HTTP client, so none is created.
+
+        Returns:
+            None: Always None.
+        """
+        return None
+
+    async def _fetch_single(self, client: httpx.AsyncClient, url: str, region: str = None) -> str:
+        """
+        Serves a page from the archive.
+
+        Args:
+            client (httpx.AsyncClient): Unused (None), kept for compatibility with Fetcher.
+            url (str): The URL of the page.
+            region (str, optional): Unused, recorded pages are served as recorded.
+
+        Returns:
+            str: The recorded page content, or an empty string if the page was not recorded.
+        """
+        location = self._locations.get(url)
+        if location is None:
+            if self.logger:
+                self.logger.error(f"Page {url} is not in the archive")
+            if self._metrics:
+                self._metrics.inc("fetch_failures", reason="not_archived")
+            return ""
+        body = self._archive.read_body(location)
+        if self._metrics:
+            self._metrics.inc("http_response_bytes", len(body))
+        return body
@@ -0,0 +1,200 @@
+import time
+import random
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+
+class RetryPolicy:
+    """
+    Decides which failed requests are retried and how long to wait between attempts.
+
+    Delays grow exponentially (`backoff_base * 2 ** attempt`, capped at `backoff_max`) with
+    full jitter, unless the server asked for a specific delay through `Retry-After`.
+
+    Attributes:
+        max_retries (int): Maximum number of retries after the first attempt.
+        backoff_base (float): Base delay in seconds.
+        backoff_max (float): Upper bound of a single delay in seconds.
+        jitter (bool): Whether the delay is randomized between 0 and the exponential backoff.
+        retry_statuses (frozenset[int]): HTTP status codes worth retrying.
+    """
+
+    RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    def __init__(
+            self,
+            max_retries: int = 3,
+            backoff_base: float = 0.5,
+            backoff_max: float = 30.0,
+            jitter: bool = True,
+            retry_statuses: frozenset[int] = RETRY_STATUSES):
+        """
+        Initializes the RetryPolicy.
+
+        Args:
+            max_retries (int, optional): Maximum number of retries after the first attempt. Defaults to 3.
+            backoff_base (float, optional): Base delay in seconds. Defaults to 0.5.
+            backoff_max (float, optional): Upper bound of a single delay in seconds. Defaults to 30.
+            jitter (bool, optional): Randomizes delays to avoid synchronized retries. Defaults to True.
+            retry_statuses (frozenset[int], optional): HTTP status codes worth retrying. Defaults to RETRY_STATUSES.
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = retry_statuses
+
+    def is_retryable_status(self, status_code: int) -> bool:
+        """
+        Checks whether a response with the given status code should be retried.
+
+        Args:
+            status_code (int): The HTTP status code.
+
+        Returns:
+            bool: True if the request should be retried.
+        """
+        return status_code in self.retry_statuses
+
+    def get_delay(self, attempt: int, retry_after: str = None) -> float:
+        """
+        Computes the delay before the next attempt.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed.
+            retry_after (str, optional): Value of the `Retry-After` header (seconds or HTTP date). Defaults to None.
+
+        Returns:
+            float: The delay in seconds.
+        """
+        requested_delay = self._parse_retry_after(retry_after)
+        if requested_delay is not None:
+            return min(requested_delay, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** attempt)
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def _parse_retry_after(self, retry_after: str) -> float | None:
+        """
+        Parses a `Retry-After` header value.
+
+        Args:
+            retry_after (str): Delay in seconds or an HTTP date.
+
+        Returns:
+            float | None: The requested delay in seconds, or None if missing or malformed.
+        """
+        if not retry_after:
+            return None
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class CircuitBreaker:
+    """
+    A per-host circuit breaker failing requests fast once a host is clearly down.
+
+    After `failure_threshold` consecutive failed requests the host's circuit opens and
+    requests are rejected without being sent. Once `reset_timeout` seconds passed, a single
+    trial request is let through (half-open state): its success closes the circuit again,
+    its failure re-opens it for another `reset_timeout`. A trial that ends without a result
+    (e.g. cancelled) must be handed back with `release_trial`, so another one can be sent.
+
+    Circuits are kept per host, but all shop pages of prospektmaschine.de are served by the
+    same host, so an open circuit stops the whole crawl at once rather than isolating a few
+    shops; only requests to other hosts (e.g. the image server) are not affected.
+
+    Attributes:
+        failure_threshold (int): Consecutive failures opening the circuit.
+        reset_timeout (float): Seconds an open circuit waits before a trial request.
+        _failures (dict[str, int]): Consecutive failures per host.
+        _opened_at (dict[str, float]): Monotonic time the circuit of a host was opened.
+        _trial_in_flight (set[str]): Hosts with a half-open trial request in flight.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """
+        Initializes the CircuitBreaker.
+
+        Args:
+            failure_threshold (int, optional): Consecutive failures opening the circuit. Defaults to 5.
+            reset_timeout (float, optional): Seconds before an open circuit lets a trial request through. Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = {}
+        self._opened_at = {}
+        self._trial_in_flight = set()
+
+    def _host(self, url: str) -> str:
+        return urlsplit(url).netloc
+
+    def allow(self, url: str) -> bool:
+        """
+        Checks whether a request to the URL's host may be sent.
+
+        Args:
+            url (str): The URL about to be requested.
+
+        Returns:
+            bool: False if the host's circuit is open.
+        """
+        host = self._host(url)
+        opened_at = self._opened_at.get(host)
+        if opened_at is None:
+            return True
+        if time.monotonic() - opened_at < self.reset_timeout or host in self._trial_in_flight:
+            return False
+        self._trial_in_flight.add(host)
+        return True
+
+    def record_success(self, url: str):
+        """
+        Records a successful request, closing the host's circuit.
+
+        Args:
+            url (str): The requested URL.
+        """
+        host = self._host(url)
+        self._failures.pop(host, None)
+        self._opened_at.pop(host, None)
+        self._trial_in_flight.discard(host)
+
+    def record_failure(self, url: str):
+        """
+        Records a failed request, opening the host's circuit once the threshold is reached.
+
+        Args:
+            url (str): The requested URL.
+        """
+        host = self._host(url)
+        self._failures[host] = self._failures.get(host, 0) + 1
+        if host in self._trial_in_flight or self._failures[host] >= self.failure_threshold:
+            self._opened_at[host] = time.monotonic()
+        self._trial_in_flight.discard(host)
+
+    def release_trial(self, url: str):
+        """
+        Hands back the half-open trial of the URL's host without a result, leaving the circuit open.
+
+        Args:
+            url (str): The requested URL.
+        """
+        self._trial_in_flight.discard(self._host(url))
+
+    def is_open(self, url: str) -> bool:
+        """
+        Checks whether the circuit of the URL's host is currently open.
+
+        Args:
+            url (str): The URL to check.
+
+        Returns:
+            bool: True if requests to the host are being rejected.
+        """
+        return self._host(url) in self._opened_at
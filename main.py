@@ -1,56 +1,133 @@
+from __future__ import annotations
+
 import os
+import sys
+import glob
 import logging
-import asyncio
 import argparse
-from parsers.controllers.parser_controller import ParserController
+from datetime import date
+from typing import TYPE_CHECKING
+from writers.flyer_writer import WRITERS
+from parsers.shop_filter import ShopFilter
+
+if TYPE_CHECKING:
+    from metrics.registry import MetricsRegistry
+    from parsers.controllers.parser_controller import ParserController
 
 current_dir = os.path.dirname(__file__)
 data_dir = os.path.join(current_dir, "data")
+DEFAULT_BASE_URL = "https://www.prospektmaschine.de/"
+DEFAULT_CATEGORIES = ["hypermarkte"]
 
-async def main():
+
+def _common_arguments(defaults: bool = True) -> argparse.ArgumentParser:
     """
-    Main entry point for the flyer scraping application.
+    Builds the parent parser of the options shared by a crawl and the `parse` subcommand.
 
-    This function sets up the command-line interface (CLI) using argparse to accept 
-    user inputs for category, output file path, base URL, fetcher timeout, verbosity, 
-    and log file. It configures logging settings, initializes the `ParserController` 
-    for fetching and parsing data, and saves the processed output to a specified 
-    file in JSON format.
+    Args:
+        defaults (bool, optional): Whether the options get their defaults. The `parse` subcommand's copy has none, 
+            so it does not overwrite the options given before the subcommand. Defaults to True.
 
-    The flow of the function is as follows:
-        1. Parse command-line arguments.
-        2. Configure logging based on verbosity and log file options.
-        3. Initialize the `ParserController` with provided settings.
-        4. Call `ParserController.process()` to fetch and parse data.
-        5. Save the parsed data using `ParserController.save_output()`.
+    Returns:
+        argparse.ArgumentParser: The parent parser (without help option).
+    """
+    def default(value):
+        return value if defaults else argparse.SUPPRESS
 
-    Command-line arguments:
-        --category (str): The category to scrape (default is "hypermarkte").
-        --output (str): The output file path for saving the parsed data (default is 'data/output.json').
-        --base_url (str): The base URL to scrape from (default is 'https://www.prospektmaschine.de/').
-        --fetcher_timeout (int): Timeout for fetcher requests (default is 10).
-        --verbose (bool): Flag to enable verbose logging (default is False).
-        --log_file (str): Path to the log file (default is None, meaning logs are printed to the console).
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument(
+        "--output",
+        type=str,
+        default=default(None),
+        help="Specify the output file path (default: data/output.<format>)",
+    )
+    common.add_argument(
+        "--format",
+        type=str,
+        choices=list(WRITERS),
+        default=default("json"),
+        help="Specify the output format (default: json)",
+    )
+    common.add_argument(
+        "--gzip",
+        action="store_true",
+        default=default(False),
+        help="Gzip-compress the output file (default: False)",
+    )
+    common.add_argument(
+        "--valid_on", "--valid-on",
+        type=date.fromisoformat,
+        default=default(None),
+        help="Extract only brochures valid on this day, YYYY-MM-DD (default: None - all brochures)"
+    )
+    common.add_argument(
+        "--verbose",
+        action="store_true",
+        default=default(False),
+        help="Verbosity (default: False)",
+    )
+    common.add_argument(
+        "--log_file",
+        type=str, 
+        default=default(None),
+        help="Specify log file path for logs to be saved (default: None - logs printed in CLI)"
+    )
+    return common
+
+
+def parse_arguments(argv: list[str] = None) -> argparse.Namespace:
     """
+    Parses and normalizes the command-line arguments (see `main` and `parse_files`).
+
+    Only the standard library, the writers and the shop filter are imported up to here, so `--help` and
+    argument errors return without loading the HTTP and parsing stacks.
 
-    # CLI interface 
-    parser = argparse.ArgumentParser(description="Scrape flyers from prospektmaschine.de")
+    Args:
+        argv (list[str], optional): The arguments to parse. Defaults to None (`sys.argv[1:]`).
+
+    Returns:
+        argparse.Namespace: The parsed arguments; `command` is "parse" for the parse-only subcommand, None for a crawl.
+    """
+    parser = argparse.ArgumentParser(description="Scrape flyers from prospektmaschine.de", parents=[_common_arguments()])
+    subparsers = parser.add_subparsers(dest="command", title="subcommands")
+    parse_parser = subparsers.add_parser(
+        "parse",
+        parents=[_common_arguments(defaults=False)],
+        help="Parse local detail page HTML files without network access",
+        description="Parse local detail page HTML files without loading the HTTP stack",
+    )
+    parse_parser.add_argument("files", nargs="+", help="HTML files or glob patterns")
+    parse_parser.add_argument(
+        "--shop_name",
+        type=str,
+        default=None,
+        help="Specify the shop name of the flyers (default: None - file name without extension)"
+    )
     parser.add_argument(
         "--category",
         type=str,
-        default="hypermarkte",
-        help="Specify the category to scrape (default: hypermarkte)",
+        nargs="+",
+        default=DEFAULT_CATEGORIES,
+        help="Specify the categories to scrape, space or comma separated, or 'all' for every category (default: hypermarkte)",
     )
     parser.add_argument(
-        "--output",
+        "--shops",
+        type=str,
+        nargs="+",
+        default=None,
+        help="Crawl only shops matching one of these case-insensitive globs, or regular expressions prefixed with 're:' (default: None - all shops)"
+    )
+    parser.add_argument(
+        "--exclude_shops", "--exclude-shops",
         type=str,
-        default=os.path.join(data_dir, "output.json"),
-        help="Specify the output JSON file path",
+        nargs="+",
+        default=None,
+        help="Skip shops matching one of these case-insensitive globs, or regular expressions prefixed with 're:' (default: None)"
     )
     parser.add_argument(
         "--base_url", 
         type=str, 
-        default="https://www.prospektmaschine.de/",
+        default=DEFAULT_BASE_URL,
         help="Specify base url to be prepended to urls (default: 'https://www.prospektmaschine.de/')"
     )
     parser.add_argument(
@@ -60,22 +137,263 @@ async def main():
         help="Specify timeout for Fetcher class (default: 10)"
     )
     parser.add_argument(
-        "--verbose",
+        "--max_concurrency",
+        type=int,
+        default=10,
+        help="Specify maximum number of requests in flight (default: 10)"
+    )
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=None,
+        help="Specify maximum requests per second per host (default: None - no rate limiting)"
+    )
+    parser.add_argument(
+        "--http2",
         action="store_true",
-        help="Verbosity (default: False)",
+        help="Enable HTTP/2 multiplexing, requires the 'h2' package (default: False)",
     )
     parser.add_argument(
-        "--log_file",
-        type=str, 
+        "--cache_dir", "--cache-dir",
+        type=str,
         default=None,
-        help="Specify log file path for logs to be saved (default: None - logs printed in CLI)"
+        help="Specify directory for the on-disk HTTP response cache (default: None - no caching)"
+    )
+    parser.add_argument(
+        "--cache_max_mb", "--cache-max-mb",
+        type=int,
+        default=256,
+        help="Specify maximum size of the response cache in megabytes (default: 256)"
+    )
+    parser.add_argument(
+        "--stream_regions", "--stream-regions",
+        action="store_true",
+        help="Stream pages and stop downloading once the region read by the parser is complete (default: False)",
+    )
+    parser.add_argument(
+        "--max_response_mb", "--max-response-mb",
+        type=float,
+        default=None,
+        help="Specify maximum decoded size of a response in megabytes, longer ones are truncated (default: None - no limit)"
+    )
+    parser.add_argument(
+        "--max_inflight_mb", "--max-inflight-mb",
+        type=float,
+        default=None,
+        help="Specify budget of fetched but unparsed HTML in megabytes, fetches wait while it is exhausted (default: None - no budget)"
+    )
+    parser.add_argument(
+        "--max_retries",
+        type=int,
+        default=3,
+        help="Specify maximum number of retries of a failed request (default: 3)"
+    )
+    parser.add_argument(
+        "--retry_backoff",
+        type=float,
+        default=0.5,
+        help="Specify base delay of the exponential retry backoff in seconds (default: 0.5)"
+    )
+    parser.add_argument(
+        "--circuit_breaker_threshold",
+        type=int,
+        default=5,
+        help="Specify consecutive failures after which a host is skipped, 0 disables the circuit breaker (default: 5)"
+    )
+    parser.add_argument(
+        "--circuit_breaker_reset",
+        type=float,
+        default=30.0,
+        help="Specify seconds before a skipped host is tried again (default: 30)"
+    )
+    parser.add_argument(
+        "--adaptive_timeout", "--adaptive-timeout",
+        action="store_true",
+        help="Time requests out relative to the host's observed p99 latency, --fetcher_timeout being the upper bound (default: False)"
+    )
+    parser.add_argument(
+        "--hedge_requests", "--hedge-requests",
+        action="store_true",
+        help="Send a duplicate of requests unanswered after the host's p95 latency, the first response wins (default: False)"
+    )
+    parser.add_argument(
+        "--max_hedge_ratio", "--max-hedge-ratio",
+        type=float,
+        default=0.05,
+        help="Specify maximum number of hedged requests per request (default: 0.05)"
+    )
+    parser.add_argument(
+        "--parse_workers", "--parse-workers",
+        type=int,
+        default=None,
+        help="Specify number of workers parsing detail pages (default: None - number of CPUs)"
+    )
+    parser.add_argument(
+        "--parse_backend",
+        type=str,
+        choices=["thread", "process"],
+        default="thread",
+        help="Specify worker pool used for parsing detail pages (default: thread)"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip unchanged shop pages and emit only new, changed or expired flyers (default: False)",
+    )
+    parser.add_argument(
+        "--state_db",
+        type=str,
+        default=os.path.join(data_dir, "state.sqlite3"),
+        help="Specify the SQLite state database used by --incremental (default: data/state.sqlite3)"
+    )
+    parser.add_argument(
+        "--download_thumbnails",
+        action="store_true",
+        help="Download the better-quality flyer images into a local store (default: False)",
+    )
+    parser.add_argument(
+        "--thumbnail_dir",
+        type=str,
+        default=os.path.join(data_dir, "thumbnails"),
+        help="Specify directory of the content-addressed image store (default: data/thumbnails)"
+    )
+    parser.add_argument(
+        "--thumbnail_workers",
+        type=int,
+        default=8,
+        help="Specify maximum number of concurrent image downloads (default: 8)"
+    )
+    parser.add_argument(
+        "--record",
+        type=str,
+        default=None,
+        help="Specify path of an append-only archive recording every fetched page (default: None - no recording)"
+    )
+    parser.add_argument(
+        "--replay",
+        type=str,
+        default=None,
+        help="Specify path of a recorded archive to crawl without network access (default: None - live crawl)"
+    )
+    parser.add_argument(
+        "--replay_until", "--replay-until",
+        type=str,
+        default=None,
+        help="Specify ISO timestamp, pages recorded later are ignored by --replay (default: None - latest pages)"
+    )
+    parser.add_argument(
+        "--work_queue", "--work-queue",
+        type=str,
+        default=None,
+        help="Specify path of a SQLite work queue enabling a sharded crawl (default: None - single process crawl)"
+    )
+    parser.add_argument(
+        "--shard_role",
+        type=str,
+        choices=["all", "enqueue", "work", "merge"],
+        default="all",
+        help="Specify part of the sharded crawl run by this process (default: all)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Specify number of local worker processes of the sharded crawl (default: 1)"
+    )
+    parser.add_argument(
+        "--worker_id",
+        type=str,
+        default=None,
+        help="Specify identifier of this worker (default: <hostname>-<pid>)"
+    )
+    parser.add_argument(
+        "--parts_dir",
+        type=str,
+        default=os.path.join(data_dir, "parts"),
+        help="Specify directory of the partial outputs of the sharded crawl (default: data/parts)"
+    )
+    parser.add_argument(
+        "--claim_batch",
+        type=int,
+        default=10,
+        help="Specify number of shops a worker leases at once (default: 10)"
+    )
+    parser.add_argument(
+        "--lease_timeout",
+        type=float,
+        default=300,
+        help="Specify seconds after which shops leased by a dead worker are crawled again (default: 300)"
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and recrawl every shop on a schedule adapted to its flyers' end dates (default: False)",
+    )
+    parser.add_argument(
+        "--min_recrawl_interval",
+        type=float,
+        default=900,
+        help="Specify shortest time between two crawls of a shop in seconds (default: 900)"
+    )
+    parser.add_argument(
+        "--max_recrawl_interval",
+        type=float,
+        default=86400,
+        help="Specify longest time between two crawls of a shop in seconds (default: 86400)"
+    )
+    parser.add_argument(
+        "--discovery_interval",
+        type=float,
+        default=3600,
+        help="Specify seconds between two fetches of the main pages looking for new shops (default: 3600)"
+    )
+    parser.add_argument(
+        "--metrics_out", "--metrics-out",
+        type=str,
+        default=None,
+        help="Specify path of the JSON metrics report, a Prometheus export is written next to it as .prom (default: None - no metrics)"
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        default=None,
+        help="Specify directory receiving CPU and allocation profiles per stage (default: None - no profiling)"
+    )
+    parser.add_argument(
+        "--profile_top", "--profile-top",
+        type=int,
+        default=20,
+        help="Specify number of entries per stage in the profile summary (default: 20)"
     )
 
-    args = parser.parse_args()
-    args.category += "/" if args.category[-1] != "/" else ""
+    args = parser.parse_args(argv)
+    args.output = args.output or os.path.join(data_dir, "output" + WRITERS[args.format].extension)
+    if args.command == "parse":
+        return args
+    if args.daemon and args.work_queue:
+        parser.error("--daemon cannot be combined with --work_queue")
+    try:
+        args.shop_filter = ShopFilter(args.shops, args.exclude_shops)
+    except ValueError as e:
+        parser.error(str(e))
+    args.category = [
+        category.strip("/") + "/"
+        for categories in args.category for category in categories.split(",") if category.strip("/")
+    ]
     args.base_url += "/" if args.base_url[-1] != "/" else ""
+    return args
+
+
+def configure_logging(args: argparse.Namespace) -> logging.Logger:
+    """
+    Configures logging from the `--verbose` and `--log_file` arguments.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
 
-    # Logging settings 
+    Returns:
+        logging.Logger: The application logger.
+    """
     level = logging.INFO if args.verbose else logging.WARNING
     logging.basicConfig(
         filename=args.log_file,
@@ -84,19 +402,359 @@ async def main():
     )
     logging.getLogger("fetchers.fetcher").setLevel(logging.INFO if args.verbose else logging.WARNING)
     logging.getLogger("httpx").setLevel(logging.INFO if args.verbose else logging.WARNING)
-    logger = logging.getLogger(__name__)
+    return logging.getLogger(__name__)
+
+
+async def main(args: argparse.Namespace):
+    """
+    Main entry point for the flyer scraping application.
+
+    This function receives the command-line arguments parsed by `parse_arguments` (category, 
+    output file path, base URL, fetcher timeout, verbosity, log file, ...). It configures 
+    logging settings, initializes the `ParserController` for fetching and parsing data, and 
+    streams the processed output to a specified file in JSON, NDJSON or CSV format, or 
+    appends it as a new run of a flyer store. The HTTP, parsing and storage modules are 
+    imported here instead of at module level, so `--help` and the `parse` subcommand 
+    (see `parse_files`) start without loading them.
+
+    The flow of the function is as follows:
+        1. Configure logging based on verbosity and log file options.
+        2. Initialize the `ParserController` with provided settings.
+        3. Call `ParserController.stream_output()` to fetch and parse data and 
+           write every flyer to the output file as soon as it is parsed.
+
+    Command-line arguments:
+        --category (list[str]): The categories to scrape, or "all" for every category (default is "hypermarkte").
+            Categories are crawled concurrently and shops listed in several categories are fetched once.
+        --valid_on (date): Only brochures valid on this day (YYYY-MM-DD) are extracted (default is None, meaning all brochures).
+        --shops (list[str]): Case-insensitive globs, or regular expressions prefixed with "re:", of the shops to crawl; 
+            the detail pages of other shops are not fetched (default is None, meaning all shops).
+        --exclude_shops (list[str]): Globs or "re:" regular expressions of shops not to crawl (default is None).
+        --output (str): The output file path for saving the parsed data (default is 'data/output.json').
+        --format (str): The output format, "json", "ndjson", "csv" or "store" (default is "json").
+        --gzip (bool): Flag to gzip-compress the output file (default is False).
+        --base_url (str): The base URL to scrape from (default is 'https://www.prospektmaschine.de/').
+        --fetcher_timeout (int): Timeout for fetcher requests (default is 10).
+        --max_concurrency (int): Maximum number of requests in flight (default is 10).
+        --rate_limit (float): Maximum requests per second per host (default is None, meaning no limit).
+        --http2 (bool): Flag to enable HTTP/2 multiplexing, requires the `h2` package (default is False).
+        --cache-dir (str): Directory of the on-disk HTTP response cache (default is None, meaning no caching).
+        --cache-max-mb (int): Maximum size of the response cache in megabytes (default is 256).
+        --stream_regions (bool): Flag to stream pages and stop downloading once the region read by the parser 
+            (`#sidebar`, `.letaky-grid`) is complete; only the region is kept (default is False).
+        --max_response_mb (float): Maximum decoded size of a response in megabytes, longer responses are 
+            streamed and truncated (default is None, meaning no limit).
+        --max_inflight_mb (float): Budget of fetched but unparsed detail page HTML in megabytes; fetches wait 
+            while it is exhausted (default is None, meaning no budget).
+        --max_retries (int): Maximum number of retries of a failed request (default is 3).
+        --retry_backoff (float): Base delay of the exponential retry backoff in seconds (default is 0.5).
+        --circuit_breaker_threshold (int): Consecutive failures after which a host is skipped, 0 disables it (default is 5).
+        --circuit_breaker_reset (float): Seconds before a skipped host is tried again (default is 30).
+        --adaptive_timeout (bool): Flag to time requests out relative to the host's observed p99 latency, 
+            --fetcher_timeout being the upper bound (default is False).
+        --hedge_requests (bool): Flag to send a duplicate of requests unanswered after the host's p95 latency (default is False).
+        --max_hedge_ratio (float): Maximum number of hedged requests per request (default is 0.05).
+        --parse-workers (int): Number of workers parsing detail pages (default is None, meaning the number of CPUs).
+        --parse_backend (str): Worker pool used for parsing, "thread" or "process" (default is "thread").
+        --incremental (bool): Flag to skip unchanged shop pages and emit only new, changed or expired flyers (default is False).
+        --state_db (str): Path of the SQLite state database used by --incremental (default is 'data/state.sqlite3').
+        --download_thumbnails (bool): Flag to download the better-quality flyer images (default is False).
+        --thumbnail_dir (str): Directory of the content-addressed image store (default is 'data/thumbnails').
+        --thumbnail_workers (int): Maximum number of concurrent image downloads (default is 8).
+        --record (str): Path of a compressed, append-only archive receiving every fetched page (default is None, meaning no recording).
+        --replay (str): Path of an archive to crawl instead of the network; its base URL and categories are used unless 
+            --base_url or --category are given (default is None, meaning a live crawl).
+        --replay_until (str): ISO timestamp; pages recorded later are ignored by --replay (default is None, meaning the latest pages).
+        --work_queue (str): Path of a SQLite work queue enabling a sharded crawl; shops are leased to worker processes, 
+            on this or other machines sharing the file, which write partial outputs merged at the end (default is None).
+        --shard_role (str): Part of the sharded crawl run by this process: "enqueue" shops, "work" on leased shops, 
+            "merge" the partial outputs, or "all" of them in turn (default is "all").
+        --workers (int): Number of local worker processes of the sharded crawl (default is 1).
+        --worker_id (str): Identifier of this worker (default is None, meaning "<hostname>-<pid>").
+        --parts_dir (str): Directory of the partial outputs of the sharded crawl (default is 'data/parts').
+        --claim_batch (int): Number of shops a worker leases at once (default is 10).
+        --lease_timeout (float): Seconds after which the shops leased by a dead worker are crawled again (default is 300).
+        --daemon (bool): Flag to keep running and recrawl every shop on its own schedule, derived from the end dates 
+            of its flyers; the output is rewritten atomically after every cycle (default is False).
+        --min_recrawl_interval (float): Shortest time between two crawls of a shop in seconds (default is 900).
+        --max_recrawl_interval (float): Longest time between two crawls of a shop in seconds (default is 86400).
+        --discovery_interval (float): Seconds between two fetches of the main pages looking for new shops (default is 3600).
+        --metrics-out (str): Path of the JSON run report with request, parse and stage metrics; a Prometheus 
+            text-format export is written next to it with a `.prom` extension (default is None, meaning no metrics).
+        --profile (str): Directory receiving a CPU profile and allocation statistics per stage (fetch, main-page parse, 
+            detail parse, extraction, serialization); a top-N summary is printed at the end (default is None, meaning no profiling).
+            Detail pages are parsed on the event loop's thread while profiling.
+        --profile_top (int): Number of functions and allocation sites listed per stage in the summary (default is 20).
+        --verbose (bool): Flag to enable verbose logging (default is False).
+        --log_file (str): Path to the log file (default is None, meaning logs are printed to the console).
+
+    Subcommands:
+        parse FILES: Parses local detail page HTML files (paths or glob patterns) into the output file 
+            without network access, see `parse_files`.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+    """
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    from fetchers.fetcher import Fetcher
+    from fetchers.replay_fetcher import ReplayFetcher
+    from fetchers.cache import ResponseCache
+    from fetchers.retry import CircuitBreaker, RetryPolicy
+    from fetchers.latency import AdaptiveTimeout, HedgePolicy
+    from fetchers.image_downloader import ImageDownloader
+    from parsers.controllers.parser_controller import ParserController
+    from storage.state_store import StateStore
+    from storage.page_archive import PageArchive
+    from metrics.registry import MetricsRegistry
+    from metrics.profiler import InlineExecutor, StageProfiler
+
+    logger = configure_logging(args)
 
     # Main Logic: ParserController (Fetching + Parsing)
+    metrics = MetricsRegistry() if args.metrics_out else None
+    cache = ResponseCache(args.cache_dir, args.cache_max_mb * 1024 * 1024, logger=logger) if args.cache_dir else None
+    retry_policy = RetryPolicy(max_retries=args.max_retries, backoff_base=args.retry_backoff)
+    circuit_breaker = CircuitBreaker(
+        failure_threshold=args.circuit_breaker_threshold,
+        reset_timeout=args.circuit_breaker_reset
+    ) if args.circuit_breaker_threshold > 0 else None
+    archive = PageArchive(args.record, logger=logger) if args.record else None
+    if args.replay:
+        fetcher = ReplayFetcher(PageArchive(args.replay, logger=logger), until=args.replay_until, logger=logger, metrics=metrics)
+        meta = fetcher.get_meta()
+        if meta and args.base_url == DEFAULT_BASE_URL:
+            args.base_url = meta["base_url"]
+        if meta and args.category == [category + "/" for category in DEFAULT_CATEGORIES]:
+            args.category = meta["categories"]
+        if args.download_thumbnails:
+            logger.warning("Thumbnails are not downloaded when replaying an archive")
+            args.download_thumbnails = False
+    else:
+        fetcher = Fetcher(
+            timeout=args.fetcher_timeout,
+            logger=logger,
+            max_concurrency=args.max_concurrency,
+            rate_limit=args.rate_limit,
+            http2=args.http2,
+            cache=cache,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            metrics=metrics,
+            archive=archive,
+            stream_regions=args.stream_regions,
+            max_response_bytes=int(args.max_response_mb * 1024 * 1024) if args.max_response_mb else None,
+            adaptive_timeout=AdaptiveTimeout() if args.adaptive_timeout else None,
+            hedge_policy=HedgePolicy(max_ratio=args.max_hedge_ratio) if args.hedge_requests else None
+        )
+    if archive:
+        archive.write_meta(args.base_url, args.category)
+    if args.profile:
+        # Stages are profiled per thread, so parsing runs on the event loop's thread
+        parse_executor = InlineExecutor()
+    else:
+        executor_class = ProcessPoolExecutor if args.parse_backend == "process" else ThreadPoolExecutor
+        parse_executor = executor_class(max_workers=args.parse_workers or os.cpu_count())
+    image_downloader = ImageDownloader(
+        fetcher,
+        args.thumbnail_dir,
+        max_concurrency=args.thumbnail_workers,
+        logger=logger
+    ) if args.download_thumbnails else None
+    if args.daemon and args.incremental:
+        # The scheduler needs every flyer of a recrawled shop, not only the new ones
+        logger.warning("--incremental is ignored in daemon mode")
+        args.incremental = False
+    if args.valid_on and args.incremental:
+        # Pages would be recorded as seen although only part of their flyers were emitted
+        logger.warning("--incremental is ignored with --valid_on")
+        args.incremental = False
+    state_store = StateStore(args.state_db) if args.incremental else None
     parser_controller = ParserController(
         base_url=args.base_url,
         category=args.category, 
         fetcher_timeout=args.fetcher_timeout,
-        logger=logger
+        verbose=args.verbose,
+        logger=logger,
+        fetcher=fetcher,
+        parse_executor=parse_executor,
+        state_store=state_store,
+        parse_concurrency=args.parse_workers,
+        image_downloader=image_downloader,
+        metrics=metrics,
+        max_inflight_bytes=int(args.max_inflight_mb * 1024 * 1024) if args.max_inflight_mb else None,
+        shop_filter=args.shop_filter,
+        valid_on=args.valid_on
     )
 
-    _ = await parser_controller.process()
-    parser_controller.save_output(args.output)
+    profiler = StageProfiler(args.profile, top=args.profile_top) if args.profile else None
+    if profiler:
+        profiler.start()
+    try:
+        if args.daemon:
+            await crawl_daemon(args, parser_controller, metrics)
+        elif args.work_queue:
+            await crawl_sharded(args, parser_controller)
+        else:
+            await parser_controller.stream_output(args.output, output_format=args.format, compress=args.gzip)
+    finally:
+        if profiler:
+            print(profiler.stop())
+            print(f"Profiles saved to {args.profile}")
+        await parser_controller.close()
+        parse_executor.shutdown()
+        if state_store:
+            state_store.close()
+        if archive:
+            archive.close()
+        if metrics:
+            metrics.write(args.metrics_out)
+
+
+async def crawl_daemon(args: argparse.Namespace, parser_controller: ParserController, metrics: MetricsRegistry = None):
+    """
+    Runs the crawl as a daemon until SIGINT or SIGTERM, recrawling shops when they are due.
+
+    A signal lets the current cycle finish, so the output and metrics are left complete. 
+    The metrics report is rewritten after every cycle.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        parser_controller (ParserController): The controller of this process.
+        metrics (MetricsRegistry, optional): The run's metrics registry. Defaults to None.
+    """
+    import signal
+    import asyncio
+    from parsers.controllers.crawl_scheduler import CrawlScheduler
+
+    scheduler = CrawlScheduler(
+        parser_controller,
+        args.output,
+        output_format=args.format,
+        compress=args.gzip,
+        min_interval=args.min_recrawl_interval,
+        max_interval=args.max_recrawl_interval,
+        discovery_interval=args.discovery_interval,
+        on_cycle=(lambda: metrics.write(args.metrics_out)) if metrics else None,
+        logger=parser_controller.logger,
+        verbose=args.verbose
+    )
+    loop = asyncio.get_running_loop()
+    for signal_number in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signal_number, scheduler.stop)
+    try:
+        await scheduler.run()
+    finally:
+        for signal_number in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signal_number)
+
+
+async def crawl_sharded(args: argparse.Namespace, parser_controller: ParserController):
+    """
+    Runs this process' role of a sharded crawl coordinated through a SQLite work queue.
+
+    With `--workers N` the process starts N - 1 additional local worker processes (same 
+    arguments, role "work") and works on the queue itself. Files written per process 
+    (`--record`, `--metrics-out`, `--profile`) get the worker ID appended in the helpers.
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+        parser_controller (ParserController): The controller of this process.
+    """
+    import socket
+    import asyncio
+    import subprocess
+    from storage.work_queue import WorkQueue
+
+    work_queue = WorkQueue(args.work_queue, lease_timeout=args.lease_timeout)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    try:
+        if args.shard_role in ("all", "enqueue"):
+            await parser_controller.enqueue_shops(work_queue)
+        if args.shard_role in ("all", "work"):
+            helpers = [
+                subprocess.Popen([sys.executable, os.path.abspath(__file__), *sys.argv[1:], *_helper_args(args, f"{worker_id}-{index}")])
+                for index in range(1, args.workers)
+            ]
+            try:
+                await parser_controller.crawl_queue(work_queue, worker_id, args.parts_dir, batch_size=args.claim_batch)
+            finally:
+                for helper in helpers:
+                    await asyncio.to_thread(helper.wait)
+        if args.shard_role in ("all", "merge"):
+            parser_controller.merge_outputs(work_queue, args.output, output_format=args.format, compress=args.gzip)
+    finally:
+        work_queue.close()
+
+
+def _helper_args(args: argparse.Namespace, worker_id: str) -> list[str]:
+    """
+    Builds the extra arguments of a local helper worker process (later arguments override earlier ones).
+    """
+    helper_args = ["--shard_role", "work", "--workers", "1", "--worker_id", worker_id]
+    if args.record:
+        helper_args += ["--record", _worker_path(args.record, worker_id)]
+    if args.metrics_out:
+        helper_args += ["--metrics_out", _worker_path(args.metrics_out, worker_id)]
+    if args.profile:
+        helper_args += ["--profile", os.path.join(args.profile, worker_id)]
+    return helper_args
+
+
+def _worker_path(path: str, worker_id: str) -> str:
+    directory, name = os.path.split(path)
+    stem, dot, extensions = name.partition(".")
+    return os.path.join(directory, f"{stem}-{worker_id}{dot}{extensions}")
+
+
+def parse_files(args: argparse.Namespace) -> int:
+    """
+    Parses local detail page HTML files into the output file (the `parse` subcommand).
+
+    Runs synchronously on the current thread and imports only the detail page parser and 
+    the writers, neither `httpx` nor `asyncio`, so short-lived offline jobs start quickly.
+
+    Command-line arguments:
+        files (list[str]): Detail page HTML files or glob patterns.
+        --shop_name (str): The shop name of the flyers (default is None, meaning the file name without extension).
+        --valid_on (date): Only brochures valid on this day (YYYY-MM-DD) are extracted (default is None, meaning all brochures).
+        --output (str): The output file path (default is 'data/output.<format>').
+        --format (str): The output format, "json", "ndjson", "csv" or "store" (default is "json").
+        --gzip (bool): Flag to gzip-compress the output file (default is False).
+        --verbose (bool): Flag to enable verbose logging (default is False).
+        --log_file (str): Path to the log file (default is None, meaning logs are printed to the console).
+
+    Args:
+        args (argparse.Namespace): The parsed command-line arguments.
+
+    Returns:
+        int: The number of written flyers.
+    """
+    from parsers.detail_page_parser import DetailPageParser
+    from extractors.extractor import FlyerDataExtractor
+    from writers.flyer_writer import get_writer
+
+    logger = configure_logging(args)
+    paths = sorted({path for pattern in args.files for path in (glob.glob(pattern) or [pattern])})
+    detail_page_parser = DetailPageParser(data_extractor=FlyerDataExtractor(valid_on=args.valid_on))
+    with get_writer(args.format, args.output, compress=args.gzip) as writer:
+        for path in paths:
+            try:
+                with open(path, encoding="UTF-8") as html_file:
+                    detail_page_html = html_file.read()
+            except OSError as e:
+                logger.error(f"Error reading {path}: {e}")
+                continue
+            detail_page_parser.set_shop_name(args.shop_name or os.path.splitext(os.path.basename(path))[0])
+            writer.write_many(detail_page_parser.parse(detail_page_html))
+    if args.verbose:
+        logger.info(f"{writer.get_written()} flyers from {len(paths)} files saved to {writer.get_output_path()}")
+    return writer.get_written()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    args = parse_arguments()
+    if args.command == "parse":
+        parse_files(args)
+    else:
+        import asyncio
+        asyncio.run(main(args))
\ No newline at end of file
@@ -0,0 +1,315 @@
+import io
+import os
+import time
+import pstats
+import cProfile
+import threading
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Executor, Future
+
+STAGES = ("fetch", "main_page_parse", "detail_parse", "extract", "serialize")
+
+_active_profiler = None
+_null_stage = nullcontext()
+
+
+def profile_stage(stage: str):
+    """
+    Profiles a pipeline stage with the active StageProfiler.
+
+    Components wrap their stages in `with profile_stage("..."):`. Without an active
+    profiler this returns a shared no-op context manager, so the hook costs next to nothing.
+
+    Args:
+        stage (str): The stage name (see `STAGES`).
+
+    Returns:
+        A context manager profiling the `with` block.
+    """
+    profiler = _active_profiler
+    return profiler.stage(stage) if profiler else _null_stage
+
+
+def profile_snapshot(label: str):
+    """
+    Takes a tracemalloc snapshot with the active StageProfiler (no-op without one).
+
+    Args:
+        label (str): Name of the phase boundary (used as file name).
+    """
+    if _active_profiler:
+        _active_profiler.snapshot(label)
+
+
+class _StageStats:
+    """
+    Time and allocation totals of a single stage.
+    """
+    __slots__ = ("entries", "wall_time", "cpu_time", "allocated", "peak")
+
+    def __init__(self):
+        self.entries = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.allocated = 0
+        self.peak = 0
+
+
+class _Frame:
+    """
+    A stage entered on a thread and not exited yet.
+    """
+    __slots__ = ("stage", "profile", "start", "cpu_start", "nested_cpu_time", "memory_start", "peak")
+
+    def __init__(self, stage: str, profile: cProfile.Profile):
+        self.stage = stage
+        self.profile = profile
+        self.start = time.perf_counter()
+        self.cpu_start = time.thread_time()
+        self.nested_cpu_time = 0.0
+        self.memory_start = 0
+        self.peak = 0
+
+
+class StageProfiler:
+    """
+    Collects a CPU profile and allocation statistics per pipeline stage.
+
+    Every stage has its own `cProfile.Profile` which is enabled only while the stage runs.
+    Stages nest: entering a stage (e.g. extraction inside detail page parsing) pauses the
+    profile of the enclosing stage, so each profile contains only the stage's own work. The
+    "fetch" stage encloses the whole crawl, it therefore also holds the event loop's time
+    waiting for the network, which stays out of the parse and serialization profiles.
+
+    The summary lists per stage the wall time (including nested stages) and the CPU time of
+    the stage's own work (`time.thread_time`, excluding nested stages), which also covers
+    native code such as the HTML parser that the profile attributes to no Python function.
+
+    With `trace_memory`, `tracemalloc` runs during the whole profile. For every stage the net
+    size of the allocations it kept and the peak memory above its start are recorded (including
+    nested stages), and snapshots are taken at phase boundaries (`snapshot`).
+
+    Profiles are per thread, so stages should run on the thread of the event loop
+    (see `InlineExecutor`).
+
+    Results written by `stop` to `output_dir`:
+
+    - `<stage>.prof`: the stage's CPU profile, loadable by `pstats` or snakeviz,
+    - `<label>.snapshot`: tracemalloc snapshots, loadable by `tracemalloc.Snapshot.load`,
+    - `summary.txt`: the top-N summary also returned by `stop`.
+
+    Attributes:
+        output_dir (str): Directory receiving the profiles.
+        top (int): Number of functions and allocation sites listed per stage in the summary.
+        trace_memory (bool): Whether allocations are traced.
+        _stats (dict[str, _StageStats]): Time and allocation totals per stage.
+        _profiles (dict[tuple[int, str], cProfile.Profile]): Profile per thread and stage.
+        _snapshots (list[tuple[str, tracemalloc.Snapshot]]): Snapshots taken at phase boundaries.
+        _local (threading.local): Stack of the stages entered on the current thread.
+        _lock (threading.Lock): Guards the shared dictionaries.
+    """
+
+    def __init__(self, output_dir: str, top: int = 20, trace_memory: bool = True):
+        """
+        Initializes the StageProfiler.
+
+        Args:
+            output_dir (str): Directory receiving the profiles.
+            top (int, optional): Number of entries per stage in the summary. Defaults to 20.
+            trace_memory (bool, optional): Traces allocations with tracemalloc. Defaults to True.
+        """
+        self.output_dir = output_dir
+        self.top = top
+        self.trace_memory = trace_memory
+        self._stats = {}
+        self._profiles = {}
+        self._snapshots = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Activates the profiler for `profile_stage` hooks and starts tracing allocations.
+        """
+        global _active_profiler
+        if self.trace_memory:
+            tracemalloc.start()
+            self.snapshot("start")
+        _active_profiler = self
+
+    def stop(self) -> str:
+        """
+        Deactivates the profiler and writes the profiles, snapshots and summary to `output_dir`.
+
+        Returns:
+            str: The top-N summary.
+        """
+        global _active_profiler
+        _active_profiler = None
+        if self.trace_memory:
+            self.snapshot("end")
+            tracemalloc.stop()
+        os.makedirs(self.output_dir, exist_ok=True)
+        stage_stats = self._merge_profiles()
+        for stage, stats in stage_stats.items():
+            stats.dump_stats(os.path.join(self.output_dir, f"{stage}.prof"))
+        for label, snapshot in self._snapshots:
+            snapshot.dump(os.path.join(self.output_dir, f"{label}.snapshot"))
+        summary = self._summary(stage_stats)
+        with open(os.path.join(self.output_dir, "summary.txt"), "w", encoding="UTF-8") as summary_file:
+            summary_file.write(summary)
+        return summary
+
+    def snapshot(self, label: str):
+        """
+        Takes a tracemalloc snapshot at a phase boundary.
+
+        Args:
+            label (str): Name of the phase boundary (used as file name).
+        """
+        if not (self.trace_memory and tracemalloc.is_tracing()):
+            return
+        stack = self._stack()
+        if stack:
+            stack[-1].profile.disable()
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        with self._lock:
+            self._snapshots.append((label, snapshot))
+        if stack:
+            stack[-1].profile.enable()
+
+    @contextmanager
+    def stage(self, stage: str):
+        """
+        Profiles the `with` block as `stage`, pausing the enclosing stage's profile meanwhile.
+
+        Args:
+            stage (str): The stage name.
+        """
+        stack = self._stack()
+        outer = stack[-1] if stack else None
+        if outer:
+            outer.profile.disable()
+        frame = _Frame(stage, self._profile(stage))
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if outer:
+                outer.peak = max(outer.peak, peak)
+            tracemalloc.reset_peak()
+            frame.memory_start = frame.peak = current
+        stack.append(frame)
+        frame.profile.enable()
+        try:
+            yield
+        finally:
+            frame.profile.disable()
+            cpu_time = time.thread_time() - frame.cpu_start
+            stack.remove(frame)
+            with self._lock:
+                stats = self._stats.get(stage)
+                if stats is None:
+                    stats = self._stats[stage] = _StageStats()
+                stats.entries += 1
+                stats.wall_time += time.perf_counter() - frame.start
+                stats.cpu_time += cpu_time - frame.nested_cpu_time
+                if self.trace_memory:
+                    current, peak = tracemalloc.get_traced_memory()
+                    stats.allocated += current - frame.memory_start
+                    stats.peak = max(stats.peak, max(frame.peak, peak) - frame.memory_start)
+            if outer:
+                outer.nested_cpu_time += cpu_time
+                outer.peak = max(outer.peak, frame.peak, tracemalloc.get_traced_memory()[1] if self.trace_memory else 0)
+                outer.profile.enable()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _profile(self, stage: str) -> cProfile.Profile:
+        key = (threading.get_ident(), stage)
+        profile = self._profiles.get(key)
+        if profile is None:
+            with self._lock:
+                profile = self._profiles.setdefault(key, cProfile.Profile())
+        return profile
+
+    def _merge_profiles(self) -> dict[str, pstats.Stats]:
+        """
+        Merges the per-thread profiles of every stage.
+
+        Returns:
+            dict[str, pstats.Stats]: The merged statistics per stage.
+        """
+        stage_stats = {}
+        for (_, stage), profile in self._profiles.items():
+            if stage in stage_stats:
+                stage_stats[stage].add(profile)
+            else:
+                stage_stats[stage] = pstats.Stats(profile, stream=io.StringIO())
+        return stage_stats
+
+    def _summary(self, stage_stats: dict[str, pstats.Stats]) -> str:
+        """
+        Renders the top-N CPU functions of every stage and the top-N allocation sites of the run.
+
+        Args:
+            stage_stats (dict[str, pstats.Stats]): The merged statistics per stage.
+
+        Returns:
+            str: The summary text.
+        """
+        lines = [f"{'stage':<16} {'entries':>8} {'wall s':>10} {'own cpu s':>10} {'kept KiB':>10} {'peak KiB':>10}"]
+        ordered_stages = sorted(self._stats, key=lambda stage: STAGES.index(stage) if stage in STAGES else len(STAGES))
+        for stage in ordered_stages:
+            stats = self._stats[stage]
+            lines.append(
+                f"{stage:<16} {stats.entries:>8} {stats.wall_time:>10.3f} {stats.cpu_time:>10.3f} "
+                f"{stats.allocated / 1024:>10.1f} {stats.peak / 1024:>10.1f}"
+            )
+        for stage in ordered_stages:
+            if stage not in stage_stats:
+                continue
+            stream = io.StringIO()
+            stage_stats[stage].stream = stream
+            stage_stats[stage].sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+            lines.append(f"\n=== {stage}: top {self.top} functions by own time ===")
+            lines.append(_strip_header(stream.getvalue()))
+        if len(self._snapshots) >= 2:
+            (first_label, first), (last_label, last) = self._snapshots[0], self._snapshots[-1]
+            lines.append(f"\n=== top {self.top} allocation sites ({first_label} -> {last_label}) ===")
+            for difference in last.compare_to(first, "lineno")[:self.top]:
+                lines.append(str(difference))
+        return "\n".join(lines) + "\n"
+
+
+def _strip_header(pstats_output: str) -> str:
+    """
+    Drops the blank lines and the file name header `pstats` prints before the table.
+    """
+    lines = pstats_output.strip("\n").splitlines()
+    while lines and "function calls" not in lines[0]:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class InlineExecutor(Executor):
+    """
+    An executor running every submitted call immediately on the submitting thread.
+
+    Used while profiling, so detail pages are parsed on the event loop's thread where
+    their stages are profiled without other threads interfering.
+    """
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
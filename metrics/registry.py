@@ -0,0 +1,286 @@
+import os
+import json
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    A cumulative histogram of observed values with fixed bucket bounds (Prometheus style).
+
+    Attributes:
+        buckets (tuple[float, ...]): Upper bounds of the buckets (an implicit +Inf bucket follows).
+        counts (list[int]): Number of observations per bucket (not cumulative).
+        count (int): Number of observations.
+        sum (float): Sum of the observed values.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram"):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.count += other.count
+        self.sum += other.sum
+
+    def quantile(self, fraction: float) -> float:
+        """
+        Estimates a quantile by linear interpolation inside the bucket containing it.
+
+        Args:
+            fraction (float): The quantile as a fraction (e.g. 0.99).
+
+        Returns:
+            float: The estimated value (the largest finite bound if it falls into the +Inf bucket).
+        """
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if seen + count >= rank and count:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                return lower + (self.buckets[index] - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """
+    A registry of the counters and histograms recorded during a run.
+
+    The registry is passed to the Fetcher, the parsers, the extractor and the ParserController,
+    the same way as the logger, and every component records what it measured into it:
+
+    - counters (`inc`), e.g. responses per status code or bytes downloaded,
+    - histograms (`observe`, `time`), e.g. request latencies or stage durations.
+
+    Every metric may carry labels given as keyword arguments (e.g. `status=200`). The registry
+    can be exported as a JSON run report (`to_dict`) and in the Prometheus text exposition
+    format (`to_prometheus`). Registries filled in executor workers are combined with `merge`.
+
+    Attributes:
+        namespace (str): Prefix of the metric names in the Prometheus export.
+        started_at (str): Creation time of the registry (ISO format).
+        _counters (dict[tuple[str, tuple], float]): Counter values keyed by name and labels.
+        _histograms (dict[tuple[str, tuple], Histogram]): Histograms keyed by name and labels.
+        _lock (threading.Lock): Guards updates from parse executor threads.
+    """
+
+    def __init__(self, namespace: str = "flyer_scraper"):
+        """
+        Initializes an empty MetricsRegistry.
+
+        Args:
+            namespace (str, optional): Prefix of the metric names in the Prometheus export. Defaults to "flyer_scraper".
+        """
+        self.namespace = namespace
+        self.started_at = datetime.now().isoformat()
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """
+        Increments a counter.
+
+        Args:
+            name (str): The metric name.
+            value (float, optional): The increment. Defaults to 1.
+            **labels: Label values of the series.
+        """
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Records a value in a histogram.
+
+        Args:
+            name (str): The metric name.
+            value (float): The observed value (seconds for durations).
+            **labels: Label values of the series.
+        """
+        key = _series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def time(self, name: str, **labels):
+        """
+        Records the duration of the `with` block in a histogram, even if the block raises.
+
+        Args:
+            name (str): The metric name.
+            **labels: Label values of the series.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """
+        Retrieves the value of a counter.
+
+        Returns:
+            float: The counter value (0 if it was never incremented).
+        """
+        return self._counters.get(_series_key(name, labels), 0)
+
+    def get_histogram(self, name: str, **labels) -> Histogram:
+        """
+        Retrieves a histogram.
+
+        Returns:
+            Histogram: The histogram, or None if nothing was observed.
+        """
+        return self._histograms.get(_series_key(name, labels))
+
+    def merge(self, other: "MetricsRegistry"):
+        """
+        Adds the counters and histograms of another registry (e.g. filled in a worker) to this one.
+
+        Args:
+            other (MetricsRegistry): The registry to merge.
+        """
+        with self._lock:
+            for key, value in other._counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, histogram in other._histograms.items():
+                if key in self._histograms:
+                    self._histograms[key].merge(histogram)
+                else:
+                    merged = self._histograms[key] = Histogram(histogram.buckets)
+                    merged.merge(histogram)
+
+    def to_dict(self) -> dict:
+        """
+        Builds the JSON run report.
+
+        Returns:
+            dict: Counters and histogram summaries (count, sum, mean, p50/p95/p99 estimates and buckets).
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items(), key=_by_key)
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "mean": histogram.sum / histogram.count if histogram.count else 0.0,
+                    "p50": histogram.quantile(0.5),
+                    "p95": histogram.quantile(0.95),
+                    "p99": histogram.quantile(0.99),
+                    "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], histogram.counts)),
+                }
+                for (name, labels), histogram in sorted(self._histograms.items(), key=_by_key)
+            ]
+        return {
+            "started_at": self.started_at,
+            "finished_at": datetime.now().isoformat(),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text (counters get a `_total` suffix, histograms `_bucket`, `_sum` and `_count` series).
+        """
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._counters}):
+                metric = f"{self.namespace}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                for (series, labels), value in sorted(self._counters.items(), key=_by_key):
+                    if series == name:
+                        lines.append(f"{metric}{_format_labels(labels)} {value}")
+            for name in sorted({name for name, _ in self._histograms}):
+                metric = f"{self.namespace}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for (series, labels), histogram in sorted(self._histograms.items(), key=_by_key):
+                    if series != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip([*map(str, histogram.buckets), "+Inf"], histogram.counts):
+                        cumulative += count
+                        lines.append(f"{metric}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{metric}_sum{_format_labels(labels)} {histogram.sum}")
+                    lines.append(f"{metric}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, output_path: str):
+        """
+        Writes the JSON run report to `output_path` and the Prometheus export next to it.
+
+        The Prometheus file has the same name with a `.prom` extension (replacing `.json`).
+
+        Args:
+            output_path (str): Path of the JSON report.
+        """
+        directory = os.path.dirname(output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(output_path, "w", encoding="UTF-8") as output_file:
+            json.dump(self.to_dict(), output_file, indent=2)
+        root, extension = os.path.splitext(output_path)
+        prometheus_path = (root if extension == ".json" else output_path) + ".prom"
+        with open(prometheus_path, "w", encoding="UTF-8") as output_file:
+            output_file.write(self.to_prometheus())
+
+
+def _series_key(name: str, labels: dict) -> tuple[str, tuple]:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _by_key(item: tuple):
+    return item[0]
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label(value)}"' for name, value in labels) + "}"
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
@@ -0,0 +1,222 @@
+import sys
+from array import array
+from datetime import date, datetime
+from typing import Iterable, Iterator
+from .flyer_data import FlyerData, FLYER_FIELDS
+
+
+class FlyerBatch:
+    """
+    A memory-lean, columnar container of many flyers.
+
+    Every FlyerData field is stored in its own column instead of one object per flyer:
+
+    - shop names and category lists are dictionary encoded: each distinct (interned) value is
+      stored once and the rows hold its index in an `array('I')`,
+    - validity dates are stored as proleptic Gregorian ordinals in an `array('i')`
+      (0 for a missing date); values that are not plain dates are kept verbatim in a small
+      side table,
+    - the whole batch shares a single parse timestamp.
+
+    Rows are materialized lazily, either as FlyerData objects (`__iter__`, `__getitem__`) or
+    in bulk as dictionaries and tuples for serialization (`to_dicts`, `to_rows`).
+
+    Attributes:
+        parsed_time (str): The parse timestamp shared by all flyers of the batch (ISO format).
+        _titles (list[str]): Title column.
+        _thumbnails (list[str]): Thumbnail URL column.
+        _thumbnail_paths (list[str]): Local image path column.
+        _shop_ids (array): Shop name column (indexes into `_shops`).
+        _category_ids (array): Category list column (indexes into `_categories`).
+        _valid_from (array): Start date column (date ordinals).
+        _valid_to (array): End date column (date ordinals).
+        _shops (list[str]): Distinct interned shop names.
+        _categories (list[tuple[str, ...]]): Distinct category lists.
+        _raw_dates (dict[tuple[int, int], str]): Dates that are not plain ISO dates, keyed by (column, row).
+        _expired (set[int]): Rows of the flyers marked as expired (rare, so not stored as a column).
+    """
+
+    FIELDS = FLYER_FIELDS
+    MISSING_DATE = 0
+    RAW_DATE = -1
+
+    def __init__(self, parsed_time: str = None):
+        """
+        Initializes an empty FlyerBatch.
+
+        Args:
+            parsed_time (str, optional): The parse timestamp shared by the batch. Defaults to None (current time in ISO format).
+        """
+        self.parsed_time = parsed_time or datetime.now().isoformat()
+        self._titles = []
+        self._thumbnails = []
+        self._thumbnail_paths = []
+        self._shop_ids = array("I")
+        self._category_ids = array("I")
+        self._valid_from = array("i")
+        self._valid_to = array("i")
+        self._shops = []
+        self._shop_lookup = {}
+        self._categories = [()]
+        self._category_lookup = {(): 0}
+        self._raw_dates = {}
+        self._expired = set()
+        self._iso_dates = {self.MISSING_DATE: ""}
+
+    @classmethod
+    def from_flyers(cls, flyers: Iterable[FlyerData], parsed_time: str = None) -> "FlyerBatch":
+        """
+        Builds a batch from FlyerData objects.
+
+        Args:
+            flyers (Iterable[FlyerData]): The flyers to store.
+            parsed_time (str, optional): The parse timestamp shared by the batch. Defaults to None (current time).
+
+        Returns:
+            FlyerBatch: The filled batch.
+        """
+        batch = cls(parsed_time)
+        batch.extend(flyers)
+        return batch
+
+    def __len__(self) -> int:
+        return len(self._titles)
+
+    def __getitem__(self, index: int) -> FlyerData:
+        """
+        Materializes a single row as a FlyerData object.
+
+        Args:
+            index (int): The row index.
+
+        Returns:
+            FlyerData: The flyer stored in the row.
+        """
+        return FlyerData(*self._row(range(len(self))[index]))
+
+    def __iter__(self) -> Iterator[FlyerData]:
+        for row in self.iter_rows():
+            yield FlyerData(*row)
+
+    def append(self, flyer: FlyerData):
+        """
+        Appends a flyer to the batch. Its own parse timestamp is replaced by the batch's.
+
+        Args:
+            flyer (FlyerData): The flyer to store.
+        """
+        row = len(self._titles)
+        self._titles.append(flyer.title)
+        self._thumbnails.append(flyer.thumbnail)
+        self._thumbnail_paths.append(flyer.thumbnail_path)
+        self._shop_ids.append(self._encode(flyer.shop_name, self._shops, self._shop_lookup))
+        self._category_ids.append(self._encode(tuple(flyer.categories), self._categories, self._category_lookup))
+        self._valid_from.append(self._encode_date(flyer.valid_from, 0, row))
+        self._valid_to.append(self._encode_date(flyer.valid_to, 1, row))
+        if flyer.expired:
+            self._expired.add(row)
+
+    def extend(self, flyers: Iterable[FlyerData]):
+        """
+        Appends several flyers to the batch.
+
+        Args:
+            flyers (Iterable[FlyerData]): The flyers to store.
+        """
+        for flyer in flyers:
+            self.append(flyer)
+
+    def get_shops(self) -> list[str]:
+        """
+        Retrieves the distinct shop names of the batch.
+
+        Returns:
+            list[str]: The shop names in order of first appearance.
+        """
+        return list(self._shops)
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """
+        Iterates over the rows as tuples ordered like `FIELDS`.
+
+        Yields:
+            tuple: The field values of a single flyer.
+        """
+        for index in range(len(self)):
+            yield self._row(index)
+
+    def to_rows(self) -> list[tuple]:
+        """
+        Serializes the whole batch into tuples ordered like `FIELDS` (e.g. for CSV writers).
+
+        Returns:
+            list[tuple]: One tuple per flyer.
+        """
+        return list(self.iter_rows())
+
+    def iter_dicts(self) -> Iterator[dict]:
+        """
+        Iterates over the rows as dictionaries keyed by field name.
+
+        Yields:
+            dict: The field values of a single flyer.
+        """
+        fields = self.FIELDS
+        for row in self.iter_rows():
+            yield dict(zip(fields, row))
+
+    def to_dicts(self) -> list[dict]:
+        """
+        Serializes the whole batch into dictionaries keyed by field name (e.g. for JSON writers).
+
+        Returns:
+            list[dict]: One dictionary per flyer.
+        """
+        return list(self.iter_dicts())
+
+    def _row(self, index: int) -> tuple:
+        return (
+            self._titles[index],
+            self._thumbnails[index],
+            self._shops[self._shop_ids[index]],
+            self._decode_date(self._valid_from[index], 0, index),
+            self._decode_date(self._valid_to[index], 1, index),
+            self.parsed_time,
+            list(self._categories[self._category_ids[index]]),
+            self._thumbnail_paths[index],
+            index in self._expired,
+        )
+
+    def _encode(self, value, values: list, lookup: dict) -> int:
+        """
+        Dictionary-encodes a value, storing every distinct value (interned if a string) only once.
+        """
+        index = lookup.get(value)
+        if index is None:
+            index = len(values)
+            values.append(sys.intern(value) if isinstance(value, str) else value)
+            lookup[value] = index
+        return index
+
+    def _encode_date(self, value: str, column: int, row: int) -> int:
+        """
+        Encodes an ISO midnight datetime (as produced by the extractor) as a date ordinal, keeping other values verbatim.
+        """
+        if not value:
+            return self.MISSING_DATE
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            parsed = None
+        if parsed is None or parsed.isoformat() != value or parsed.time() != datetime.min.time():
+            self._raw_dates[(column, row)] = value
+            return self.RAW_DATE
+        return parsed.toordinal()
+
+    def _decode_date(self, ordinal: int, column: int, row: int) -> str:
+        if ordinal == self.RAW_DATE:
+            return self._raw_dates[(column, row)]
+        iso_date = self._iso_dates.get(ordinal)
+        if iso_date is None:
+            iso_date = self._iso_dates[ordinal] = datetime.combine(date.fromordinal(ordinal), datetime.min.time()).isoformat()
+        return iso_date
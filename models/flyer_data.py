@@ -1,13 +1,16 @@
 import json
 from datetime import datetime
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field, fields
 
-@dataclass
+@dataclass(slots=True)
 class FlyerData:
     """
     A data model representing a flyer, including its title, thumbnail, shop name, 
     validity period, and the time it was parsed.
 
+    The class is slotted (no per-instance `__dict__`) to keep large collections of flyers 
+    memory-lean. For columnar storage of many flyers see `FlyerBatch`.
+
     Attributes:
         title (str): The title of the flyer.
         thumbnail (str): The URL of the flyer's thumbnail image.
@@ -15,6 +18,9 @@ class FlyerData:
         valid_from (str): The start date of the flyer's validity period (ISO 8601 format).
         valid_to (str): The end date of the flyer's validity period (ISO 8601 format).
         parsed_time (str): The timestamp when the flyer was parsed (default: current time in ISO format).
+        categories (list[str]): The categories whose shop listings contain the flyer's shop (default: empty list).
+        thumbnail_path (str): Local path of the downloaded better-quality image (default: empty, not downloaded).
+        expired (bool): Marks a flyer reported again by an incremental crawl because its validity ended (default: False).
     """
     title: str
     thumbnail: str
@@ -22,6 +28,30 @@ class FlyerData:
     valid_from: str
     valid_to: str
     parsed_time: str = field(default_factory=lambda: datetime.now().isoformat())
+    categories: list[str] = field(default_factory=list)
+    thumbnail_path: str = ""
+    expired: bool = False
+
+    def to_dict(self) -> dict:
+        """
+        Converts the FlyerData instance into a dictionary.
+
+        Unlike `dataclasses.asdict` the values are not deep-copied, only the categories list is copied.
+
+        Returns:
+            dict: The flyer data keyed by field name.
+        """
+        return {
+            "title": self.title,
+            "thumbnail": self.thumbnail,
+            "shop_name": self.shop_name,
+            "valid_from": self.valid_from,
+            "valid_to": self.valid_to,
+            "parsed_time": self.parsed_time,
+            "categories": list(self.categories),
+            "thumbnail_path": self.thumbnail_path,
+            "expired": self.expired,
+        }
 
     def to_json(self) -> str:
         """
@@ -30,4 +60,7 @@ class FlyerData:
         Returns:
             str: A JSON representation of the flyer data.
         """
-        return json.dumps(asdict(self), indent=2)
+        return json.dumps(self.to_dict(), indent=2)
+
+
+FLYER_FIELDS = tuple(f.name for f in fields(FlyerData))
@@ -0,0 +1,261 @@
+import math
+import time
+import heapq
+import asyncio
+import logging
+from typing import Callable
+from datetime import datetime, timedelta
+from models.flyer_data import FlyerData
+from writers.flyer_writer import get_writer
+from parsers.controllers.parser_controller import ParserController
+
+
+class _ShopSchedule:
+    """
+    Crawl state of a single shop.
+    """
+    __slots__ = ("shop_name", "url", "flyers", "next_due", "failures")
+
+    def __init__(self, shop_name: str, url: str, next_due: float):
+        self.shop_name = shop_name
+        self.url = url
+        self.flyers = []
+        self.next_due = next_due
+        self.failures = 0
+
+
+class CrawlScheduler:
+    """
+    Keeps a crawl running in a long-lived process and recrawls every shop on its own schedule.
+
+    One event loop, one pooled Fetcher and one parse pool serve all cycles. The main pages are
+    fetched every `discovery_interval` seconds to pick up new shops (crawled right away) and to
+    drop shops no longer listed. Every shop is recrawled when it is due, and its next crawl is
+    scheduled from the validity of the flyers it lists:
+
+    - all flyers valid for a long time: after `max_interval`,
+    - the earliest flyer expiring soon: after half the time left until it expires, so polls
+      get more frequent as the expiry approaches, but not more often than every `min_interval`,
+    - a flyer expired within the last `max_interval`: after `min_interval`, as its successor
+      is about to be published,
+    - no flyer with a known end date: after the geometric mean of both bounds,
+    - a failed fetch: after `min_interval`, doubled with every further failure up to
+      `max_interval`. The shop's previous flyers are kept meanwhile.
+
+    A flyer is valid until the end of its `valid_to` day (local time). After every cycle the
+    output file is rewritten with the current flyers of all shops and published atomically.
+
+    Attributes:
+        parser_controller (ParserController): Controller fetching and parsing the pages.
+        output_path (str): Path of the output file.
+        output_format (str): Output format, "json", "ndjson" or "csv".
+        compress (bool): Whether the output is gzip compressed.
+        min_interval (float): Shortest time between two crawls of a shop in seconds.
+        max_interval (float): Longest time between two crawls of a shop in seconds.
+        discovery_interval (float): Time between two fetches of the main pages in seconds.
+        on_cycle (Callable[[], None]): Called after every cycle, e.g. to export metrics (None skips it).
+        logger (logging.Logger): Logger instance for logging events.
+        verbose (bool): Flag to enable verbose logging.
+        _shops (dict[str, _ShopSchedule]): Crawl state of the listed shops keyed by detail page URL.
+        _due (list[tuple[float, str]]): Heap of (due time, URL); entries not matching the shop's `next_due` are stale.
+        _next_discovery (float): Time of the next main page fetch.
+        _stop_event (asyncio.Event): Set to end `run` after the current cycle.
+    """
+
+    def __init__(
+            self,
+            parser_controller: ParserController,
+            output_path: str,
+            output_format: str = "json",
+            compress: bool = False,
+            min_interval: float = 900,
+            max_interval: float = 86400,
+            discovery_interval: float = 3600,
+            on_cycle: Callable[[], None] = None,
+            logger: logging.Logger = None,
+            verbose: bool = False):
+        """
+        Initializes the CrawlScheduler.
+
+        Args:
+            parser_controller (ParserController): Controller fetching and parsing the pages.
+            output_path (str): Path of the output file.
+            output_format (str, optional): Output format, "json", "ndjson" or "csv". Defaults to "json".
+            compress (bool, optional): Gzip-compresses the output. Defaults to False.
+            min_interval (float, optional): Shortest time between two crawls of a shop in seconds. Defaults to 900.
+            max_interval (float, optional): Longest time between two crawls of a shop in seconds. Defaults to 86400.
+            discovery_interval (float, optional): Time between two fetches of the main pages in seconds. Defaults to 3600.
+            on_cycle (Callable[[], None], optional): Called after every cycle. Defaults to None.
+            logger (logging.Logger, optional): Logger instance for logging events. Defaults to None.
+            verbose (bool, optional): Flag to enable verbose logging. Defaults to False.
+        """
+        self.parser_controller = parser_controller
+        self.output_path = output_path
+        self.output_format = output_format
+        self.compress = compress
+        self.min_interval = min_interval
+        self.max_interval = max(max_interval, min_interval)
+        self.discovery_interval = discovery_interval
+        self.on_cycle = on_cycle
+        self.logger = logger or parser_controller.logger
+        self.verbose = verbose
+        self._shops = {}
+        self._due = []
+        self._next_discovery = 0.0
+        self._stop_event = asyncio.Event()
+
+    def get_next_due(self, url: str) -> float | None:
+        """
+        Retrieves the time of a shop's next crawl.
+
+        Args:
+            url (str): The detail page URL of the shop.
+
+        Returns:
+            float | None: The due time as a Unix timestamp, None for unknown shops.
+        """
+        shop = self._shops.get(url)
+        return shop.next_due if shop else None
+
+    def stop(self):
+        """
+        Ends `run` once the current cycle is finished (safe to call from a signal handler).
+        """
+        self._stop_event.set()
+
+    async def run(self, cycles: int = None):
+        """
+        Crawls due shops and rewrites the output until `stop` is called.
+
+        Args:
+            cycles (int, optional): Number of cycles after which to return. Defaults to None (run until stopped).
+        """
+        cycle = 0
+        while not self._stop_event.is_set():
+            if time.time() >= self._next_discovery:
+                await self.discover()
+            due_shops = self._pop_due_shops()
+            if due_shops:
+                await self.crawl(due_shops)
+                self.write_output()
+            if self.on_cycle:
+                self.on_cycle()
+            cycle += 1
+            if cycles is not None and cycle >= cycles:
+                break
+            next_wake = min(self._due[0][0], self._next_discovery) if self._due else self._next_discovery
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=max(next_wake - time.time(), 0))
+            except asyncio.TimeoutError:
+                pass
+
+    async def discover(self):
+        """
+        Fetches the main pages, schedules newly listed shops for an immediate crawl and drops shops no longer listed.
+
+        If no shop is found at all (e.g. the site is down), the known shops are kept.
+        """
+        now = time.time()
+        self._next_discovery = now + self.discovery_interval
+        links = await self.parser_controller.fetch_links()
+        if not links:
+            return
+        for url in self._shops.keys() - links.keys():
+            del self._shops[url]
+        added = 0
+        for url, shop_name in links.items():
+            if url not in self._shops:
+                self._shops[url] = _ShopSchedule(shop_name, url, now)
+                heapq.heappush(self._due, (now, url))
+                added += 1
+        if self.verbose:
+            self.logger.info(f"{len(self._shops)} shops listed, {added} new")
+
+    async def crawl(self, shops: list[_ShopSchedule]):
+        """
+        Crawls the given shops and schedules their next crawl.
+
+        Args:
+            shops (list[_ShopSchedule]): The shops to crawl.
+        """
+        results = await self.parser_controller.crawl_shops({shop.url: shop.shop_name for shop in shops})
+        now = time.time()
+        for shop in shops:
+            flyers = results.get(shop.url)
+            if flyers is None:
+                shop.failures += 1
+                interval = min(self.min_interval * 2 ** (shop.failures - 1), self.max_interval)
+            else:
+                shop.failures = 0
+                shop.flyers = flyers
+                interval = self.recrawl_interval(flyers, now)
+            shop.next_due = now + interval
+            heapq.heappush(self._due, (shop.next_due, shop.url))
+        metrics = self.parser_controller.metrics
+        if metrics:
+            metrics.inc("shops_recrawled", len(shops))
+        if self.verbose:
+            self.logger.info(f"Recrawled {len(shops)} shops, next crawl in {self._due[0][0] - now:.0f}s")
+
+    def recrawl_interval(self, flyers: list[FlyerData], now: float) -> float:
+        """
+        Computes the time until a shop is crawled again from the validity of its flyers.
+
+        Args:
+            flyers (list[FlyerData]): The flyers currently listed by the shop.
+            now (float): The current time as a Unix timestamp.
+
+        Returns:
+            float: The interval in seconds, between `min_interval` and `max_interval`.
+        """
+        expiries = [expiry for expiry in map(_expiry_time, flyers) if expiry is not None]
+        if not expiries:
+            return math.sqrt(self.min_interval * self.max_interval)
+        if any(now - self.max_interval < expiry <= now for expiry in expiries):
+            return self.min_interval
+        upcoming = [expiry for expiry in expiries if expiry > now]
+        if not upcoming:
+            return self.max_interval
+        return min(max((min(upcoming) - now) / 2, self.min_interval), self.max_interval)
+
+    def write_output(self) -> int:
+        """
+        Rewrites the output file with the current flyers of all shops and publishes it atomically.
+
+        Returns:
+            int: The number of written flyers.
+        """
+        with get_writer(self.output_format, self.output_path, compress=self.compress) as writer:
+            for shop in self._shops.values():
+                writer.write_many(shop.flyers)
+        if self.verbose:
+            self.logger.info(f"{writer.get_written()} flyers saved to {writer.get_output_path()}")
+        return writer.get_written()
+
+    def _pop_due_shops(self) -> list[_ShopSchedule]:
+        """
+        Removes the shops due by now from the heap, skipping stale entries.
+
+        Returns:
+            list[_ShopSchedule]: The due shops.
+        """
+        now = time.time()
+        due_shops = []
+        while self._due and self._due[0][0] <= now:
+            due, url = heapq.heappop(self._due)
+            shop = self._shops.get(url)
+            if shop is not None and shop.next_due == due:
+                due_shops.append(shop)
+        return due_shops
+
+
+def _expiry_time(flyer: FlyerData) -> float | None:
+    """
+    Converts a flyer's `valid_to` date into the Unix timestamp of the end of that day (None if unknown).
+    """
+    if not flyer.valid_to:
+        return None
+    try:
+        return (datetime.fromisoformat(flyer.valid_to) + timedelta(days=1)).timestamp()
+    except ValueError:
+        return None
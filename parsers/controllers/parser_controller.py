@@ -1,22 +1,47 @@
+import os
+import sys
 import json
+import time
 import asyncio
 import logging
 import itertools
-from dataclasses import asdict
+from datetime import date
+from typing import AsyncIterator
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import Executor
 from fetchers.fetcher import Fetcher
+from fetchers.byte_budget import ByteBudget
+from fetchers.image_downloader import ImageDownloader
+from writers.flyer_writer import get_writer
+from storage.state_store import StateStore
+from storage.work_queue import WorkQueue
 from models.flyer_data import FlyerData
+from metrics.registry import MetricsRegistry
+from metrics.profiler import profile_snapshot, profile_stage
 from parsers.main_page_parser import MainPageParser
 from parsers.detail_page_parser import DetailPageParser
+from parsers.shop_filter import ShopFilter
+from extractors.extractor import FlyerDataExtractor
 
 
 class ParserController:
     def __init__(
             self, 
             base_url: str="https://www.prospektmaschine.de/", 
-            category: str="hypermarkte/", 
+            category: str | list[str]="hypermarkte/", 
             fetcher_timeout: int=10, 
             verbose=False, 
-            logger: logging.Logger=None):
+            logger: logging.Logger=None,
+            fetcher: Fetcher=None,
+            queue_size: int=None,
+            parse_executor: Executor=None,
+            state_store: StateStore=None,
+            parse_concurrency: int=None,
+            image_downloader: ImageDownloader=None,
+            metrics: MetricsRegistry=None,
+            max_inflight_bytes: int=None,
+            shop_filter: ShopFilter=None,
+            valid_on: date=None):
         """
         Controller class for managing the parsing process of main and detail pages.
 
@@ -25,26 +50,67 @@ class ParserController:
 
         Attributes:
             base_url (str): The base URL for the website to scrape.
-            category (str): The category of items to scrape.
+            categories (list[str]): The categories of items to scrape (a single category may be passed as `category`). 
+                The special category "all" crawls every category listed on the home page.
             fetcher_timeout (int): Timeout for fetching data.
             verbose (bool): Flag to enable verbose logging.
             logger (logging.Logger): Logger instance for logging events.
             main_page_parser (MainPageParser): Parser for the main page.
             detail_page_parsers (list): List of detail page parsers.
-            fetcher (Fetcher): Fetcher instance for making HTTP requests.
+            fetcher (Fetcher): Fetcher instance for making HTTP requests. A preconfigured instance 
+                (pooled client, concurrency and rate limits) may be passed in, otherwise one with `fetcher_timeout` is created.
+            queue_size (int): Capacity of the queue between the fetch and parse stages of `iter_flyers` 
+                (None means the Fetcher's maximum concurrency).
+            parse_executor (Executor): Thread or process pool parsing the detail pages off the event loop 
+                (None means the event loop's default thread pool).
+            parse_concurrency (int): Number of detail pages processed at the same time by `iter_flyers` 
+                (None means the number of CPUs).
+            image_downloader (ImageDownloader): Downloads the flyers' better-quality images into a local store 
+                and sets their `thumbnail_path` (None skips the download).
+            state_store (StateStore): State of previous runs enabling incremental crawls (None crawls everything). 
+                Unchanged detail pages are skipped and only new, changed or newly expired flyers are emitted. 
+                The state is committed only after the output writer published the flyers.
+            metrics (MetricsRegistry): Registry recording stage durations, parse times and output write times 
+                (None disables metrics). It is passed on to the parsers and to a Fetcher created by the controller.
+            max_inflight_bytes (int): Budget of fetched detail page HTML not yet parsed, in bytes (None means no budget). 
+                Detail page fetches wait while the budget is exhausted and a page's HTML is released as soon as it is parsed.
+            shop_filter (ShopFilter): Selects the shops to crawl from the category pages' links, the detail pages 
+                of the other shops are never fetched (None crawls every shop).
+            valid_on (date): Only brochures valid on this day are extracted, the others are skipped before 
+                their full extraction (None extracts all brochures).
+            data_extractor (FlyerDataExtractor): Extractor shared by the detail page parsers.
+            shop_categories (dict[str, list[str]]): Categories each shop (keyed by detail page URL) belongs to.
             processed_data (list): List of processed data after parsing detail pages.
 
         Methods:
             process(): Asynchronously fetches and parses the main and detail pages.
+            iter_flyers(): Asynchronously yields flyers as soon as their detail page is fetched and parsed.
+            fetch_links(): Fetches the main pages of all categories and returns the shops' detail page links.
+            crawl_shops(links): Fetches and parses the detail pages of the given shops.
             save_output(output_path): Saves the processed data to a JSON file.
+            stream_output(output_path): Writes flyers to the output file as soon as they are parsed.
+            enqueue_shops(work_queue): Fills a shared work queue with the shops of all categories.
+            crawl_queue(work_queue, worker_id, parts_dir): Crawls shops claimed from a shared work queue into partial outputs.
+            merge_outputs(work_queue, output_path): Combines the partial outputs of all workers.
+            close(): Releases the Fetcher's pooled HTTP client.
         """
         self.logger = logger
         self.verbose = verbose 
         self.base_url = base_url
-        self.category = category
-        self.main_page_parser = MainPageParser(base_url, logger=logger)
+        self.categories = [category] if isinstance(category, str) else list(category)
+        self.shop_categories = {}
+        self.metrics = metrics
+        self.main_page_parser = MainPageParser(base_url, logger=logger, metrics=metrics)
         self.detail_page_parsers = []
-        self.fetcher = Fetcher(fetcher_timeout, logger=logger)
+        self.fetcher = fetcher or Fetcher(fetcher_timeout, logger=logger, metrics=metrics)
+        self.queue_size = queue_size
+        self.parse_executor = parse_executor
+        self.state_store = state_store
+        self.parse_concurrency = parse_concurrency or os.cpu_count() or 1
+        self.image_downloader = image_downloader
+        self.max_inflight_bytes = max_inflight_bytes
+        self.shop_filter = shop_filter
+        self.data_extractor = FlyerDataExtractor(metrics=metrics, valid_on=valid_on)
         self.processed_data = []
 
     async def process(self) -> list[list[FlyerData]]:
@@ -52,37 +118,480 @@ class ParserController:
         Asynchronously fetches the main page and detail pages, parses them, 
         and returns the processed data.
 
-        Fetches the main page, extracts links to detail pages, fetches the 
-        detail pages, and parses them using individual detail page parsers.
+        Fetches the main page of every category, extracts links to detail pages, fetches the 
+        detail pages, and parses them using individual detail page parsers. A shop listed 
+        in several categories is fetched and parsed only once. The detail pages go through 
+        the same pipeline as `iter_flyers`, so their HTML is released as soon as it is parsed 
+        and only the flyers are kept. In incremental mode the state is committed by `save_output`.
 
         Returns:
             list: A list of list of processed data after parsing the detail pages. Or empty list if processing fails.
+                A shop whose page fails to fetch or parse contributes an empty list instead of failing the whole run.
         """
-        main_page_html = await self.fetcher.fetch(self.base_url + self.category)
-        links = self.main_page_parser.parse(main_page_html)
-        if not links: 
-            self.logger.warning("No links found on the main page!")
-            return [] 
-        detail_pages = await self.fetcher.fetch_many(*links.values())
-        detail_page_parsers = [DetailPageParser(shop_name) for shop_name in links.keys()]
-        parser_tasks = [
-            parser.async_parse(detail_page_html) 
-            for parser, detail_page_html in zip(detail_page_parsers, detail_pages.values())
-        ]
-        data = await asyncio.gather(*parser_tasks)
+        with profile_stage("fetch"):
+            links = await self.fetch_links()
+            if not links: 
+                return [] 
+            with self._stage("process_detail_pages"):
+                results = await self.crawl_shops(links)
+            data = [flyers or [] for flyers in results.values()]
+        if self.state_store:
+            data.append(self.state_store.pop_expired_flyers())
         self.processed_data = data 
         return data
 
-    def save_output(self, output_path):
+    async def iter_flyers(self) -> AsyncIterator[FlyerData]:
+        """
+        Asynchronously fetches and parses the detail pages as a pipeline, yielding flyers as they are ready.
+
+        Detail pages are fetched by a pool of workers (one per Fetcher concurrency slot) and put into 
+        a bounded queue. A pool of `parse_concurrency` workers parses every page as soon as its fetch 
+        finishes, in completion order (downloading its images if enabled), and its flyers are yielded 
+        right away. When the consumer falls behind, the full queues block the workers (backpressure), 
+        so at most `queue_size` fetched pages wait for parsing. With `max_inflight_bytes` set, fetches 
+        additionally wait while the HTML of the fetched but unparsed pages exhausts the byte budget.
+
+        In incremental mode the flyers that expired since the previous run are yielded last.
+
+        Yields:
+            FlyerData: The parsed flyers, page by page in the order the fetches complete.
+        """
+        links = await self.fetch_links()
+        if not links:
+            return
+        async for _, flyers in self._iter_detail_pages(links):
+            for flyer in flyers or []:
+                yield flyer
+        if self.state_store:
+            for flyer in self.state_store.pop_expired_flyers():
+                yield flyer
+
+    async def _iter_detail_pages(self, links: dict[str, str]) -> AsyncIterator[tuple[str, list[FlyerData] | None]]:
+        """
+        Runs the fetch and parse worker pools over the given shops, yielding every page's flyers as they are ready.
+
+        A fresh byte budget is created for every run (if `max_inflight_bytes` is set), so 
+        reservations of a cancelled run cannot leak into the next one.
+
+        Args:
+            links (dict[str, str]): A dictionary mapping detail page URLs to their shop names.
+
+        Yields:
+            tuple[str, list[FlyerData] | None]: The detail page URL and its flyers, None if the page 
+                could not be fetched, in the order the fetches complete.
+        """
+        budget = ByteBudget(self.max_inflight_bytes) if self.max_inflight_bytes else None
+        page_queue = asyncio.Queue(maxsize=self.queue_size or self.fetcher.get_max_concurrency())
+        result_queue = asyncio.Queue(maxsize=self.parse_concurrency)
+        tasks = [asyncio.create_task(self._produce_detail_pages(links, page_queue, budget))]
+        tasks += [
+            asyncio.create_task(self._process_detail_pages(page_queue, result_queue, budget))
+            for _ in range(self.parse_concurrency)
+        ]
+        try:
+            finished = 0
+            while finished < self.parse_concurrency:
+                result = await result_queue.get()
+                if result is None:
+                    finished += 1
+                    continue
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        if budget and self.verbose:
+            self.logger.info(f"Peak in-flight HTML: {budget.get_peak() / 1024 / 1024:.2f} MB")
+
+    async def _process_detail_pages(self, page_queue: asyncio.Queue, result_queue: asyncio.Queue, budget: ByteBudget=None):
+        """
+        Parses fetched detail pages from the page queue and puts their flyers into the result queue.
+
+        The page's reservation is returned to the byte budget as soon as it is parsed. 
+        A page whose processing fails (e.g. an image download or state store error) is logged 
+        and reported without flyers. On the `None` sentinel the worker puts it back for the 
+        other workers and reports its own end with a `None` in the result queue; if the worker 
+        itself fails, it reports the exception instead, which the consumer re-raises.
+
+        Args:
+            page_queue (asyncio.Queue): The queue of fetched `(shop_name, url, html, reservation)` tuples.
+            result_queue (asyncio.Queue): The queue receiving the `(url, flyers)` of every page, 
+                flyers being None if the page could not be fetched or processed.
+            budget (ByteBudget, optional): The budget holding the reservations. Defaults to None.
+        """
+        try:
+            while (page := await page_queue.get()) is not None:
+                shop_name, url, detail_page_html, reservation = page
+                del page
+                fetched = bool(detail_page_html)
+                try:
+                    flyers = await self._parse_detail_page(shop_name, url, detail_page_html)
+                except Exception as e:
+                    self.logger.error(f"Error processing detail page of {shop_name}: {e}")
+                    flyers = None
+                finally:
+                    if budget:
+                        budget.release(reservation)
+                del detail_page_html
+                await result_queue.put((url, flyers if fetched else None))
+            await page_queue.put(None)
+        except Exception as e:
+            await result_queue.put(e)
+        else:
+            await result_queue.put(None)
+
+    async def fetch_links(self) -> dict[str, str]:
+        """
+        Fetches the main pages of all categories concurrently and extracts the links to the detail pages.
+
+        Shops are keyed and deduplicated by their detail page URL, so different shops sharing a 
+        name are all crawled. The categories listing each shop are collected in `shop_categories`. 
+        With a shop filter, only the selected shops are returned.
+
+        Returns:
+            dict[str, str]: A dictionary mapping detail page URLs to their shop names. Empty dict if none found.
+        """
+        with self._stage("fetch_main_pages"):
+            categories = await self._resolve_categories()
+            main_pages = await self.fetcher.fetch_many(
+                *(self.base_url + category for category in categories), region=MainPageParser.REGION
+            )
+        links = {}
+        self.shop_categories = {}
+        listed = set()
+        for category, main_page_html in zip(categories, main_pages.values()):
+            category_links = self.main_page_parser.parse(main_page_html)
+            if not category_links:
+                self.logger.warning(f"No links found on the main page of category {category}!")
+            if self.shop_filter:
+                listed.update(category_links.values())
+                category_links = self.shop_filter.apply(category_links)
+            for shop_name, url in category_links.items():
+                if url not in self.shop_categories:
+                    links[url] = shop_name
+                    self.shop_categories[url] = []
+                self.shop_categories[url].append(category.strip("/"))
+        if not links: 
+            self.logger.warning("No shop matches the shop filters!" if listed else "No links found on the main page!")
+        if self.shop_filter and self.verbose:
+            self.logger.info(f"Shop filters selected {len(links)} of {len(listed)} shops")
+        profile_snapshot("main_pages")
+        return links
+
+    async def crawl_shops(self, links: dict[str, str]) -> dict[str, list[FlyerData] | None]:
+        """
+        Fetches and parses the detail pages of the given shops.
+
+        The pages go through the fetch and parse pipeline of `iter_flyers`, so at most 
+        `queue_size` pages (and `max_inflight_bytes` of HTML) are held at a time.
+
+        Args:
+            links (dict[str, str]): A dictionary mapping detail page URLs to their shop names.
+
+        Returns:
+            dict[str, list[FlyerData] | None]: The flyers of every shop keyed by detail page URL 
+                in the order of `links`, None for shops whose page could not be fetched.
+        """
+        results = dict.fromkeys(links)
+        if links:
+            async for url, flyers in self._iter_detail_pages(links):
+                results[url] = flyers
+        return results
+
+    async def _resolve_categories(self) -> list[str]:
+        """
+        Resolves the categories to crawl, expanding "all" to every category listed on the home page.
+
+        Returns:
+            list[str]: Unique category paths relative to the base URL, each ending with "/".
+        """
+        categories = [category.strip("/") + "/" for category in self.categories]
+        if "all/" in categories:
+            home_page_html = await self.fetcher.fetch(self.base_url)
+            all_categories = self.main_page_parser.parse_categories(home_page_html)
+            if not all_categories:
+                self.logger.warning("No categories found on the home page!")
+            categories.remove("all/")
+            categories.extend(all_categories.values())
+        return list(dict.fromkeys(categories))
+
+    async def _produce_detail_pages(self, links: dict[str, str], page_queue: asyncio.Queue, budget: ByteBudget=None):
         """
-        Saves the processed data to a JSON file at the specified output path.
+        Fetches the detail pages with a pool of workers and puts them into the queue in completion order.
+
+        With a byte budget, every fetch first reserves the expected page size (waiting while the 
+        budget is exhausted) and corrects the reservation to the size of the received HTML. 
+        A page whose fetch raises (e.g. on an invalid URL) is logged and put as an empty page, 
+        so the other shops are still crawled. A `None` sentinel is put into the queue once every 
+        page has been fetched.
+
+        Args:
+            links (dict[str, str]): A dictionary mapping detail page URLs to their shop names.
+            page_queue (asyncio.Queue): The queue receiving `(shop_name, url, html, reservation)` tuples.
+            budget (ByteBudget, optional): The budget of fetched but unparsed HTML. Defaults to None.
+        """
+        pending_links = iter(links.items())
+
+        async def worker():
+            for url, shop_name in pending_links:
+                reservation = 0
+                if budget:
+                    with self._wait_timer():
+                        reservation = await budget.acquire()
+                try:
+                    try:
+                        detail_page_html = await self.fetcher.fetch(url, region=DetailPageParser.REGION)
+                    except Exception as e:
+                        self.logger.error(f"Error fetching detail page of {shop_name}: {e!r}")
+                        detail_page_html = ""
+                    if budget:
+                        reservation = budget.adjust(reservation, sys.getsizeof(detail_page_html))
+                    await page_queue.put((shop_name, url, detail_page_html, reservation))
+                except BaseException:
+                    if budget:
+                        budget.release(reservation)
+                    raise
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.fetcher.get_max_concurrency(), len(links)))]
+        try:
+            await asyncio.gather(*workers)
+        except Exception as e:
+            self.logger.error(f"Error fetching detail pages: {e}")
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        await page_queue.put(None)
+
+    async def _parse_detail_page(self, shop_name: str, url: str, detail_page_html: str) -> list[FlyerData]:
+        """
+        Parses a single detail page and tags its flyers with the shop's categories, logging instead of raising on errors.
+
+        In incremental mode pages with an unchanged content hash are skipped without parsing
+        and only flyers not emitted in a previous run are returned. If an image downloader is 
+        configured, the images of the returned flyers are downloaded. The page and its flyers are
+        staged in the state store only after that post-processing succeeded.
+
+        Args:
+            shop_name (str): The name of the shop the page belongs to.
+            url (str): The URL of the detail page.
+            detail_page_html (str): The HTML content of the detail page.
+
+        Returns:
+            list[FlyerData]: The parsed flyers. Empty list if parsing fails.
+        """
+        if self.state_store and detail_page_html:
+            content_hash = self.state_store.content_hash(detail_page_html)
+            if self.state_store.is_page_unchanged(url, content_hash):
+                return []
+        parser = DetailPageParser(shop_name, self.data_extractor, executor=self.parse_executor, metrics=self.metrics)
+        try:
+            flyers = await parser.async_parse(detail_page_html)
+        except Exception as e:
+            self.logger.error(f"Error parsing detail page of {shop_name}: {e}")
+            return []
+        categories = self.shop_categories.get(url, [])
+        for flyer in flyers:
+            flyer.categories = list(categories)
+        if self.state_store and detail_page_html:
+            flyers = self.state_store.filter_new_flyers(flyers)
+        if self.image_downloader:
+            await self.image_downloader.download_flyers(flyers)
+        if self.state_store and detail_page_html:
+            self.state_store.record_flyers(flyers)
+            self.state_store.record_page(url, content_hash)
+        return flyers
+
+    async def close(self):
+        """
+        Closes the Fetcher and releases its pooled connections.
+        """
+        await self.fetcher.close()
+
+    def save_output(self, output_path: str, output_format: str="json", compress: bool=False):
+        """
+        Saves the processed data to a file at the specified output path.
+
+        Args:
+            output_path (str): The path where the output file will be saved.
+            output_format (str, optional): Output format, "json", "ndjson" or "csv". Defaults to "json".
+            compress (bool, optional): Gzip-compresses the output. Defaults to False.
+        """
+        with self._state_transaction(), self._stage("save_output"), profile_stage("serialize"), get_writer(output_format, output_path, compress=compress) as writer:
+            writer.write_many(itertools.chain(*self.processed_data))
+        if self.metrics:
+            self.metrics.inc("flyers_written", writer.get_written())
+        if self.verbose:    
+            self.logger.info(f"Scraping completed! Data saved to {writer.get_output_path()}")
+
+    async def stream_output(self, output_path: str, output_format: str="json", compress: bool=False) -> int:
+        """
+        Crawls with `iter_flyers` and appends every flyer to the output file as soon as it is parsed.
+
+        The time spent in the writer is recorded in the `output_write_seconds` counter, 
+        separately from the whole `stream_output` stage. Memory stays constant regardless of the number of shops. The output is written to 
+        `<output_path>.part` (flushed periodically, so it can be tailed) and atomically renamed 
+        to `output_path` once the crawl finishes; only then is the incremental state committed.
 
         Args:
             output_path (str): The path where the output file will be saved.
+            output_format (str, optional): Output format, "json", "ndjson" or "csv". Defaults to "json".
+            compress (bool, optional): Gzip-compresses the output. Defaults to False.
+
+        Returns:
+            int: The number of written flyers.
         """
-        with open(output_path, "w", encoding="UTF-8") as output_file: 
-            data = list(itertools.chain(*self.processed_data))
-            output_file.write(json.dumps([asdict(d) for d in data]))
+        write_time = 0.0
+        with self._state_transaction(), self._stage("stream_output"), get_writer(output_format, output_path, compress=compress) as writer, profile_stage("fetch"):
+            async for flyer in self.iter_flyers():
+                start = time.perf_counter()
+                with profile_stage("serialize"):
+                    writer.write(flyer)
+                write_time += time.perf_counter() - start
+        if self.metrics:
+            self.metrics.inc("output_write_seconds", write_time)
+            self.metrics.inc("flyers_written", writer.get_written())
         if self.verbose:    
-            self.logger.info(f"Scraping completed! Data saved to {output_path}")
-        
\ No newline at end of file
+            self.logger.info(f"Scraping completed! {writer.get_written()} flyers saved to {writer.get_output_path()}")
+        return writer.get_written()
+
+    async def enqueue_shops(self, work_queue: WorkQueue) -> int:
+        """
+        Fetches the main pages of all categories and adds their shops to a shared work queue.
+
+        Args:
+            work_queue (WorkQueue): The queue the crawl workers claim shops from.
+
+        Returns:
+            int: The number of newly enqueued shops.
+        """
+        links = await self.fetch_links()
+        enqueued = work_queue.enqueue(links, self.shop_categories)
+        if self.verbose:
+            self.logger.info(f"Enqueued {enqueued} of {len(links)} shops")
+        return enqueued
+
+    async def crawl_queue(
+            self, 
+            work_queue: WorkQueue, 
+            worker_id: str, 
+            parts_dir: str, 
+            batch_size: int=10, 
+            poll_interval: float=1.0) -> int:
+        """
+        Claims batches of shops from a shared work queue and crawls them until the queue is drained.
+
+        The flyers of every batch are written to their own NDJSON part file in `parts_dir`, 
+        which is published atomically before the batch is marked done (and, in incremental 
+        mode, before the state is committed). A worker that dies therefore never leaves a 
+        batch marked done without its output; its leases expire and the shops are crawled 
+        by another worker. While other workers still hold leases, the worker polls the queue 
+        every `poll_interval` seconds to take over expired ones.
+
+        Args:
+            work_queue (WorkQueue): The queue to claim shops from.
+            worker_id (str): Identifier of this worker (unique across processes and machines).
+            parts_dir (str): Directory receiving the part files.
+            batch_size (int, optional): Number of shops claimed at once. Defaults to 10.
+            poll_interval (float, optional): Seconds between claims while the queue is empty but not drained. Defaults to 1.
+
+        Returns:
+            int: The number of written flyers.
+        """
+        written = 0
+        for batch_number in itertools.count():
+            batch = work_queue.claim(worker_id, batch_size)
+            if not batch:
+                if work_queue.is_drained():
+                    break
+                await asyncio.sleep(poll_interval)
+                continue
+            urls = [url for _, url, _ in batch]
+            try:
+                for _, url, categories in batch:
+                    self.shop_categories[url] = categories
+                results = await self.crawl_shops({url: shop_name for shop_name, url, _ in batch})
+                part_path = os.path.join(parts_dir, f"{worker_id}-{batch_number:05d}.ndjson")
+                with get_writer("ndjson", part_path) as writer:
+                    writer.write_many(itertools.chain(*(flyers or [] for flyers in results.values())))
+            except BaseException:
+                work_queue.release(worker_id, urls)
+                if self.state_store:
+                    self.state_store.rollback()
+                raise
+            work_queue.complete(worker_id, urls, writer.get_output_path())
+            if self.state_store:
+                self.state_store.commit()
+            written += writer.get_written()
+        if self.verbose:
+            self.logger.info(f"Worker {worker_id} finished, {written} flyers written to {parts_dir}")
+        return written
+
+    def merge_outputs(self, work_queue: WorkQueue, output_path: str, output_format: str="json", compress: bool=False) -> int:
+        """
+        Combines the part files of all finished shops into a single output file.
+
+        Only the flyers of the shops a part file was completed for are taken from it, so 
+        shops crawled twice (after an expired lease) appear only once.
+
+        Args:
+            work_queue (WorkQueue): The drained work queue.
+            output_path (str): The path where the output file will be saved.
+            output_format (str, optional): Output format, "json", "ndjson" or "csv". Defaults to "json".
+            compress (bool, optional): Gzip-compresses the output. Defaults to False.
+
+        Returns:
+            int: The number of written flyers.
+        """
+        counts = work_queue.counts()
+        if not work_queue.is_drained():
+            self.logger.warning(f"Merging an unfinished crawl: {counts}")
+        if counts[WorkQueue.FAILED]:
+            self.logger.warning(f"{counts[WorkQueue.FAILED]} shops failed and are missing from the output")
+        with self._stage("merge_outputs"), get_writer(output_format, output_path, compress=compress) as writer:
+            for part_path, shop_names in work_queue.get_outputs().items():
+                with open(part_path, encoding="UTF-8") as part_file:
+                    for line in part_file:
+                        flyer = FlyerData(**json.loads(line))
+                        if flyer.shop_name in shop_names:
+                            writer.write(flyer)
+        if self.verbose:
+            self.logger.info(f"Merged {writer.get_written()} flyers into {writer.get_output_path()}")
+        return writer.get_written()
+
+    def _stage(self, stage: str):
+        """
+        Times a pipeline stage into the `stage_duration_seconds` histogram.
+
+        Args:
+            stage (str): The stage name, used as metric label.
+
+        Returns:
+            A context manager timing the `with` block (a no-op without a metrics registry).
+        """
+        return self.metrics.time("stage_duration_seconds", stage=stage) if self.metrics else nullcontext()
+
+    @contextmanager
+    def _state_transaction(self):
+        """
+        Commits the staged incremental state when the `with` block (writing the output) succeeds, discards it otherwise.
+        """
+        try:
+            yield
+        except BaseException:
+            if self.state_store:
+                self.state_store.rollback()
+            raise
+        if self.state_store:
+            self.state_store.commit()
+
+    def _wait_timer(self):
+        """
+        Times a wait for the byte budget into the `byte_budget_wait_seconds` histogram.
+
+        Returns:
+            A context manager timing the `with` block (a no-op without a metrics registry).
+        """
+        return self.metrics.time("byte_budget_wait_seconds") if self.metrics else nullcontext()
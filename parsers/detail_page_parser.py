@@ -1,7 +1,17 @@
+from __future__ import annotations
+
+import copy
+import time
+from typing import TYPE_CHECKING
 from .page_parser import PageParser
 from models.flyer_data import FlyerData
 from selectolax.parser import HTMLParser
 from extractors.extractor import FlyerDataExtractor
+from metrics.registry import MetricsRegistry
+from metrics.profiler import profile_stage
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 
 class DetailPageParser(PageParser):
@@ -14,6 +24,8 @@ class DetailPageParser(PageParser):
     Attributes:
         _shop_name (str): The name of the retailer.
         _extractor (FlyerDataExtractor): Extractor instance for processing flyer data.
+        _executor (Executor): Executor running `async_parse` off the event loop (None means the loop's default thread pool).
+        _metrics (MetricsRegistry): Registry recording parse times and flyers per shop (None if disabled).
 
     Methods:
         set_shop_name(shop_name: str):
@@ -28,6 +40,18 @@ class DetailPageParser(PageParser):
         get_data_extractor() -> FlyerDataExtractor:
             Retrieves the flyer data extractor instance.
 
+        set_executor(executor: Executor):
+            Sets the executor used by `async_parse`.
+
+        get_executor() -> Executor:
+            Retrieves the executor used by `async_parse`.
+
+        set_metrics(metrics: MetricsRegistry):
+            Sets the registry recording parse metrics.
+
+        get_metrics() -> MetricsRegistry:
+            Retrieves the registry recording parse metrics.
+
         __call__(html_string: str) -> list[FlyerData]:
             Calls the `parse` method, allowing the parser to be used as a function.
 
@@ -35,19 +59,31 @@ class DetailPageParser(PageParser):
             Parses the detail page HTML and extracts flyer data.
 
         async_parse(html_string: str) -> list[FlyerData]:
-            Asynchronous version of `parse` for handling flyer data extraction.
+            Asynchronous version of `parse` running the parsing and extraction in an executor.
     """
 
-    def __init__(self, shop_name: str="", data_extractor: FlyerDataExtractor = None):
+    # The only element `parse` reads, fetchers may cut detail pages down to it
+    REGION = ".letaky-grid"
+
+    def __init__(
+            self, 
+            shop_name: str="", 
+            data_extractor: FlyerDataExtractor = None, 
+            executor: Executor = None, 
+            metrics: MetricsRegistry = None):
         """
         Initializes the DetailPageParser with an optional shop name and data extractor.
 
         Args:
             shop_name (str, optional): The name of the shop. Defaults to an empty string.
             data_extractor (FlyerDataExtractor, optional): Extractor instance for flyer data. Defaults to None (Instantiaze FlyerDataExtractor class).
+            executor (Executor, optional): Thread or process pool running `async_parse`. Defaults to None (event loop's default thread pool).
+            metrics (MetricsRegistry, optional): Registry recording parse times and flyers per shop. Defaults to None (no metrics).
         """
         self._shop_name = shop_name 
-        self._extractor = data_extractor or FlyerDataExtractor()
+        self._extractor = data_extractor or FlyerDataExtractor(metrics=metrics)
+        self._executor = executor
+        self._metrics = metrics
 
     def set_shop_name(self, shop_name:str):
         """
@@ -85,6 +121,42 @@ class DetailPageParser(PageParser):
         """
         return self._extractor
 
+    def set_executor(self, executor: Executor):
+        """
+        Sets the executor used by `async_parse`.
+
+        Args:
+            executor (Executor): A thread or process pool executor.
+        """
+        self._executor = executor
+
+    def get_executor(self) -> Executor:
+        """
+        Retrieves the executor used by `async_parse`.
+
+        Returns:
+            Executor: The current executor (None means the event loop's default thread pool).
+        """
+        return self._executor
+
+    def set_metrics(self, metrics: MetricsRegistry):
+        """
+        Sets the registry recording parse times and flyers per shop.
+
+        Args:
+            metrics (MetricsRegistry): The metrics registry (None disables metrics).
+        """
+        self._metrics = metrics
+
+    def get_metrics(self) -> MetricsRegistry:
+        """
+        Retrieves the registry recording parse times and flyers per shop.
+
+        Returns:
+            MetricsRegistry: The metrics registry (None if disabled).
+        """
+        return self._metrics
+
     def __call__(self, html_string:str) -> list[FlyerData]:
         """
         Calls the `parse` method, making the parser instance callable.
@@ -101,27 +173,41 @@ class DetailPageParser(PageParser):
         """
         Parses the detail page HTML and extracts flyer data.
 
-        This method locates the flyer grid, extracts flyer elements,
-        and uses the FlyerDataExtractor to process the information.
+        This method locates the flyer grid and lets the FlyerDataExtractor 
+        extract every flyer of the grid in a single traversal.
 
         Args:
             html_string (str): The HTML content of the detail page.
 
         Returns:
-            list[FlyerData]: A list of flyer data objects.
+            list[FlyerData]: A list of flyer data objects. Empty list if the page has no flyer grid (e.g. failed fetch).
         """
-        tree = HTMLParser(html_string)
-        grid_with_fliers = tree.css_first(".letaky-grid")
-        fliers = grid_with_fliers.css(".brochure-thumb")
-        flier_data_extractor = self.get_data_extractor()
-        return flier_data_extractor.extract(fliers, shop_name=self.get_shop_name())
+        if not html_string:
+            return []
+        start = time.perf_counter()
+        with profile_stage("detail_parse"):
+            tree = HTMLParser(html_string)
+            grid_with_fliers = tree.css_first(self.REGION)
+            if grid_with_fliers is None:
+                return []
+            flier_data_extractor = self.get_data_extractor()
+            flyers = flier_data_extractor.extract_grid(grid_with_fliers, shop_name=self.get_shop_name())
+        if self._metrics:
+            elapsed = time.perf_counter() - start
+            self._metrics.observe("parse_duration_seconds", elapsed, page="detail")
+            self._metrics.inc("shop_parse_seconds", elapsed, shop=self.get_shop_name())
+            self._metrics.inc("shop_flyers", len(flyers), shop=self.get_shop_name())
+        return flyers
 
     async def async_parse(self, html_string: str):
         """
         Asynchronously parses the detail page HTML and extracts flyer data.
 
-        This method works similarly to `parse`, but it can be used in
-        an asynchronous workflow.
+        This method works similarly to `parse`, but the CPU-bound HTML parsing and
+        extraction run in the executor, so the event loop keeps serving other fetches.
+        With a process pool the shop name, extractor and HTML are sent to a worker 
+        process and the flyers come back as pickled `FlyerData` objects. Metrics are recorded 
+        by the worker into a fresh registry and merged into this parser's registry afterwards.
 
         Args:
             html_string (str): The HTML content of the detail page.
@@ -129,8 +215,44 @@ class DetailPageParser(PageParser):
         Returns:
             list[FlyerData]: A list of flyer data objects.
         """
-        tree = HTMLParser(html_string)
-        grid_with_fliers = tree.css_first(".letaky-grid")
-        fliers = grid_with_fliers.css(".brochure-thumb")
-        flier_data_extractor = self.get_data_extractor()
-        return flier_data_extractor.extract(fliers, shop_name=self.get_shop_name())
\ No newline at end of file
+        # Imported here, where the event loop already loaded it, to keep the synchronous parse-only CLI free of asyncio
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        flyers, metrics = await loop.run_in_executor(
+            self.get_executor(), 
+            _parse_detail_page, 
+            self.get_shop_name(), 
+            self.get_data_extractor(), 
+            html_string, 
+            self._metrics is not None,
+        )
+        if metrics:
+            self._metrics.merge(metrics)
+        return flyers
+
+
+def _parse_detail_page(
+        shop_name: str, 
+        data_extractor: FlyerDataExtractor, 
+        html_string: str, 
+        collect_metrics: bool = False) -> tuple[list[FlyerData], MetricsRegistry]:
+    """
+    Parses a detail page inside an executor worker.
+
+    Defined at module level so it can be pickled and sent to process pool workers.
+
+    Args:
+        shop_name (str): The name of the shop.
+        data_extractor (FlyerDataExtractor): Extractor instance for flyer data.
+        html_string (str): The HTML content of the detail page.
+        collect_metrics (bool, optional): Record metrics into a fresh registry. Defaults to False.
+
+    Returns:
+        tuple[list[FlyerData], MetricsRegistry]: The flyer data objects and the worker's metrics (None if not collected).
+    """
+    metrics = MetricsRegistry() if collect_metrics else None
+    if collect_metrics:
+        data_extractor = copy.copy(data_extractor)
+        data_extractor.set_metrics(metrics)
+    return DetailPageParser(shop_name, data_extractor, metrics=metrics).parse(html_string), metrics
\ No newline at end of file
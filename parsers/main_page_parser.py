@@ -1,6 +1,9 @@
+import time
 import logging
 from .page_parser import PageParser
 from selectolax.parser import HTMLParser
+from metrics.registry import MetricsRegistry
+from metrics.profiler import profile_stage
 
 class MainPageParser(PageParser):
     """
@@ -11,7 +14,9 @@ class MainPageParser(PageParser):
 
     Attributes:
         _base_url (str): The base URL of the website.
+        _category_selector (str): CSS selector of the category links on the website's home page.
         logger (logging.Logger, optional): Logger for error handling and debugging.
+        _metrics (MetricsRegistry, optional): Registry recording parse times.
 
     Methods:
         set_base_url(base_url: str):
@@ -25,19 +30,39 @@ class MainPageParser(PageParser):
 
         parse(html_string: str) -> dict[str, str]:
             Parses the main page HTML and extracts category links.
+
+        parse_categories(html_string: str) -> dict[str, str]:
+            Parses the website's home page and extracts the available categories.
     """
 
-    def __init__(self, base_url:str = "", logger: logging.Logger = None):
+    # Not verified against the live site: written against the home page of the local mock 
+    # server (benchmarks/mock_server.py) only. Override it with `category_selector` if the 
+    # live markup differs; otherwise `--category all` finds no categories and only logs a warning.
+    CATEGORY_SELECTOR = "#categories li a"
+    # The only element `parse` reads, fetchers may cut category pages down to it. This is the 
+    # sidebar selector `parse` has always used; the mock server mirrors it, no live fixture exists.
+    REGION = "#sidebar"
+
+    def __init__(
+            self, 
+            base_url:str = "", 
+            logger: logging.Logger = None, 
+            category_selector: str = CATEGORY_SELECTOR, 
+            metrics: MetricsRegistry = None):
         """
         Initializes the MainPageParser with an optional base URL and logger.
 
         Args:
             base_url (str, optional): The base URL of the website. Defaults to an empty string.
             logger (logging.Logger, optional): Logger instance for error handling. Defaults to None.
+            category_selector (str, optional): CSS selector of the category links on the home page. Defaults to CATEGORY_SELECTOR.
+            metrics (MetricsRegistry, optional): Registry recording parse times. Defaults to None (no metrics).
         """
 
         self._base_url = base_url 
         self.logger = logger 
+        self._category_selector = category_selector
+        self._metrics = metrics
 
     def set_base_url(self, base_url:str):
         """
@@ -85,14 +110,50 @@ class MainPageParser(PageParser):
         Raises:
             Exception: Logs an error if parsing fails.
         """
+        start = time.perf_counter()
         try: 
-            tree = HTMLParser(html_string)
-            side_bar = tree.css_first("#sidebar")
-            link_nodes = side_bar.css("li a")
-            return {
-                node.text(strip=True): self.get_base_url() + node.attributes.get("href") 
-                for node in link_nodes
-            }
+            with profile_stage("main_page_parse"):
+                tree = HTMLParser(html_string)
+                side_bar = tree.css_first(self.REGION)
+                link_nodes = side_bar.css("li a")
+                return {
+                    node.text(strip=True): self.get_base_url() + node.attributes.get("href") 
+                    for node in link_nodes
+                }
         except Exception as e: 
             self.logger.error(f"Error Parsing Main Page: {e}")
-            return {}
\ No newline at end of file
+            return {}
+        finally:
+            if self._metrics:
+                self._metrics.observe("parse_duration_seconds", time.perf_counter() - start, page="main")
+
+    def parse_categories(self, html_string: str) -> dict[str, str]:
+        """
+        Parses the website's home page and extracts the available categories.
+
+        Only links pointing to a single path segment of the website (e.g. "/hypermarkte/") 
+        are considered categories. The default `CATEGORY_SELECTOR` was only checked against 
+        the local mock server, not against the live site.
+
+        Args:
+            html_string (str): The HTML content of the home page.
+
+        Returns:
+            dict[str, str]: A dictionary mapping category names to their paths relative to the base URL 
+                (e.g. "hypermarkte/"). Empty dict returned if error occurs.
+        """
+        try:
+            tree = HTMLParser(html_string)
+            categories = {}
+            for node in tree.css(self._category_selector):
+                href = node.attributes.get("href") or ""
+                if href.startswith(self.get_base_url()):
+                    href = href[len(self.get_base_url()):]
+                path = href.strip("/")
+                if not path or "/" in path or ":" in path or "#" in path or "?" in path:
+                    continue
+                categories[path] = path + "/"
+            return categories
+        except Exception as e: 
+            self.logger.error(f"Error Parsing Categories: {e}")
+            return {}
@@ -0,0 +1,82 @@
+import re
+from fnmatch import fnmatchcase
+
+
+class ShopFilter:
+    """
+    Selects shops by name before their detail pages are fetched.
+
+    A pattern is a case-insensitive glob (e.g. "kaufland", "lidl*", "*markt*") matched against
+    the whole shop name, or a regular expression searched in the name if prefixed with "re:"
+    (e.g. "re:^(aldi|lidl)"). A shop is selected if it matches any include pattern (or none are
+    given) and no exclude pattern.
+
+    Attributes:
+        include (list[str]): Patterns of the selected shops (empty selects every shop).
+        exclude (list[str]): Patterns of the excluded shops.
+        _include (list): Compiled include patterns.
+        _exclude (list): Compiled exclude patterns.
+    """
+
+    REGEX_PREFIX = "re:"
+
+    def __init__(self, include: list[str] = None, exclude: list[str] = None):
+        """
+        Initializes the ShopFilter.
+
+        Args:
+            include (list[str], optional): Patterns of the selected shops. Defaults to None (every shop).
+            exclude (list[str], optional): Patterns of the excluded shops. Defaults to None (none).
+
+        Raises:
+            ValueError: If a regular expression is invalid.
+        """
+        self.include = list(include or [])
+        self.exclude = list(exclude or [])
+        self._include = [self._compile(pattern) for pattern in self.include]
+        self._exclude = [self._compile(pattern) for pattern in self.exclude]
+
+    def __bool__(self) -> bool:
+        return bool(self._include or self._exclude)
+
+    def matches(self, shop_name: str) -> bool:
+        """
+        Checks whether a shop is selected.
+
+        Args:
+            shop_name (str): The shop name.
+
+        Returns:
+            bool: True if the shop is selected.
+        """
+        if self._include and not any(self._match(pattern, shop_name) for pattern in self._include):
+            return False
+        return not any(self._match(pattern, shop_name) for pattern in self._exclude)
+
+    def apply(self, links: dict[str, str]) -> dict[str, str]:
+        """
+        Keeps the selected shops of a shop-to-link dictionary (as returned by `MainPageParser.parse`).
+
+        Args:
+            links (dict[str, str]): Detail page URLs keyed by shop name.
+
+        Returns:
+            dict[str, str]: The links of the selected shops, in the original order.
+        """
+        return {shop_name: url for shop_name, url in links.items() if self.matches(shop_name)}
+
+    def _compile(self, pattern: str):
+        """
+        Compiles a regular expression pattern, or case-folds a glob pattern.
+        """
+        if pattern.startswith(self.REGEX_PREFIX):
+            try:
+                return re.compile(pattern[len(self.REGEX_PREFIX):], re.IGNORECASE)
+            except re.error as e:
+                raise ValueError(f"Invalid shop pattern {pattern!r}: {e}")
+        return pattern.casefold()
+
+    def _match(self, pattern, shop_name: str) -> bool:
+        if isinstance(pattern, str):
+            return fnmatchcase(shop_name.casefold(), pattern)
+        return pattern.search(shop_name) is not None
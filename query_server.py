@@ -0,0 +1,198 @@
+import json
+import time
+import logging
+import argparse
+import threading
+from datetime import date
+from urllib.parse import parse_qs, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from storage.flyer_index import FlyerIndex
+
+
+class FlyerQueryServer(ThreadingHTTPServer):
+    """
+    A local HTTP server answering flyer queries from a FlyerIndex.
+
+    Endpoints (all GET, JSON responses):
+
+    - `/flyers?valid_on=D&shop=S&starts_from=D&starts_to=D&limit=N`: the flyers matching all given
+      parameters (dates in ISO format, shop name case-insensitive),
+    - `/shops`: the number of flyers per shop,
+    - `/stats`: the number of indexed flyers and files.
+
+    Before answering, the index ingests new output files if `refresh_interval` seconds passed
+    since the last refresh.
+
+    Attributes:
+        index (FlyerIndex): The index answering the queries.
+        refresh_interval (float): Minimum number of seconds between two refreshes of the index.
+        logger (logging.Logger): Logger instance for logging events.
+        _last_refresh (float): Monotonic time of the last refresh.
+        _refresh_lock (threading.Lock): Lets a single request thread refresh the index at a time.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+            self,
+            index: FlyerIndex,
+            host: str = "127.0.0.1",
+            port: int = 8000,
+            refresh_interval: float = 5.0,
+            logger: logging.Logger = None):
+        """
+        Initializes the server and binds it to `host`:`port`.
+
+        Args:
+            index (FlyerIndex): The index answering the queries.
+            host (str, optional): The interface to listen on. Defaults to "127.0.0.1".
+            port (int, optional): The port to listen on, 0 picks a free one. Defaults to 8000.
+            refresh_interval (float, optional): Minimum seconds between two refreshes of the index. Defaults to 5.
+            logger (logging.Logger, optional): Logger instance for logging events. Defaults to None.
+        """
+        super().__init__((host, port), _QueryHandler)
+        self.index = index
+        self.refresh_interval = refresh_interval
+        self.logger = logger or logging.getLogger(__name__)
+        self._last_refresh = time.monotonic()
+        self._refresh_lock = threading.Lock()
+
+    def get_base_url(self) -> str:
+        """
+        Retrieves the URL the server listens on.
+
+        Returns:
+            str: The base URL, ending with "/".
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def refresh_if_due(self):
+        """
+        Refreshes the index if `refresh_interval` seconds passed since the last refresh.
+        """
+        if time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            self.index.refresh()
+            self._last_refresh = time.monotonic()
+        finally:
+            self._refresh_lock.release()
+
+
+class _QueryHandler(BaseHTTPRequestHandler):
+    """
+    Routes the requests of a FlyerQueryServer.
+    """
+
+    server: FlyerQueryServer
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        self.server.refresh_if_due()
+        index = self.server.index
+        try:
+            if url.path == "/flyers":
+                flyers = index.query(
+                    valid_on=_date_param(params, "valid_on"),
+                    shop_name=params.get("shop"),
+                    starts_from=_date_param(params, "starts_from"),
+                    starts_to=_date_param(params, "starts_to"),
+                    limit=int(params["limit"]) if "limit" in params else None,
+                )
+                self._send(200, [flyer.to_dict() for flyer in flyers])
+            elif url.path == "/shops":
+                self._send(200, index.shops())
+            elif url.path == "/stats":
+                self._send(200, {"flyers": len(index), "files": index.get_files()})
+            else:
+                self._send(404, {"error": f"Unknown endpoint {url.path}"})
+        except ValueError as e:
+            self._send(400, {"error": str(e)})
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args):
+        self.server.logger.debug(format % args)
+
+
+def _date_param(params: dict[str, str], name: str) -> date | None:
+    """
+    Parses an ISO date query parameter (None if absent).
+
+    Raises:
+        ValueError: If the parameter is not an ISO date.
+    """
+    if name not in params:
+        return None
+    try:
+        return date.fromisoformat(params[name])
+    except ValueError:
+        raise ValueError(f"Parameter {name} must be an ISO date (YYYY-MM-DD), got {params[name]!r}")
+
+
+def main():
+    """
+    Serves indexed flyer queries over the accumulated output files of past runs.
+
+    Command-line arguments:
+        outputs (list[str]): Output files or glob patterns (e.g. "data/*.json"), watched for new runs.
+        --host (str): The interface to listen on (default is '127.0.0.1').
+        --port (int): The port to listen on (default is 8000).
+        --refresh_interval (float): Minimum seconds between two checks for new or changed output files (default is 5).
+        --log_file (str): Path to the log file (default is None, meaning logs are printed to the console).
+    """
+    parser = argparse.ArgumentParser(description="Serve indexed queries over scraped flyers")
+    parser.add_argument("outputs", nargs="+", help="Output files or glob patterns")
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="Specify the interface to listen on (default: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Specify the port to listen on (default: 8000)"
+    )
+    parser.add_argument(
+        "--refresh_interval",
+        type=float,
+        default=5.0,
+        help="Specify minimum seconds between two checks for new output files (default: 5)"
+    )
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=None,
+        help="Specify log file path for logs to be saved (default: None - logs printed in CLI)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(filename=args.log_file, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logger = logging.getLogger(__name__)
+
+    index = FlyerIndex(args.outputs, logger=logger)
+    index.refresh()
+    server = FlyerQueryServer(index, args.host, args.port, refresh_interval=args.refresh_interval, logger=logger)
+    logger.info(f"Serving {len(index)} flyers on {server.get_base_url()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import glob
+import asyncio
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fetchers.replay_fetcher import ReplayFetcher
+from metrics.profiler import InlineExecutor
+from parsers.controllers.parser_controller import ParserController
+from storage.page_archive import PageArchive
+from writers.flyer_writer import WRITERS
+
+current_dir = os.path.dirname(__file__)
+data_dir = os.path.join(current_dir, "data")
+
+
+def archive_output_path(archive_path: str, output_dir: str, output_format: str) -> str:
+    """
+    Builds the output path of a re-extracted archive.
+
+    Args:
+        archive_path (str): Path of the archive (e.g. "data/archive/2025-01-01.ndjson.gz").
+        output_dir (str): Directory receiving the outputs.
+        output_format (str): Output format, "json", "ndjson" or "csv".
+
+    Returns:
+        str: The output path (e.g. "<output_dir>/2025-01-01.json").
+    """
+    name = os.path.basename(archive_path)
+    for suffix in (".gz", ".ndjson", ".jsonl"):
+        name = name.removesuffix(suffix)
+    return os.path.join(output_dir, name + WRITERS[output_format].extension)
+
+
+def reextract_archive(archive_path: str, output_path: str, output_format: str = "json", compress: bool = False) -> int:
+    """
+    Re-runs the parsers and extractor over a recorded crawl and writes its flyers.
+
+    Runs inside a worker process: the archive is replayed with a ReplayFetcher and the
+    detail pages are parsed on the worker's own thread, so one archive uses one core.
+
+    Args:
+        archive_path (str): Path of the archive.
+        output_path (str): Path of the output file.
+        output_format (str, optional): Output format, "json", "ndjson" or "csv". Defaults to "json".
+        compress (bool, optional): Gzip-compresses the output. Defaults to False.
+
+    Returns:
+        int: The number of written flyers.
+    """
+    logger = logging.getLogger(__name__)
+    fetcher = ReplayFetcher(PageArchive(archive_path, logger=logger), logger=logger)
+    meta = fetcher.get_meta()
+    if not meta:
+        logger.error(f"Archive {archive_path} has no meta record, skipping it")
+        return 0
+    parser_controller = ParserController(
+        base_url=meta["base_url"],
+        category=meta["categories"],
+        logger=logger,
+        fetcher=fetcher,
+        parse_executor=InlineExecutor(),
+        parse_concurrency=1,
+    )
+
+    async def run() -> int:
+        try:
+            return await parser_controller.stream_output(output_path, output_format=output_format, compress=compress)
+        finally:
+            await parser_controller.close()
+
+    return asyncio.run(run())
+
+
+def main():
+    """
+    Re-extracts flyers from recorded archives without network access, one archive per CPU core.
+
+    Command-line arguments:
+        archives (list[str]): Archive paths or glob patterns (e.g. "data/archive/*.ndjson.gz").
+        --output_dir (str): Directory receiving one output file per archive (default is 'data/reextracted').
+        --format (str): The output format, "json", "ndjson" or "csv" (default is "json").
+        --gzip (bool): Flag to gzip-compress the output files (default is False).
+        --workers (int): Number of worker processes (default is None, meaning the number of CPUs).
+        --log_file (str): Path to the log file (default is None, meaning logs are printed to the console).
+    """
+    parser = argparse.ArgumentParser(description="Re-extract flyers from recorded page archives")
+    parser.add_argument("archives", nargs="+", help="Archive paths or glob patterns")
+    parser.add_argument(
+        "--output_dir", "--output-dir",
+        type=str,
+        default=os.path.join(data_dir, "reextracted"),
+        help="Specify directory receiving one output file per archive (default: data/reextracted)"
+    )
+    parser.add_argument(
+        "--format",
+        type=str,
+        choices=list(WRITERS),
+        default="json",
+        help="Specify the output format (default: json)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Gzip-compress the output files (default: False)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Specify number of worker processes (default: number of CPUs)"
+    )
+    parser.add_argument(
+        "--log_file",
+        type=str,
+        default=None,
+        help="Specify log file path for logs to be saved (default: None - logs printed in CLI)"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(filename=args.log_file, level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    logger = logging.getLogger(__name__)
+
+    archives = sorted({path for pattern in args.archives for path in (glob.glob(pattern) or [pattern])})
+    os.makedirs(args.output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(
+                reextract_archive,
+                archive_path,
+                archive_output_path(archive_path, args.output_dir, args.format),
+                args.format,
+                args.gzip,
+            ): archive_path
+            for archive_path in archives
+        }
+        total = 0
+        for future in as_completed(futures):
+            try:
+                written = future.result()
+            except Exception as e:
+                logger.error(f"Error re-extracting {futures[future]}: {e}")
+                continue
+            total += written
+            logger.info(f"{futures[future]}: {written} flyers")
+    logger.info(f"Re-extracted {total} flyers from {len(archives)} archives into {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
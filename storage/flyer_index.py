@@ -0,0 +1,321 @@
+import os
+import glob
+import json
+import bisect
+import logging
+import threading
+from datetime import date, timedelta
+from models.flyer_data import FlyerData
+from writers.flyer_reader import detect_format, flyer_from_dict, read_flyers
+
+
+class _FileState:
+    """
+    What has been ingested of an output file.
+    """
+    __slots__ = ("inode", "mtime_ns", "size", "offset")
+
+    def __init__(self, inode: int, mtime_ns: int, size: int, offset: int):
+        self.inode = inode
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.offset = offset
+
+
+class FlyerIndex:
+    """
+    An in-memory index over the flyers of accumulated output files, answering lookups without scans.
+
+    Flyers are identified by (shop name, title, valid from, valid to), as in the StateStore; a
+    flyer seen again (in a later run) replaces the stored one. Three indexes are maintained:
+
+    - a calendar interval index: the flyers valid on every day, so "valid on D" is one lookup.
+      Flyers valid for more than `max_indexed_days` days, or without an end date, are kept in a
+      small list checked one by one,
+    - a sorted index of start dates, so flyers starting in a range are found by bisection,
+    - a hash index of the case-folded shop names.
+
+    `refresh` ingests new and changed files matching the watched patterns. Files are published
+    atomically, so a changed file is read again (already known flyers are only replaced); an
+    uncompressed NDJSON file that only grew in place is read from where the previous refresh
+    stopped. Files of unknown format and unpublished `.part` files are skipped. All methods
+    are thread-safe.
+
+    Attributes:
+        patterns (list[str]): Glob patterns of the watched output files.
+        max_indexed_days (int): Longest validity indexed per day.
+        logger (logging.Logger): Logger instance for logging events.
+        _flyers (list[FlyerData]): The stored flyers; their position is their ID in the indexes.
+        _ids (dict[tuple[str, str, str, str], int]): Flyer IDs keyed by flyer key.
+        _by_day (dict[date, list[int]]): IDs of the flyers valid on each day.
+        _long (list[tuple[date, date | None, int]]): (start, end, ID) of flyers not indexed per day.
+        _starts (list[tuple[date, int]]): (start, ID) of all flyers with a start date, sorted.
+        _by_shop (dict[str, list[int]]): Flyer IDs keyed by case-folded shop name.
+        _files (dict[str, _FileState]): Ingestion state of the known files.
+        _lock (threading.RLock): Guards the indexes.
+    """
+
+    def __init__(self, patterns: list[str] = None, max_indexed_days: int = 62, logger: logging.Logger = None):
+        """
+        Initializes an empty FlyerIndex.
+
+        Args:
+            patterns (list[str], optional): Glob patterns of the output files to watch. Defaults to None.
+            max_indexed_days (int, optional): Longest validity indexed per day. Defaults to 62.
+            logger (logging.Logger, optional): Logger instance for logging events. Defaults to None.
+        """
+        self.patterns = list(patterns or [])
+        self.max_indexed_days = max_indexed_days
+        self.logger = logger or logging.getLogger(__name__)
+        self._flyers = []
+        self._ids = {}
+        self._by_day = {}
+        self._long = []
+        self._starts = []
+        self._by_shop = {}
+        self._files = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._flyers)
+
+    def get_files(self) -> list[str]:
+        """
+        Retrieves the ingested files.
+
+        Returns:
+            list[str]: The paths of all ingested files.
+        """
+        with self._lock:
+            return list(self._files)
+
+    def add(self, flyer: FlyerData) -> bool:
+        """
+        Adds a flyer to the indexes, or replaces the stored flyer with the same key.
+
+        Args:
+            flyer (FlyerData): The flyer to add.
+
+        Returns:
+            bool: True if the flyer was not known before.
+        """
+        key = (flyer.shop_name, flyer.title, flyer.valid_from, flyer.valid_to)
+        with self._lock:
+            flyer_id = self._ids.get(key)
+            if flyer_id is not None:
+                self._flyers[flyer_id] = flyer
+                return False
+            flyer_id = self._ids[key] = len(self._flyers)
+            self._flyers.append(flyer)
+            self._by_shop.setdefault(flyer.shop_name.casefold(), []).append(flyer_id)
+            start, end = _to_date(flyer.valid_from), _to_date(flyer.valid_to)
+            if start is None:
+                return True
+            bisect.insort(self._starts, (start, flyer_id))
+            if end is None or (end - start).days >= self.max_indexed_days:
+                self._long.append((start, end, flyer_id))
+            else:
+                for offset in range((end - start).days + 1):
+                    self._by_day.setdefault(start + timedelta(days=offset), []).append(flyer_id)
+            return True
+
+    def refresh(self) -> int:
+        """
+        Ingests the new and changed files matching the watched patterns.
+
+        Returns:
+            int: The number of new flyers.
+        """
+        added = 0
+        for pattern in self.patterns:
+            for path in sorted(glob.glob(pattern)):
+                if _is_output(path):
+                    added += self.ingest_file(path)
+        return added
+
+    def ingest_file(self, path: str) -> int:
+        """
+        Ingests an output file unless it is unchanged since its last ingestion.
+
+        Args:
+            path (str): Path of a JSON, NDJSON or CSV output file, optionally gzipped.
+
+        Returns:
+            int: The number of new flyers. Unreadable files are logged and count 0.
+        """
+        try:
+            stat = os.stat(path)
+            with self._lock:
+                state = self._files.get(path)
+                if state and (state.inode, state.mtime_ns, state.size) == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+                    return 0
+                if state and state.inode == stat.st_ino and stat.st_size > state.offset and _is_appendable(path):
+                    added, offset = self._ingest_tail(path, state.offset)
+                else:
+                    added, offset = self._ingest_whole(path)
+                self._files[path] = _FileState(stat.st_ino, stat.st_mtime_ns, stat.st_size, offset)
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.error(f"Error ingesting {path}: {e}")
+            return 0
+        if added:
+            self.logger.info(f"Ingested {added} new flyers from {path}")
+        return added
+
+    def _ingest_whole(self, path: str) -> tuple[int, int]:
+        """
+        Reads a whole file.
+
+        Returns:
+            tuple[int, int]: The number of new flyers and the offset up to which the file was read.
+        """
+        if _is_appendable(path):
+            return self._ingest_tail(path, 0)
+        return sum(self.add(flyer) for flyer in read_flyers(path)), 0
+
+    def _ingest_tail(self, path: str, offset: int) -> tuple[int, int]:
+        """
+        Reads the complete lines of an uncompressed NDJSON file from `offset` on.
+
+        Returns:
+            tuple[int, int]: The number of new flyers and the offset after the last complete line.
+        """
+        added = 0
+        with open(path, "rb") as ndjson_file:
+            ndjson_file.seek(offset)
+            for line in ndjson_file:
+                if not line.endswith(b"\n"):
+                    break
+                offset += len(line)
+                if line.strip():
+                    added += self.add(flyer_from_dict(json.loads(line)))
+        return added, offset
+
+    def valid_on(self, day: date) -> list[FlyerData]:
+        """
+        Looks up the flyers valid on a day.
+
+        Args:
+            day (date): The day.
+
+        Returns:
+            list[FlyerData]: The flyers whose validity includes the day.
+        """
+        return self._get(self._valid_on_ids(day))
+
+    def by_shop(self, shop_name: str) -> list[FlyerData]:
+        """
+        Looks up the flyers of a shop.
+
+        Args:
+            shop_name (str): The shop name (case-insensitive).
+
+        Returns:
+            list[FlyerData]: The shop's flyers.
+        """
+        return self._get(self._by_shop.get(shop_name.casefold(), []))
+
+    def starting_between(self, start: date = None, end: date = None) -> list[FlyerData]:
+        """
+        Looks up the flyers whose validity starts in a range, ordered by start date.
+
+        Args:
+            start (date, optional): First start date, inclusive. Defaults to None (no lower bound).
+            end (date, optional): Last start date, inclusive. Defaults to None (no upper bound).
+
+        Returns:
+            list[FlyerData]: The flyers starting in the range.
+        """
+        return self._get(self._starting_between_ids(start, end))
+
+    def query(
+            self,
+            valid_on: date = None,
+            shop_name: str = None,
+            starts_from: date = None,
+            starts_to: date = None,
+            limit: int = None) -> list[FlyerData]:
+        """
+        Looks up the flyers matching all given criteria.
+
+        The IDs of every given criterion are looked up in its index; the smallest result is
+        then filtered by the others.
+
+        Args:
+            valid_on (date, optional): Day the flyers are valid on. Defaults to None.
+            shop_name (str, optional): Shop name (case-insensitive). Defaults to None.
+            starts_from (date, optional): First start date, inclusive. Defaults to None.
+            starts_to (date, optional): Last start date, inclusive. Defaults to None.
+            limit (int, optional): Maximum number of returned flyers. Defaults to None (no limit).
+
+        Returns:
+            list[FlyerData]: The matching flyers; all flyers if no criterion is given.
+        """
+        with self._lock:
+            candidates = []
+            if valid_on is not None:
+                candidates.append(self._valid_on_ids(valid_on))
+            if shop_name is not None:
+                candidates.append(self._by_shop.get(shop_name.casefold(), []))
+            if starts_from is not None or starts_to is not None:
+                candidates.append(self._starting_between_ids(starts_from, starts_to))
+            if not candidates:
+                ids = range(len(self._flyers))
+            else:
+                candidates.sort(key=len)
+                others = [set(other) for other in candidates[1:]]
+                ids = [flyer_id for flyer_id in candidates[0] if all(flyer_id in other for other in others)]
+            return self._get(ids[:limit] if limit is not None else ids)
+
+    def shops(self) -> dict[str, int]:
+        """
+        Counts the flyers per shop.
+
+        Returns:
+            dict[str, int]: The number of flyers keyed by shop name.
+        """
+        with self._lock:
+            return {self._flyers[ids[0]].shop_name: len(ids) for ids in self._by_shop.values()}
+
+    def _valid_on_ids(self, day: date) -> list[int]:
+        with self._lock:
+            ids = list(self._by_day.get(day, []))
+            ids += [flyer_id for start, end, flyer_id in self._long if start <= day and (end is None or day <= end)]
+            return ids
+
+    def _starting_between_ids(self, start: date = None, end: date = None) -> list[int]:
+        with self._lock:
+            low = bisect.bisect_left(self._starts, (start,)) if start else 0
+            high = bisect.bisect_left(self._starts, (end + timedelta(days=1),)) if end else len(self._starts)
+            return [flyer_id for _, flyer_id in self._starts[low:high]]
+
+    def _get(self, ids) -> list[FlyerData]:
+        with self._lock:
+            return [self._flyers[flyer_id] for flyer_id in ids]
+
+
+def _to_date(value: str) -> date | None:
+    """
+    Converts an ISO date or timestamp into a date (None if missing or malformed).
+    """
+    try:
+        return date.fromisoformat(value[:10])
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_output(path: str) -> bool:
+    """
+    Checks whether a file is a published output file of a known format.
+    """
+    try:
+        detect_format(path)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_appendable(path: str) -> bool:
+    """
+    Checks whether a file is uncompressed NDJSON, which can be read from an offset.
+    """
+    return not path.endswith(".gz") and detect_format(path) == "ndjson"
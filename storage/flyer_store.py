@@ -0,0 +1,530 @@
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import bisect
+import logging
+import argparse
+from datetime import date, datetime
+from typing import Iterator
+from models.flyer_data import FlyerData
+from writers.flyer_reader import flyer_from_dict
+
+# Index entry: run ID, shop ID, segment number, offset, length and number of flyers of a block
+_ENTRY = struct.Struct("<IIIQII")
+_MAGIC = b"FLYIDX1\n"
+
+
+class FlyerStore:
+    """
+    An append-only store keeping the flyers of every run in compressed, segmented files.
+
+    Layout of the store directory:
+
+    - `segment-NNNNNN.dat`: concatenated blocks, each the zlib-compressed NDJSON of consecutive
+      flyers of one shop in one run. A segment is closed once it exceeds `segment_max_bytes`.
+    - `index.bin`: a header followed by fixed-size entries (run, shop, segment, offset, length,
+      count), one per block, in run order. Readers memory-map it: a run's entries are found
+      by bisection and a shop's by scanning the entries without decoding any flyer. Only the
+      selected blocks are read, but every one of them is decompressed into a new buffer; the
+      memory-mapped segments merely spare copying the compressed bytes before that.
+    - `catalog.json`: the shop names (their position is their ID), the runs, the highest run ID
+      ever used and the next segment number.
+
+    A run is written by `begin_run` and becomes visible when it is committed: the blocks are
+    appended to the segment first, then the catalog is replaced atomically, and the index
+    entries are appended last. An aborted or crashed run leaves only unreferenced bytes in
+    the segment, which the next `compact` reclaims. Readers ignore a torn last index entry.
+    The store supports a single writer and any number of readers.
+
+    Attributes:
+        directory (str): The store directory.
+        segment_max_bytes (int): Size after which a new segment is started.
+        block_max_flyers (int): Maximum number of flyers per block.
+        logger (logging.Logger): Logger instance for logging events.
+        _catalog (dict): The shop names, runs and next segment number.
+        _shop_ids (dict[str, int]): Shop IDs keyed by shop name.
+    """
+
+    def __init__(
+            self,
+            directory: str,
+            segment_max_bytes: int = 64 * 1024 * 1024,
+            block_max_flyers: int = 1000,
+            logger: logging.Logger = None):
+        """
+        Opens the store in `directory`, creating it if missing.
+
+        Args:
+            directory (str): The store directory.
+            segment_max_bytes (int, optional): Size after which a new segment is started. Defaults to 64 MiB.
+            block_max_flyers (int, optional): Maximum number of flyers per block. Defaults to 1000.
+            logger (logging.Logger, optional): Logger instance for logging events. Defaults to None.
+        """
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.block_max_flyers = block_max_flyers
+        self.logger = logger or logging.getLogger(__name__)
+        os.makedirs(directory, exist_ok=True)
+        self._catalog = self._load_catalog()
+        self._shop_ids = {shop_name: shop_id for shop_id, shop_name in enumerate(self._catalog["shops"])}
+
+    def get_index_path(self) -> str:
+        """
+        Retrieves the path of the offset index.
+
+        Returns:
+            str: The index path.
+        """
+        return os.path.join(self.directory, "index.bin")
+
+    def get_segment_path(self, segment: int) -> str:
+        """
+        Retrieves the path of a segment.
+
+        Args:
+            segment (int): The segment number.
+
+        Returns:
+            str: The segment path.
+        """
+        return os.path.join(self.directory, f"segment-{segment:06d}.dat")
+
+    def begin_run(self, started_at: str = None) -> "StoreRun":
+        """
+        Starts appending a new run.
+
+        Args:
+            started_at (str, optional): Start time of the run (ISO format). Defaults to None (now).
+
+        Returns:
+            StoreRun: The run, receiving flyers until it is committed or aborted.
+        """
+        last_run = max((run["id"] for run in self._catalog["runs"]), default=0)
+        run_id = max(last_run, self._catalog.get("last_run", 0)) + 1
+        return StoreRun(self, run_id, started_at or datetime.now().isoformat())
+
+    def runs(self) -> list[dict]:
+        """
+        Lists the committed runs.
+
+        Returns:
+            list[dict]: ID, start time and number of flyers of every run, oldest first.
+        """
+        counts = {}
+        for run_id, _, _, _, _, count in self._entries():
+            counts[run_id] = counts.get(run_id, 0) + count
+        return [
+            {"id": run["id"], "started_at": run["started_at"], "flyers": counts.get(run["id"], 0)}
+            for run in self._catalog["runs"]
+        ]
+
+    def shops(self) -> list[str]:
+        """
+        Lists the shops ever stored.
+
+        Returns:
+            list[str]: The shop names.
+        """
+        return list(self._catalog["shops"])
+
+    def get_latest_run(self) -> int | None:
+        """
+        Retrieves the ID of the latest committed run.
+
+        Returns:
+            int | None: The run ID, None if the store is empty.
+        """
+        return self._catalog["runs"][-1]["id"] if self._catalog["runs"] else None
+
+    def read(self, shop_name: str = None, run_id: int = None) -> Iterator[FlyerData]:
+        """
+        Reads the flyers of a shop, of a run, or of a shop in a run, decompressing only their blocks.
+
+        Args:
+            shop_name (str, optional): The shop name. Defaults to None (all shops).
+            run_id (int, optional): The run ID. Defaults to None (all runs).
+
+        Yields:
+            FlyerData: The flyers in run and write order.
+        """
+        if shop_name is not None and shop_name not in self._shop_ids:
+            return
+        shop_id = self._shop_ids.get(shop_name)
+        with _MappedIndex(self.get_index_path()) as index, _SegmentMaps(self) as segments:
+            if run_id is None:
+                low, high = 0, len(index)
+            else:
+                low = bisect.bisect_left(index, run_id, key=lambda entry: entry[0])
+                high = bisect.bisect_right(index, run_id, lo=low, key=lambda entry: entry[0])
+            for position in range(low, high):
+                _, entry_shop_id, segment, offset, length, _ = index[position]
+                if shop_id is not None and entry_shop_id != shop_id:
+                    continue
+                for line in _decompress(segments.get(segment)[offset:offset + length]).splitlines():
+                    yield flyer_from_dict(json.loads(line))
+
+    def compact(self, today: date = None) -> int:
+        """
+        Rewrites the store without the expired flyers and the bytes of aborted runs.
+
+        The live blocks are copied into new segments, dropping flyers whose validity ended
+        before `today`; the new index replaces the old one atomically before the old segments
+        are deleted. Runs keep their IDs; runs left without flyers are removed from the catalog, 
+        and their IDs are not reused.
+
+        Args:
+            today (date, optional): Flyers valid until before this day are dropped. Defaults to None (today).
+
+        Returns:
+            int: The number of dropped flyers.
+        """
+        today = (today or date.today()).isoformat()
+        old_segments = self._segment_numbers()
+        first_segment = self._catalog["next_segment"]
+        self._catalog["next_segment"] += 1
+        entries = []
+        dropped = 0
+        with _SegmentMaps(self) as segments:
+            segment = first_segment
+            segment_file = open(self.get_segment_path(segment), "ab")
+            try:
+                for run_id, shop_id, old_segment, offset, length, _ in self._entries():
+                    lines = _decompress(segments.get(old_segment)[offset:offset + length]).splitlines()
+                    kept = [line for line in lines if not _is_expired(json.loads(line), today)]
+                    dropped += len(lines) - len(kept)
+                    if not kept:
+                        continue
+                    if segment_file.tell() >= self.segment_max_bytes:
+                        segment_file.close()
+                        segment = self._catalog["next_segment"]
+                        self._catalog["next_segment"] += 1
+                        segment_file = open(self.get_segment_path(segment), "ab")
+                    block = zlib.compress(b"\n".join(kept))
+                    entries.append((run_id, shop_id, segment, segment_file.tell(), len(block), len(kept)))
+                    segment_file.write(block)
+                segment_file.flush()
+                os.fsync(segment_file.fileno())
+            finally:
+                segment_file.close()
+        runs = self._catalog["runs"]
+        if runs:
+            self._catalog["last_run"] = max(self._catalog.get("last_run", 0), runs[-1]["id"])
+        live_runs = {entry[0] for entry in entries}
+        self._catalog["runs"] = [run for run in runs if run["id"] in live_runs]
+        self._save_catalog()
+        index_part_path = self.get_index_path() + ".part"
+        with open(index_part_path, "wb") as index_file:
+            index_file.write(_MAGIC)
+            index_file.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+        os.replace(index_part_path, self.get_index_path())
+        for old_segment in old_segments:
+            os.remove(self.get_segment_path(old_segment))
+        self.logger.info(
+            f"Compacted {self.directory}: dropped {dropped} expired flyers and {len(runs) - len(self._catalog['runs'])} "
+            f"empty runs, {len(entries)} blocks left"
+        )
+        return dropped
+
+    def _entries(self) -> list[tuple[int, int, int, int, int, int]]:
+        """
+        Reads all index entries.
+        """
+        with _MappedIndex(self.get_index_path()) as index:
+            return [index[position] for position in range(len(index))]
+
+    def _segment_numbers(self) -> list[int]:
+        return sorted(
+            int(name[len("segment-"):-len(".dat")])
+            for name in os.listdir(self.directory)
+            if name.startswith("segment-") and name.endswith(".dat")
+        )
+
+    def _load_catalog(self) -> dict:
+        path = os.path.join(self.directory, "catalog.json")
+        if not os.path.exists(path):
+            return {"shops": [], "runs": [], "next_segment": 1}
+        with open(path, encoding="UTF-8") as catalog_file:
+            return json.load(catalog_file)
+
+    def _save_catalog(self):
+        """
+        Replaces the catalog atomically.
+        """
+        path = os.path.join(self.directory, "catalog.json")
+        with open(path + ".part", "w", encoding="UTF-8") as catalog_file:
+            json.dump(self._catalog, catalog_file)
+            catalog_file.flush()
+            os.fsync(catalog_file.fileno())
+        os.replace(path + ".part", path)
+
+    def _get_shop_id(self, shop_name: str) -> int:
+        shop_id = self._shop_ids.get(shop_name)
+        if shop_id is None:
+            shop_id = self._shop_ids[shop_name] = len(self._catalog["shops"])
+            self._catalog["shops"].append(shop_name)
+        return shop_id
+
+    def _append_entries(self, entries: list[tuple], run: dict):
+        """
+        Commits a run: registers it in the catalog, then appends its index entries.
+        """
+        self._catalog["runs"].append(run)
+        self._save_catalog()
+        index_path = self.get_index_path()
+        with open(index_path, "ab") as index_file:
+            if index_file.tell() == 0:
+                index_file.write(_MAGIC)
+            else:
+                # Cut a torn entry left by a crashed commit, so the new entries stay aligned
+                torn = (index_file.tell() - len(_MAGIC)) % _ENTRY.size
+                if torn:
+                    index_file.truncate(index_file.tell() - torn)
+                    index_file.seek(0, os.SEEK_END)
+            index_file.write(b"".join(_ENTRY.pack(*entry) for entry in entries))
+            index_file.flush()
+            os.fsync(index_file.fileno())
+
+
+class StoreRun:
+    """
+    A run being appended to a FlyerStore.
+
+    Consecutive flyers of the same shop are collected into a block, which is compressed and
+    appended to the current segment once the shop changes or it holds `block_max_flyers`
+    flyers. Nothing is visible to readers until `commit`.
+
+    Attributes:
+        store (FlyerStore): The store the run is appended to.
+        run_id (int): The ID of the run.
+        started_at (str): Start time of the run.
+        _shop_name (str): The shop of the block being collected.
+        _lines (list[bytes]): Serialized flyers of the block being collected.
+        _entries (list[tuple]): Index entries of the written blocks.
+        _segment (int): Number of the segment being appended to.
+        _segment_file (IO): The open segment (None until the first block).
+        _written (int): Number of flyers appended so far.
+    """
+
+    def __init__(self, store: FlyerStore, run_id: int, started_at: str):
+        """
+        Initializes the StoreRun.
+
+        Args:
+            store (FlyerStore): The store the run is appended to.
+            run_id (int): The ID of the run.
+            started_at (str): Start time of the run (ISO format).
+        """
+        self.store = store
+        self.run_id = run_id
+        self.started_at = started_at
+        self._shop_name = None
+        self._lines = []
+        self._entries = []
+        self._segment = None
+        self._segment_file = None
+        self._written = 0
+
+    def get_written(self) -> int:
+        """
+        Retrieves the number of flyers appended so far.
+
+        Returns:
+            int: The number of flyers.
+        """
+        return self._written
+
+    def append(self, record: dict):
+        """
+        Appends a flyer.
+
+        Args:
+            record (dict): The flyer's field values keyed by field name.
+        """
+        if record["shop_name"] != self._shop_name or len(self._lines) >= self.store.block_max_flyers:
+            self._write_block()
+            self._shop_name = record["shop_name"]
+        self._lines.append(json.dumps(record).encode("utf-8"))
+        self._written += 1
+
+    def commit(self) -> int:
+        """
+        Writes the last block and makes the run visible to readers.
+
+        Returns:
+            int: The ID of the run.
+        """
+        self._write_block()
+        if self._segment_file is not None:
+            self._segment_file.flush()
+            os.fsync(self._segment_file.fileno())
+            self._segment_file.close()
+            self._segment_file = None
+        self.store._append_entries(self._entries, {"id": self.run_id, "started_at": self.started_at})
+        return self.run_id
+
+    def abort(self):
+        """
+        Stops the run without making it visible; its written blocks are reclaimed by the next compaction.
+        """
+        if self._segment_file is not None:
+            self._segment_file.close()
+            self._segment_file = None
+
+    def _write_block(self):
+        if not self._lines:
+            return
+        segment_file = self._open_segment()
+        block = zlib.compress(b"\n".join(self._lines))
+        self._entries.append((
+            self.run_id, self.store._get_shop_id(self._shop_name),
+            self._segment, segment_file.tell(), len(block), len(self._lines),
+        ))
+        segment_file.write(block)
+        self._lines = []
+
+    def _open_segment(self):
+        """
+        Opens the last segment for appending, or starts a new one once it is full.
+        """
+        if self._segment_file is not None and self._segment_file.tell() < self.store.segment_max_bytes:
+            return self._segment_file
+        if self._segment_file is not None:
+            self._segment_file.close()
+        catalog = self.store._catalog
+        last_segment = catalog["next_segment"] - 1
+        if self._segment is None and last_segment > 0:
+            last_path = self.store.get_segment_path(last_segment)
+            if os.path.exists(last_path) and os.path.getsize(last_path) < self.store.segment_max_bytes:
+                self._segment = last_segment
+                self._segment_file = open(last_path, "ab")
+                return self._segment_file
+        self._segment = catalog["next_segment"]
+        catalog["next_segment"] += 1
+        self._segment_file = open(self.store.get_segment_path(self._segment), "ab")
+        return self._segment_file
+
+
+class _MappedIndex:
+    """
+    A read-only sequence of the entries of a memory-mapped index file.
+    """
+
+    def __init__(self, path: str):
+        self._path = path
+        self._file = None
+        self._map = None
+        self._length = 0
+
+    def __enter__(self) -> "_MappedIndex":
+        if os.path.exists(self._path) and os.path.getsize(self._path) > len(_MAGIC):
+            self._file = open(self._path, "rb")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._map[:len(_MAGIC)] != _MAGIC:
+                self.__exit__()
+                raise ValueError(f"{self._path} is not a flyer store index")
+            self._length = (len(self._map) - len(_MAGIC)) // _ENTRY.size
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+            self._map = self._file = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int) -> tuple[int, int, int, int, int, int]:
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        return _ENTRY.unpack_from(self._map, len(_MAGIC) + position * _ENTRY.size)
+
+
+class _SegmentMaps:
+    """
+    Memory-maps the segments of a store on first use and unmaps them on exit.
+    """
+
+    def __init__(self, store: FlyerStore):
+        self._store = store
+        self._maps = {}
+
+    def __enter__(self) -> "_SegmentMaps":
+        return self
+
+    def __exit__(self, *exc_info):
+        for segment_file, segment_map, view in self._maps.values():
+            view.release()
+            segment_map.close()
+            segment_file.close()
+        self._maps = {}
+
+    def get(self, segment: int) -> memoryview:
+        if segment not in self._maps:
+            segment_file = open(self._store.get_segment_path(segment), "rb")
+            segment_map = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = (segment_file, segment_map, memoryview(segment_map))
+        return self._maps[segment][2]
+
+
+def _decompress(block: memoryview) -> bytes:
+    """
+    Decompresses a block sliced from a memory-mapped segment into a new buffer, releasing the slice.
+    """
+    try:
+        return zlib.decompress(block)
+    finally:
+        block.release()
+
+
+def _is_expired(record: dict, today: str) -> bool:
+    """
+    Checks whether a flyer's validity ended before `today` (flyers without a valid end date never expire).
+    """
+    valid_to = record.get("valid_to") or ""
+    try:
+        date.fromisoformat(valid_to[:10])
+    except ValueError:
+        return False
+    return valid_to[:10] < today
+
+
+def main():
+    """
+    Lists, reads and compacts a flyer store.
+
+    Command-line arguments:
+        store (str): The store directory.
+        command (str): "runs" lists the runs, "read" prints flyers as NDJSON, "compact" drops expired flyers.
+        --shop (str): Shop whose flyers are read (default is None, meaning all shops).
+        --run (int): Run whose flyers are read, 0 for the latest run (default is None, meaning all runs).
+        --today (str): Day before which expired flyers are dropped by compact (default is None, meaning today).
+    """
+    parser = argparse.ArgumentParser(description="List, read and compact a flyer store")
+    parser.add_argument("store", help="The store directory")
+    parser.add_argument("command", choices=["runs", "read", "compact"], help="The operation")
+    parser.add_argument("--shop", type=str, default=None, help="Shop whose flyers are read (default: all shops)")
+    parser.add_argument("--run", type=int, default=None, help="Run whose flyers are read, 0 for the latest (default: all runs)")
+    parser.add_argument("--today", type=date.fromisoformat, default=None, help="Day before which expired flyers are dropped (default: today)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    store = FlyerStore(args.store)
+    if args.command == "runs":
+        for run in store.runs():
+            print(json.dumps(run))
+    elif args.command == "read":
+        run_id = store.get_latest_run() if args.run == 0 else args.run
+        for flyer in store.read(shop_name=args.shop, run_id=run_id):
+            sys.stdout.write(json.dumps(flyer.to_dict()) + "\n")
+    else:
+        store.compact(args.today)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+import os
+import gzip
+import json
+import zlib
+import logging
+import itertools
+from datetime import datetime
+from typing import Iterator
+
+
+class PageArchive:
+    """
+    A compressed, append-only archive of fetched pages used to record and replay crawls.
+
+    The archive is a gzip-compressed NDJSON file. Every record is appended as its own gzip
+    member, which readers see as one continuous stream, so an archive is never rewritten and
+    a single page can be decompressed without reading the records before it. Lines are either
+
+    - a meta record `{"type": "meta", "base_url": ..., "categories": [...], "recorded_at": ...}`
+      describing the crawl that follows, or
+    - a page record `{"type": "page", "url": ..., "fetched_at": ..., "body": ...}`.
+
+    Next to the archive, an uncompressed index (`<path>.idx`) holds one JSON line per record:
+    the record without its body, plus the offset and length of its gzip member. Replays read
+    the index and decompress a page only when it is requested (see `index` and `read_body`).
+    Records missing from the index (e.g. a deleted index) are found by scanning the archive
+    from the end of the indexed part. Both files are flushed every `flush_every` records; an
+    interrupted recording stays readable up to the last complete record, and its torn tail is
+    cut off when the archive is opened for appending again.
+
+    Attributes:
+        _path (str): Path of the archive file.
+        _index_path (str): Path of the index file.
+        _flush_every (int): Number of records after which both files are flushed.
+        _file (BinaryIO): The archive opened for appending (None until `open`).
+        _index_file (TextIO): The index opened for appending (None until `open`).
+        _pending (int): Records written since the last flush.
+        logger (logging.Logger): Logger instance for error logging.
+    """
+
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, path: str, flush_every: int = 20, logger: logging.Logger = None):
+        """
+        Initializes the PageArchive.
+
+        Args:
+            path (str): Path of the archive file (e.g. "data/archive/2025-01-01.ndjson.gz").
+            flush_every (int, optional): Records after which both files are flushed. Defaults to 20.
+            logger (logging.Logger, optional): A logger instance for error logging. Defaults to None.
+        """
+        self._path = path
+        self._index_path = path + ".idx"
+        self._flush_every = flush_every
+        self._file = None
+        self._index_file = None
+        self._pending = 0
+        self.logger = logger
+
+    def __enter__(self) -> "PageArchive":
+        return self.open()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_path(self) -> str:
+        """
+        Retrieves the path of the archive file.
+
+        Returns:
+            str: The archive path.
+        """
+        return self._path
+
+    def open(self) -> "PageArchive":
+        """
+        Opens the archive for appending, creating it (and its directory) if needed.
+
+        Records of an existing archive missing from its index are indexed first, and torn
+        tails of both files are cut off, so new records follow the last complete one.
+
+        Returns:
+            PageArchive: The archive itself.
+        """
+        if self._file is None:
+            directory = os.path.dirname(self._path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            _, end, index_size = self._read_index()
+            missing = list(self._scan(end))
+            if missing:
+                end = missing[-1]["offset"] + missing[-1]["length"]
+            if os.path.exists(self._path) and os.path.getsize(self._path) > end:
+                os.truncate(self._path, end)
+            if os.path.exists(self._index_path) and os.path.getsize(self._index_path) > index_size:
+                os.truncate(self._index_path, index_size)
+            self._file = open(self._path, "ab")
+            self._index_file = open(self._index_path, "a", encoding="UTF-8")
+            for entry in missing:
+                self._index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index_file.flush()
+        return self
+
+    def close(self):
+        """
+        Flushes and closes the archive and its index.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def write_meta(self, base_url: str, categories: list[str]):
+        """
+        Records the settings of the crawl whose pages follow.
+
+        Args:
+            base_url (str): The base URL of the crawl.
+            categories (list[str]): The crawled categories.
+        """
+        self._write({
+            "type": "meta",
+            "base_url": base_url,
+            "categories": list(categories),
+            "recorded_at": datetime.now().isoformat(),
+        })
+
+    def record(self, url: str, body: str):
+        """
+        Appends a fetched page.
+
+        Args:
+            url (str): The URL of the page.
+            body (str): The page content.
+        """
+        self._write({"type": "page", "url": url, "fetched_at": datetime.now().isoformat(), "body": body})
+
+    def _write(self, record: dict):
+        self.open()
+        member = gzip.compress(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n", mtime=0)
+        offset = self._file.tell()
+        self._file.write(member)
+        entry = _index_entry(record, offset, len(member), 0)
+        self._index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self._flush_every:
+            self._file.flush()
+            self._index_file.flush()
+            self._pending = 0
+
+    def iter_records(self) -> Iterator[dict]:
+        """
+        Iterates over the records of the archive in the order they were written.
+
+        A truncated tail (e.g. an interrupted recording) ends the iteration with a warning.
+
+        Yields:
+            dict: The meta and page records.
+        """
+        try:
+            with gzip.open(self._path, "rb") as archive_file:
+                for line in archive_file:
+                    if line.endswith(b"\n"):
+                        yield json.loads(line)
+        except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+            if self.logger:
+                self.logger.warning(f"Archive {self._path} is truncated, ignoring its tail: {e}")
+
+    def index(self, until: str = None) -> tuple[dict, dict[str, tuple[int, int, int]]]:
+        """
+        Locates the latest recorded version of every page from the index, without reading the page bodies.
+
+        Only records missing from the index are decompressed (see `_scan`).
+
+        Args:
+            until (str, optional): ISO timestamp; pages fetched later are ignored. Defaults to None (no limit).
+
+        Returns:
+            tuple[dict, dict[str, tuple[int, int, int]]]: The last meta record (empty dict if none) and the
+                locations of the page records keyed by URL, to be passed to `read_body`.
+        """
+        entries, end, _ = self._read_index()
+        meta = {}
+        locations = {}
+        for entry in itertools.chain(entries, self._scan(end)):
+            if entry.get("type") == "meta":
+                if until is None or entry["recorded_at"] <= until:
+                    meta = {key: value for key, value in entry.items() if key not in ("offset", "length", "line")}
+            elif until is None or entry["fetched_at"] <= until:
+                locations[entry["url"]] = (entry["offset"], entry["length"], entry["line"])
+        return meta, locations
+
+    def read_body(self, location: tuple[int, int, int]) -> str:
+        """
+        Reads the body of a page record by decompressing only its gzip member.
+
+        Args:
+            location (tuple[int, int, int]): Offset and length of the member and line of the record, as returned by `index`.
+
+        Returns:
+            str: The page content.
+        """
+        offset, length, line = location
+        with open(self._path, "rb") as archive_file:
+            archive_file.seek(offset)
+            member = archive_file.read(length)
+        return json.loads(gzip.decompress(member).split(b"\n")[line])["body"]
+
+    def _read_index(self) -> tuple[list[dict], int, int]:
+        """
+        Reads the index entries that match complete members of the archive.
+
+        Reading stops at the first torn, unreadable or out-of-place entry.
+
+        Returns:
+            tuple[list[dict], int, int]: The entries, the archive offset they cover up to and
+                the length of the index part holding them.
+        """
+        entries = []
+        end = 0
+        index_size = 0
+        if not os.path.exists(self._index_path) or not os.path.exists(self._path):
+            return entries, end, index_size
+        archive_size = os.path.getsize(self._path)
+        member_offset = None
+        with open(self._index_path, "rb") as index_file:
+            for line in index_file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    offset, length = entry["offset"], entry["length"]
+                except (ValueError, KeyError):
+                    break
+                if offset not in (end, member_offset) or offset + length > archive_size:
+                    break
+                entries.append(entry)
+                member_offset = offset
+                end = offset + length
+                index_size += len(line)
+        return entries, end, index_size
+
+    def _scan(self, offset: int) -> Iterator[dict]:
+        """
+        Decompresses the archive from a member boundary on and yields the index entries of its complete members.
+
+        Args:
+            offset (int): Offset of the first member to scan.
+
+        Yields:
+            dict: The index entries, in archive order.
+        """
+        if not os.path.exists(self._path) or os.path.getsize(self._path) <= offset:
+            return
+        with open(self._path, "rb") as archive_file:
+            archive_file.seek(offset)
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            member_offset = offset
+            consumed = 0
+            content = bytearray()
+            try:
+                while chunk := archive_file.read(self.CHUNK_SIZE):
+                    while chunk:
+                        content += decompressor.decompress(chunk)
+                        if not decompressor.eof:
+                            consumed += len(chunk)
+                            break
+                        length = consumed + len(chunk) - len(decompressor.unused_data)
+                        for line_number, line in enumerate(content.split(b"\n")[:-1]):
+                            yield _index_entry(json.loads(line), member_offset, length, line_number)
+                        chunk = decompressor.unused_data
+                        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                        member_offset += length
+                        consumed = 0
+                        content = bytearray()
+            except (zlib.error, ValueError) as e:
+                if self.logger:
+                    self.logger.warning(f"Archive {self._path} is corrupt after offset {member_offset}, ignoring its tail: {e}")
+                return
+            if consumed and self.logger:
+                self.logger.warning(f"Archive {self._path} is truncated after offset {member_offset}, ignoring its tail")
+
+
+def _index_entry(record: dict, offset: int, length: int, line: int) -> dict:
+    """
+    Builds the index entry of a record: the record without its body and the location of its gzip member.
+    """
+    entry = {key: value for key, value in record.items() if key != "body"}
+    entry.update(offset=offset, length=length, line=line)
+    return entry
@@ -0,0 +1,210 @@
+import os
+import json
+import sqlite3
+import hashlib
+from datetime import date, datetime
+from models.flyer_data import FlyerData
+
+
+class StateStore:
+    """
+    A persistent SQLite store of crawl state used for incremental crawls.
+
+    The store remembers a content hash of every shop detail page and a stable key of every
+    flyer ever emitted: (shop name, title, valid from, valid to). Unchanged pages can then be
+    skipped without parsing, and only flyers that were not emitted before are reported.
+    Flyers whose validity ended are reported once more, with their stored data and marked as
+    expired, when they expire.
+
+    Changes are staged in memory and only written by `commit`, which the caller invokes once
+    the reported flyers were published. A run that crashes before leaves the state untouched,
+    so its flyers are reported again by the next run instead of being lost.
+
+    Attributes:
+        _db_path (str): Path of the SQLite database file.
+        _connection (sqlite3.Connection): Open database connection.
+        _pending_pages (dict[str, str]): Staged content hashes keyed by page URL.
+        _pending_flyers (dict[tuple, tuple]): Staged `(data, first_seen, expired)` of new flyers keyed by flyer key.
+        _pending_expired (set[int]): Staged rowids of the flyers reported as expired.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS pages (
+            url TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS flyers (
+            shop_name TEXT NOT NULL,
+            title TEXT NOT NULL,
+            valid_from TEXT NOT NULL,
+            valid_to TEXT NOT NULL,
+            data TEXT NOT NULL,
+            first_seen TEXT NOT NULL,
+            expired INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (shop_name, title, valid_from, valid_to)
+        );
+        CREATE INDEX IF NOT EXISTS flyers_expiry ON flyers (expired, valid_to);
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Opens (and if needed creates) the state database.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+        """
+        self._db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(db_path)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(self.SCHEMA)
+        self._clear_pending()
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self._connection.close()
+
+    @staticmethod
+    def content_hash(html_string: str) -> str:
+        """
+        Computes the content hash of a page.
+
+        Args:
+            html_string (str): The HTML content of the page.
+
+        Returns:
+            str: The hex SHA-256 digest of the page.
+        """
+        return hashlib.sha256(html_string.encode("utf-8")).hexdigest()
+
+    def is_page_unchanged(self, url: str, content_hash: str) -> bool:
+        """
+        Checks whether a page has the same content hash as when it was last recorded (staged or committed).
+
+        Args:
+            url (str): The URL of the page.
+            content_hash (str): The content hash of the freshly fetched page.
+
+        Returns:
+            bool: True if the page is known and unchanged.
+        """
+        if url in self._pending_pages:
+            return self._pending_pages[url] == content_hash
+        row = self._connection.execute("SELECT content_hash FROM pages WHERE url = ?", (url,)).fetchone()
+        return row is not None and row[0] == content_hash
+
+    def record_page(self, url: str, content_hash: str):
+        """
+        Stages the content hash of a successfully processed page.
+
+        Args:
+            url (str): The URL of the page.
+            content_hash (str): The content hash of the page.
+        """
+        self._pending_pages[url] = content_hash
+
+    def filter_new_flyers(self, flyers: list[FlyerData]) -> list[FlyerData]:
+        """
+        Returns only the flyers that were not seen before, without staging them.
+
+        A flyer whose title or validity changed has a new key and therefore counts as new.
+        The returned flyers are staged by `record_flyers` once they were processed.
+
+        Args:
+            flyers (list[FlyerData]): The flyers parsed from a page.
+
+        Returns:
+            list[FlyerData]: The flyers not seen in any previous run nor before in this run.
+        """
+        new_flyers = []
+        keys = set()
+        for flyer in flyers:
+            key = self._flyer_key(flyer)
+            if key in keys or key in self._pending_flyers or self._connection.execute(
+                "SELECT 1 FROM flyers WHERE shop_name = ? AND title = ? AND valid_from = ? AND valid_to = ?", key
+            ).fetchone():
+                continue
+            keys.add(key)
+            new_flyers.append(flyer)
+        return new_flyers
+
+    def record_flyers(self, flyers: list[FlyerData]):
+        """
+        Stages successfully processed flyers as seen.
+
+        A flyer whose validity already ended when it is first seen is recorded as expired, 
+        so it is not reported once more by `pop_expired_flyers`.
+
+        Args:
+            flyers (list[FlyerData]): The flyers returned by `filter_new_flyers`.
+        """
+        now = datetime.now().isoformat()
+        today = date.today().isoformat()
+        for flyer in flyers:
+            expired = bool(flyer.valid_to) and flyer.valid_to < today
+            self._pending_flyers[self._flyer_key(flyer)] = (json.dumps(flyer.to_dict()), now, expired)
+
+    @staticmethod
+    def _flyer_key(flyer: FlyerData) -> tuple:
+        return (flyer.shop_name, flyer.title, flyer.valid_from, flyer.valid_to)
+
+    def pop_expired_flyers(self, today: date = None) -> list[FlyerData]:
+        """
+        Stages the flyers whose validity ended before `today` as expired and returns them.
+
+        Every flyer is returned only once, in the first run after it expired, with `expired` set 
+        so consumers can tell it apart from the new flyers.
+
+        Args:
+            today (date, optional): The reference date. Defaults to None (today).
+
+        Returns:
+            list[FlyerData]: The stored data of the newly expired flyers.
+        """
+        today = (today or date.today()).isoformat()
+        rows = [
+            (rowid, data) for rowid, data in self._connection.execute(
+                "SELECT rowid, data FROM flyers WHERE expired = 0 AND valid_to != '' AND valid_to < ?", (today,)
+            ) if rowid not in self._pending_expired
+        ]
+        self._pending_expired.update(rowid for rowid, _ in rows)
+        return [FlyerData(**{**json.loads(data), "expired": True}) for _, data in rows]
+
+    def commit(self):
+        """
+        Writes the staged pages, flyers and expirations in one transaction.
+
+        Called once the flyers reported since the last commit are published, e.g. after 
+        the output writer was closed successfully.
+        """
+        now = datetime.now().isoformat()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO pages (url, content_hash, updated_at) VALUES (?, ?, ?)",
+                [(url, content_hash, now) for url, content_hash in self._pending_pages.items()],
+            )
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO flyers (shop_name, title, valid_from, valid_to, data, first_seen, expired) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(*key, *values) for key, values in self._pending_flyers.items()],
+            )
+            self._connection.executemany(
+                "UPDATE flyers SET expired = 1 WHERE rowid = ?", [(rowid,) for rowid in self._pending_expired]
+            )
+        self._clear_pending()
+
+    def rollback(self):
+        """
+        Discards the staged changes, e.g. after the output failed to be written.
+        """
+        self._clear_pending()
+
+    def _clear_pending(self):
+        self._pending_pages = {}
+        self._pending_flyers = {}
+        self._pending_expired = set()
@@ -0,0 +1,204 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+
+class WorkQueue:
+    """
+    A lock-safe SQLite lease table distributing shops among crawl workers.
+
+    A coordinator enqueues the shops found on the main pages. Workers, in any number of
+    processes, claim small batches of shops by taking a lease on them. A worker that
+    finishes a batch marks its shops done and records the partial output file holding
+    their flyers. If a worker dies, its leases expire after `lease_timeout` seconds and
+    the shops are claimed again by another worker. A shop that keeps failing is given up
+    after `max_attempts` claims.
+
+    Claims run in `BEGIN IMMEDIATE` transactions, so concurrent workers never lease the
+    same shop. Workers on several machines can share the queue if the database lives on
+    a disk with working file locks (not all network file systems qualify).
+
+    Attributes:
+        _db_path (str): Path of the SQLite database file.
+        _lease_timeout (float): Seconds after which an unfinished lease expires.
+        _max_attempts (int): Claims after which a shop is marked failed.
+        _connection (sqlite3.Connection): Open database connection.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS shops (
+            url TEXT PRIMARY KEY,
+            shop_name TEXT NOT NULL,
+            categories TEXT NOT NULL,
+            state TEXT NOT NULL DEFAULT 'pending',
+            worker TEXT,
+            lease_expires REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            output TEXT
+        );
+        CREATE INDEX IF NOT EXISTS shops_state ON shops (state, lease_expires);
+    """
+
+    PENDING = "pending"
+    LEASED = "leased"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, db_path: str, lease_timeout: float = 300, max_attempts: int = 3):
+        """
+        Opens (and if needed creates) the work queue database.
+
+        Args:
+            db_path (str): Path of the SQLite database file.
+            lease_timeout (float, optional): Seconds after which an unfinished lease expires. Defaults to 300.
+            max_attempts (int, optional): Claims after which a shop is marked failed. Defaults to 3.
+        """
+        self._db_path = db_path
+        self._lease_timeout = lease_timeout
+        self._max_attempts = max_attempts
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._connection = sqlite3.connect(db_path, timeout=60, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(self.SCHEMA)
+
+    def close(self):
+        """
+        Closes the database connection.
+        """
+        self._connection.close()
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the `with` block in a write transaction, locking the database for other writers right away.
+        """
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def enqueue(self, links: dict[str, str], shop_categories: dict[str, list[str]] = None) -> int:
+        """
+        Adds shops to the queue. Shops already in the queue are left unchanged.
+
+        Args:
+            links (dict[str, str]): A dictionary mapping detail page URLs to their shop names.
+            shop_categories (dict[str, list[str]], optional): Categories of every shop keyed by URL. Defaults to None.
+
+        Returns:
+            int: The number of newly enqueued shops.
+        """
+        shop_categories = shop_categories or {}
+        with self._transaction():
+            before = self._connection.total_changes
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO shops (url, shop_name, categories) VALUES (?, ?, ?)",
+                [(url, shop_name, json.dumps(shop_categories.get(url, []))) for url, shop_name in links.items()],
+            )
+            return self._connection.total_changes - before
+
+    def claim(self, worker_id: str, batch_size: int = 10) -> list[tuple[str, str, list[str]]]:
+        """
+        Leases up to `batch_size` pending shops (or shops whose lease expired) to a worker.
+
+        Args:
+            worker_id (str): Identifier of the claiming worker.
+            batch_size (int, optional): Maximum number of shops to lease. Defaults to 10.
+
+        Returns:
+            list[tuple[str, str, list[str]]]: The leased shops as (shop name, URL, categories). Empty if none is available.
+        """
+        now = time.time()
+        with self._transaction():
+            self._connection.execute(
+                "UPDATE shops SET state = ?, worker = NULL, lease_expires = NULL "
+                "WHERE state = ? AND lease_expires < ? AND attempts >= ?",
+                (self.FAILED, self.LEASED, now, self._max_attempts),
+            )
+            rows = self._connection.execute(
+                "SELECT url, shop_name, categories FROM shops "
+                "WHERE state = ? OR (state = ? AND lease_expires < ?) ORDER BY rowid LIMIT ?",
+                (self.PENDING, self.LEASED, now, batch_size),
+            ).fetchall()
+            self._connection.executemany(
+                "UPDATE shops SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + 1 WHERE url = ?",
+                [(self.LEASED, worker_id, now + self._lease_timeout, url) for url, _, _ in rows],
+            )
+        return [(shop_name, url, json.loads(categories)) for url, shop_name, categories in rows]
+
+    def complete(self, worker_id: str, urls: list[str], output: str):
+        """
+        Marks leased shops done and records the partial output file holding their flyers.
+
+        Shops whose lease meanwhile passed to another worker are left to that worker.
+
+        Args:
+            worker_id (str): Identifier of the worker holding the leases.
+            urls (list[str]): URLs of the finished shops.
+            output (str): Path of the partial output file.
+        """
+        with self._transaction():
+            self._connection.executemany(
+                "UPDATE shops SET state = ?, lease_expires = NULL, output = ? WHERE url = ? AND worker = ? AND state = ?",
+                [(self.DONE, output, url, worker_id, self.LEASED) for url in urls],
+            )
+
+    def release(self, worker_id: str, urls: list[str]):
+        """
+        Returns leased shops to the queue (e.g. when a worker shuts down), so they can be claimed immediately.
+
+        Args:
+            worker_id (str): Identifier of the worker holding the leases.
+            urls (list[str]): URLs of the shops to release.
+        """
+        with self._transaction():
+            self._connection.executemany(
+                "UPDATE shops SET state = ?, worker = NULL, lease_expires = NULL WHERE url = ? AND worker = ? AND state = ?",
+                [(self.PENDING, url, worker_id, self.LEASED) for url in urls],
+            )
+
+    def counts(self) -> dict[str, int]:
+        """
+        Counts the shops in every state.
+
+        Returns:
+            dict[str, int]: Number of shops per state ("pending", "leased", "done", "failed").
+        """
+        counts = dict.fromkeys((self.PENDING, self.LEASED, self.DONE, self.FAILED), 0)
+        counts.update(self._connection.execute("SELECT state, COUNT(*) FROM shops GROUP BY state").fetchall())
+        return counts
+
+    def is_drained(self) -> bool:
+        """
+        Checks whether every shop is done or failed.
+
+        Returns:
+            bool: True if no shop is pending or leased.
+        """
+        counts = self.counts()
+        return not counts[self.PENDING] and not counts[self.LEASED]
+
+    def get_outputs(self) -> dict[str, set[str]]:
+        """
+        Retrieves the partial output files of all finished shops.
+
+        A part file may also hold flyers of a shop whose lease expired and that was finished
+        again by another worker; only the shops listed for a part should be read from it.
+
+        Returns:
+            dict[str, set[str]]: The names of the finished shops keyed by their partial output path, in completion order.
+        """
+        outputs = {}
+        rows = self._connection.execute(
+            "SELECT output, shop_name FROM shops WHERE state = ? ORDER BY rowid", (self.DONE,)
+        ).fetchall()
+        for output, shop_name in rows:
+            outputs.setdefault(output, set()).add(shop_name)
+        return outputs
@@ -0,0 +1,61 @@
+import asyncio
+import unittest
+from fetchers.byte_budget import ByteBudget
+
+
+class ByteBudgetTest(unittest.IsolatedAsyncioTestCase):
+    async def test_acquire_waits_until_bytes_are_released(self):
+        budget = ByteBudget(100)
+        first = await budget.acquire(60)
+        waiter = asyncio.create_task(budget.acquire(60))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+        budget.release(first)
+        self.assertEqual(await asyncio.wait_for(waiter, timeout=1), 60)
+        self.assertEqual(budget.get_reserved(), 60)
+
+    async def test_oversized_page_is_granted_alone(self):
+        budget = ByteBudget(100)
+        self.assertEqual(await asyncio.wait_for(budget.acquire(500), timeout=1), 500)
+        self.assertEqual(budget.get_peak(), 500)
+
+    async def test_waiters_are_served_in_order(self):
+        budget = ByteBudget(100)
+        reserved = await budget.acquire(100)
+        granted = []
+
+        async def acquire(size: int):
+            await budget.acquire(size)
+            granted.append(size)
+
+        tasks = [asyncio.create_task(acquire(size)) for size in (80, 10)]
+        await asyncio.sleep(0)
+        budget.release(reserved)
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+        self.assertEqual(granted, [80, 10])
+
+    async def test_adjust_corrects_reservation_and_estimate(self):
+        budget = ByteBudget(1000, initial_estimate=100)
+        reserved = await budget.acquire()
+        self.assertEqual(reserved, 100)
+        reserved = budget.adjust(reserved, 300)
+        self.assertEqual(budget.get_reserved(), 300)
+        self.assertEqual(budget.get_estimate(), 300)
+        budget.release(reserved)
+        self.assertEqual(budget.get_reserved(), 0)
+
+    async def test_cancelled_waiter_lets_the_next_one_through(self):
+        budget = ByteBudget(100)
+        reserved = await budget.acquire(100)
+        cancelled = asyncio.create_task(budget.acquire(100))
+        waiter = asyncio.create_task(budget.acquire(10))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        budget.release(reserved)
+        self.assertEqual(await asyncio.wait_for(waiter, timeout=1), 10)
+        self.assertEqual(budget.get_reserved(), 10)
+
+    def test_capacity_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            ByteBudget(0)
@@ -0,0 +1,90 @@
+import time
+import logging
+import tempfile
+import unittest
+import httpx
+from fetchers.cache import ResponseCache
+from fetchers.fetcher import Fetcher
+from fetchers.retry import RetryPolicy
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_fresh_response_is_served_until_max_age(self):
+        self.cache.store("http://localhost/a/", "body", {"Cache-Control": "max-age=60"})
+        entry = self.cache.get("http://localhost/a/")
+        self.assertEqual(entry.body, "body")
+        self.assertTrue(entry.is_fresh())
+        entry.expires_at = time.time() - 1
+        self.assertFalse(entry.is_fresh())
+
+    def test_response_with_validator_must_be_revalidated(self):
+        self.cache.store("http://localhost/a/", "body", {"ETag": '"v1"'})
+        entry = self.cache.get("http://localhost/a/")
+        self.assertFalse(entry.is_fresh())
+        self.assertEqual(entry.conditional_headers(), {"If-None-Match": '"v1"'})
+
+    def test_uncacheable_responses_are_not_stored(self):
+        self.assertIsNone(self.cache.store("http://localhost/a/", "body", {"Cache-Control": "no-store", "ETag": '"v1"'}))
+        self.assertIsNone(self.cache.store("http://localhost/b/", "body", {}))
+        self.assertIsNone(self.cache.get("http://localhost/a/"))
+        self.assertIsNone(self.cache.get("http://localhost/b/"))
+
+    def test_revalidation_extends_freshness_and_survives_reopening(self):
+        entry = self.cache.store("http://localhost/a/", "body", {"ETag": '"v1"'})
+        self.cache.revalidated(entry, {"Cache-Control": "max-age=60", "ETag": '"v2"'})
+        entry = ResponseCache(self.directory.name).get("http://localhost/a/")
+        self.assertTrue(entry.is_fresh())
+        self.assertEqual(entry.etag, '"v2"')
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(self.directory.name, max_bytes=10)
+        cache.store("http://localhost/a/", "aaaa", {"ETag": "a"})
+        cache.store("http://localhost/b/", "bbbb", {"ETag": "b"})
+        cache.get("http://localhost/a/")
+        cache.store("http://localhost/c/", "cccc", {"ETag": "c"})
+        self.assertIsNotNone(cache.get("http://localhost/a/"))
+        self.assertIsNone(cache.get("http://localhost/b/"))
+        self.assertIsNotNone(cache.get("http://localhost/c/"))
+
+    def test_variants_are_cached_apart(self):
+        self.cache.store("http://localhost/a/", "whole", {"ETag": "a"})
+        self.cache.store("http://localhost/a/", "region", {"ETag": "a"}, variant="region=.letaky-grid")
+        self.assertEqual(self.cache.get("http://localhost/a/").body, "whole")
+        self.assertEqual(self.cache.get("http://localhost/a/", "region=.letaky-grid").body, "region")
+
+
+class FetcherRevalidationTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.requests = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            self.requests.append(request)
+            if request.headers.get("If-None-Match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"'})
+            return httpx.Response(200, text="page", headers={"ETag": '"v1"'})
+
+        self.fetcher = Fetcher(
+            logger=logging.getLogger("test"),
+            cache=ResponseCache(self.directory.name),
+            retry_policy=RetryPolicy(max_retries=0),
+        )
+        self.fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def asyncTearDown(self):
+        await self.fetcher.close()
+        self.directory.cleanup()
+
+    async def test_not_modified_is_served_from_cache(self):
+        self.assertEqual(await self.fetcher.fetch("http://localhost/a/"), "page")
+        self.assertEqual(await self.fetcher.fetch("http://localhost/a/"), "page")
+        self.assertEqual(len(self.requests), 2)
+        self.assertNotIn("If-None-Match", self.requests[0].headers)
+        self.assertEqual(self.requests[1].headers["If-None-Match"], '"v1"')
@@ -0,0 +1,37 @@
+import logging
+import math
+import unittest
+from datetime import datetime
+from types import SimpleNamespace
+from models.flyer_data import FlyerData
+from parsers.controllers.crawl_scheduler import CrawlScheduler
+
+HOUR = 3600
+# Noon of 2025-01-10 in local time; a flyer valid to 2025-01-10 expires 12 hours later.
+NOW = datetime(2025, 1, 10, 12).timestamp()
+
+
+def make_flyer(valid_to: str) -> FlyerData:
+    return FlyerData("Flyer", "", "Kaufland", "2025-01-01", valid_to)
+
+
+class RecrawlIntervalTest(unittest.TestCase):
+    def setUp(self):
+        controller = SimpleNamespace(logger=logging.getLogger("test"))
+        self.scheduler = CrawlScheduler(controller, "flyers.json", min_interval=HOUR, max_interval=48 * HOUR)
+
+    def test_shop_without_dates_uses_the_geometric_mean(self):
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("")], NOW), math.sqrt(HOUR * 48 * HOUR))
+
+    def test_recent_expiry_is_polled_at_the_minimum(self):
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("2025-01-09"), make_flyer("2025-02-01")], NOW), HOUR)
+
+    def test_long_expired_flyers_are_polled_at_the_maximum(self):
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("2024-12-01")], NOW), 48 * HOUR)
+
+    def test_upcoming_expiry_halves_the_remaining_time(self):
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("2025-01-11"), make_flyer("2025-01-20")], NOW), 18 * HOUR)
+
+    def test_interval_is_clamped(self):
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("2025-01-10")], NOW + 11 * HOUR), HOUR)
+        self.assertEqual(self.scheduler.recrawl_interval([make_flyer("2025-03-01")], NOW), 48 * HOUR)
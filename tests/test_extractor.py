@@ -0,0 +1,30 @@
+import unittest
+from datetime import date
+from selectolax.parser import HTMLParser
+from benchmarks.synthetic import generate_detail_page
+from extractors.extractor import FlyerDataExtractor
+
+
+class FlyerDataExtractorTest(unittest.TestCase):
+    def test_date_range_within_year(self):
+        self.assertEqual(
+            FlyerDataExtractor()._parse_dates("17.07. - 26.07.2025"),
+            ("2025-07-17T00:00:00", "2025-07-26T00:00:00")
+        )
+
+    def test_date_range_across_year_boundary(self):
+        self.assertEqual(
+            FlyerDataExtractor()._parse_dates("28.12. - 03.01.2025"),
+            ("2024-12-28T00:00:00", "2025-01-03T00:00:00")
+        )
+
+    def test_extract_grid_matches_extract(self):
+        grid = HTMLParser(generate_detail_page(50)).css_first(".letaky-grid")
+        for valid_on in (None, date(2025, 6, 1)):
+            extractor = FlyerDataExtractor(valid_on=valid_on)
+            expected = extractor.extract(grid.css(".brochure-thumb"), "Kaufland")
+            flyers = extractor.extract_grid(grid, "Kaufland")
+            self.assertEqual(
+                [(f.title, f.thumbnail, f.valid_from, f.valid_to) for f in flyers],
+                [(f.title, f.thumbnail, f.valid_from, f.valid_to) for f in expected]
+            )
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from storage.flyer_store import FlyerStore
+
+
+def make_record(shop_name: str, title: str, valid_to: str = "2025-12-31") -> dict:
+    return {
+        "title": title, "thumbnail": "", "shop_name": shop_name,
+        "valid_from": "2025-01-01", "valid_to": valid_to, "parsed_time": "",
+    }
+
+
+class FlyerStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.store = FlyerStore(self.directory.name, block_max_flyers=2)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_run(self, *records) -> int:
+        run = self.store.begin_run()
+        for record in records:
+            run.append(record)
+        return run.commit()
+
+    def titles(self, **kwargs) -> list[str]:
+        return [flyer.title for flyer in FlyerStore(self.directory.name).read(**kwargs)]
+
+    def test_read_by_shop_and_run(self):
+        first = self.write_run(make_record("A", "a1"), make_record("A", "a2"), make_record("A", "a3"), make_record("B", "b1"))
+        second = self.write_run(make_record("A", "a4"))
+        self.assertEqual(self.titles(), ["a1", "a2", "a3", "b1", "a4"])
+        self.assertEqual(self.titles(shop_name="A"), ["a1", "a2", "a3", "a4"])
+        self.assertEqual(self.titles(run_id=first), ["a1", "a2", "a3", "b1"])
+        self.assertEqual(self.titles(shop_name="A", run_id=second), ["a4"])
+        self.assertEqual(self.titles(shop_name="C"), [])
+
+    def test_aborted_run_is_invisible(self):
+        self.write_run(make_record("A", "a1"))
+        run = self.store.begin_run()
+        run.append(make_record("A", "aborted"))
+        run.abort()
+        store = FlyerStore(self.directory.name)
+        self.assertEqual(self.titles(), ["a1"])
+        self.assertEqual(len(store.runs()), 1)
+
+    def test_compact_drops_expired_flyers_and_empty_runs(self):
+        expired_run = self.write_run(make_record("A", "old", "2025-01-31"))
+        live_run = self.write_run(make_record("A", "old2", "2025-01-31"), make_record("A", "new"))
+        run = self.store.begin_run()
+        run.append(make_record("A", "aborted"))
+        run.abort()
+        self.assertEqual(self.store.compact(date(2025, 6, 1)), 2)
+        store = FlyerStore(self.directory.name)
+        self.assertEqual(self.titles(), ["new"])
+        self.assertEqual([run["id"] for run in store.runs()], [live_run])
+        self.assertGreater(store.begin_run().run_id, max(expired_run, live_run))
+        self.assertEqual(len([name for name in os.listdir(self.directory.name) if name.endswith(".dat")]), 1)
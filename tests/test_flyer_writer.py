@@ -0,0 +1,42 @@
+import os
+import tempfile
+import unittest
+from models.flyer_data import FlyerData
+from writers.flyer_reader import read_flyers
+from writers.flyer_writer import get_writer
+
+
+def make_flyer(title: str) -> FlyerData:
+    return FlyerData(title, "http://localhost/thumb.jpg", "Kaufland", "2025-01-01", "2025-01-31", "2025-01-01T00:00:00")
+
+
+class FlyerWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_output_is_published_on_close(self):
+        for output_format, compress in (("json", False), ("ndjson", True), ("csv", False)):
+            with self.subTest(output_format=output_format, compress=compress):
+                path = os.path.join(self.directory.name, f"flyers.{output_format}")
+                with get_writer(output_format, path, compress=compress) as writer:
+                    writer.write_many([make_flyer("a"), make_flyer("b")])
+                    self.assertTrue(os.path.exists(writer.get_output_path() + ".part"))
+                    self.assertFalse(os.path.exists(writer.get_output_path()))
+                self.assertFalse(os.path.exists(writer.get_output_path() + ".part"))
+                self.assertEqual(writer.get_written(), 2)
+                flyers = list(read_flyers(writer.get_output_path()))
+                self.assertEqual(flyers, [make_flyer("a"), make_flyer("b")])
+
+    def test_failed_run_keeps_the_previous_output(self):
+        path = os.path.join(self.directory.name, "flyers.json")
+        with get_writer("json", path) as writer:
+            writer.write(make_flyer("old"))
+        with self.assertRaises(RuntimeError):
+            with get_writer("json", path) as writer:
+                writer.write(make_flyer("new"))
+                raise RuntimeError("crawl failed")
+        self.assertTrue(os.path.exists(path + ".part"))
+        self.assertEqual([flyer.title for flyer in read_flyers(path)], ["old"])
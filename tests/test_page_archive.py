@@ -0,0 +1,45 @@
+import os
+import tempfile
+import unittest
+from storage.page_archive import PageArchive
+
+
+class PageArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "crawl.ndjson.gz")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, *pages):
+        with PageArchive(self.path) as archive:
+            archive.write_meta("http://localhost/", ["hypermarkte/"])
+            for url, body in pages:
+                archive.record(url, body)
+
+    def test_index_locates_latest_version(self):
+        self.record(("http://localhost/a/", "old"), ("http://localhost/b/", "b"))
+        self.record(("http://localhost/a/", "new"))
+        archive = PageArchive(self.path)
+        meta, locations = archive.index()
+        self.assertEqual(meta["categories"], ["hypermarkte/"])
+        self.assertEqual(archive.read_body(locations["http://localhost/a/"]), "new")
+        self.assertEqual(archive.read_body(locations["http://localhost/b/"]), "b")
+
+    def test_missing_index_is_rebuilt_by_scanning(self):
+        self.record(("http://localhost/a/", "a"))
+        _, indexed = PageArchive(self.path).index()
+        os.remove(self.path + ".idx")
+        _, scanned = PageArchive(self.path).index()
+        self.assertEqual(scanned, indexed)
+
+    def test_torn_tail_is_cut_off_before_appending(self):
+        self.record(("http://localhost/a/", "a"))
+        with open(self.path, "ab") as archive_file:
+            archive_file.write(b"\x1f\x8b\x08\x00torn")
+        self.record(("http://localhost/b/", "b"))
+        archive = PageArchive(self.path)
+        _, locations = archive.index()
+        self.assertEqual(archive.read_body(locations["http://localhost/b/"]), "b")
+        self.assertEqual(len(list(archive.iter_records())), 4)
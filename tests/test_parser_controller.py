@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import unittest
+import httpx
+from benchmarks.synthetic import generate_detail_page
+from parsers.controllers.parser_controller import ParserController
+
+
+class StaticFetcher:
+    """
+    Serves the same detail page for every URL.
+    """
+
+    def __init__(self, html: str, max_concurrency: int = 2, invalid_urls: set[str] = ()):
+        self.html = html
+        self.max_concurrency = max_concurrency
+        self.invalid_urls = invalid_urls
+
+    def get_max_concurrency(self) -> int:
+        return self.max_concurrency
+
+    async def fetch(self, url: str, region=None) -> str:
+        await asyncio.sleep(0)
+        if url in self.invalid_urls:
+            raise httpx.InvalidURL(f"Invalid URL {url}")
+        return self.html
+
+    async def close(self):
+        pass
+
+
+class FailingImageDownloader:
+    """
+    Fails every download like an unwritable image store.
+    """
+
+    async def download_flyers(self, flyers):
+        raise OSError("No space left on device")
+
+
+class ParserControllerTest(unittest.IsolatedAsyncioTestCase):
+    def make_controller(self, invalid_urls: set[str] = (), **kwargs) -> ParserController:
+        return ParserController(
+            base_url="http://localhost/",
+            logger=logging.getLogger("test"),
+            fetcher=StaticFetcher(generate_detail_page(3), invalid_urls=invalid_urls),
+            parse_concurrency=2,
+            **kwargs
+        )
+
+    async def test_failing_page_does_not_stall_crawl(self):
+        controller = self.make_controller(image_downloader=FailingImageDownloader())
+        links = {f"http://localhost/shop-{index}/": f"shop {index}" for index in range(5)}
+        with self.assertLogs("test", level="ERROR"):
+            results = await asyncio.wait_for(controller.crawl_shops(links), timeout=10)
+        self.assertEqual(results, dict.fromkeys(links))
+
+    async def test_failing_fetch_does_not_drop_other_shops(self):
+        links = {f"http://localhost/shop-{index}/": f"shop {index}" for index in range(6)}
+        controller = self.make_controller(invalid_urls={"http://localhost/shop-1/"}, max_inflight_bytes=1024 * 1024)
+        with self.assertLogs("test", level="ERROR"):
+            results = await asyncio.wait_for(controller.crawl_shops(links), timeout=10)
+        self.assertIsNone(results["http://localhost/shop-1/"])
+        self.assertEqual(sum(len(flyers or []) for flyers in results.values()), 5 * 3)
+
+    async def test_dead_worker_error_is_raised(self):
+        controller = self.make_controller()
+
+        async def produce_malformed_page(links, page_queue, budget=None):
+            await page_queue.put(("shop", "http://localhost/shop/"))
+            await page_queue.put(None)
+
+        controller._produce_detail_pages = produce_malformed_page
+        with self.assertRaises(ValueError):
+            await asyncio.wait_for(controller.crawl_shops({"http://localhost/shop/": "shop"}), timeout=10)
+
+    async def test_shops_sharing_a_name_are_all_crawled(self):
+        controller = self.make_controller()
+        links = {"http://localhost/lidl-1/": "Lidl", "http://localhost/lidl-2/": "Lidl"}
+        results = await asyncio.wait_for(controller.crawl_shops(links), timeout=10)
+        self.assertEqual(list(results), list(links))
+        self.assertEqual([len(flyers) for flyers in results.values()], [3, 3])
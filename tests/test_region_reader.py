@@ -0,0 +1,65 @@
+import logging
+import tempfile
+import unittest
+import httpx
+from fetchers.cache import ResponseCache
+from fetchers.fetcher import Fetcher
+from fetchers.region_reader import RegionReader
+from fetchers.retry import RetryPolicy
+
+PAGE = (
+    '<html><body><!-- <div class="letaky-grid"> --><script>"<div class=letaky-grid>"</script>'
+    '<div class="row letaky-grid"><div class="brochure-thumb"><div></div></div></div>'
+    '<footer>end</footer></body></html>'
+)
+REGION = '<div class="row letaky-grid"><div class="brochure-thumb"><div></div></div></div>'
+
+
+class RegionReaderTest(unittest.TestCase):
+    def feed(self, reader: RegionReader, text: str, chunk_size: int) -> bool:
+        for position in range(0, len(text), chunk_size):
+            if reader.feed(text[position:position + chunk_size]):
+                return True
+        return False
+
+    def test_region_is_complete_at_its_closing_tag(self):
+        for chunk_size in (1, 7, len(PAGE)):
+            reader = RegionReader(".letaky-grid")
+            self.assertTrue(self.feed(reader, PAGE, chunk_size))
+            self.assertEqual(reader.get_text(), REGION)
+
+    def test_truncated_region_is_returned_up_to_the_cut(self):
+        cut = PAGE.index("</div></div></div>")
+        reader = RegionReader(".letaky-grid")
+        self.assertFalse(self.feed(reader, PAGE[:cut], 5))
+        self.assertFalse(reader.is_complete())
+        self.assertEqual(reader.get_text(), REGION[:REGION.index("</div></div></div>")])
+
+    def test_document_without_region_is_returned_whole(self):
+        reader = RegionReader("#sidebar")
+        self.assertFalse(self.feed(reader, PAGE, 10))
+        self.assertEqual(reader.get_text(), PAGE)
+
+    def test_unsupported_selector_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RegionReader("div.letaky-grid")
+
+
+class FetcherTruncationTest(unittest.IsolatedAsyncioTestCase):
+    async def test_truncated_body_is_returned_but_not_cached(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ResponseCache(directory)
+            fetcher = Fetcher(
+                logger=logging.getLogger("test"),
+                cache=cache,
+                retry_policy=RetryPolicy(max_retries=0),
+                max_response_bytes=20,
+            )
+            fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, text=PAGE, headers={"Cache-Control": "max-age=60"})
+            ))
+            with self.assertLogs("test", level="WARNING"):
+                text = await fetcher.fetch("http://localhost/a/")
+            await fetcher.close()
+            self.assertEqual(text, PAGE[:20])
+            self.assertIsNone(cache.get("http://localhost/a/", "max_bytes=20"))
@@ -0,0 +1,118 @@
+import logging
+import unittest
+from unittest import mock
+import httpx
+from fetchers.fetcher import Fetcher
+from fetchers.retry import CircuitBreaker, RetryPolicy
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_backoff_grows_exponentially_up_to_the_cap(self):
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=3.0, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(5)], [0.5, 1.0, 2.0, 3.0, 3.0])
+
+    def test_jitter_stays_below_the_backoff(self):
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=30.0)
+        for attempt in range(4):
+            self.assertTrue(0 <= policy.get_delay(attempt) <= 2 ** attempt)
+
+    def test_retry_after_overrides_backoff_within_the_cap(self):
+        policy = RetryPolicy(backoff_base=0.5, backoff_max=10.0, jitter=False)
+        self.assertEqual(policy.get_delay(0, "4"), 4.0)
+        self.assertEqual(policy.get_delay(0, "120"), 10.0)
+        self.assertEqual(policy.get_delay(1, "soon"), 1.0)
+
+    def test_retryable_statuses(self):
+        policy = RetryPolicy()
+        self.assertTrue(policy.is_retryable_status(503))
+        self.assertFalse(policy.is_retryable_status(404))
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    URL = "http://localhost/shop/"
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure(self.URL)
+        self.assertTrue(breaker.allow(self.URL))
+        breaker.record_failure(self.URL)
+        self.assertFalse(breaker.allow(self.URL))
+        self.assertTrue(breaker.allow("http://other-host/"))
+
+    def test_success_resets_the_failure_count(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        breaker.record_failure(self.URL)
+        breaker.record_success(self.URL)
+        breaker.record_failure(self.URL)
+        self.assertFalse(breaker.is_open(self.URL))
+
+    def test_half_open_allows_a_single_trial(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        with mock.patch("fetchers.retry.time.monotonic", return_value=0.0):
+            breaker.record_failure(self.URL)
+        with mock.patch("fetchers.retry.time.monotonic", return_value=61.0):
+            self.assertTrue(breaker.allow(self.URL))
+            self.assertFalse(breaker.allow(self.URL))
+            breaker.record_failure(self.URL)
+            self.assertFalse(breaker.allow(self.URL))
+        with mock.patch("fetchers.retry.time.monotonic", return_value=122.0):
+            self.assertTrue(breaker.allow(self.URL))
+            breaker.record_success(self.URL)
+            self.assertFalse(breaker.is_open(self.URL))
+
+    def test_released_trial_can_be_retried(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        with mock.patch("fetchers.retry.time.monotonic", return_value=0.0):
+            breaker.record_failure(self.URL)
+        with mock.patch("fetchers.retry.time.monotonic", return_value=61.0):
+            self.assertTrue(breaker.allow(self.URL))
+            breaker.release_trial(self.URL)
+            self.assertTrue(breaker.is_open(self.URL))
+            self.assertTrue(breaker.allow(self.URL))
+
+
+class FetcherRetryTest(unittest.IsolatedAsyncioTestCase):
+    def make_fetcher(self, statuses: list[int], **kwargs) -> Fetcher:
+        self.requests = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = statuses[min(self.requests, len(statuses) - 1)]
+            self.requests += 1
+            return httpx.Response(status, text="page" if status == 200 else "", headers={"Retry-After": "0"})
+
+        fetcher = Fetcher(logger=logging.getLogger("test"), **kwargs)
+        fetcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return fetcher
+
+    async def test_retryable_status_is_retried(self):
+        fetcher = self.make_fetcher([503, 503, 200], retry_policy=RetryPolicy(max_retries=3))
+        with self.assertLogs("test", level="WARNING"):
+            self.assertEqual(await fetcher.fetch("http://localhost/a/"), "page")
+        self.assertEqual(self.requests, 3)
+        await fetcher.close()
+
+    async def test_gives_up_after_max_retries(self):
+        fetcher = self.make_fetcher([503], retry_policy=RetryPolicy(max_retries=2))
+        with self.assertLogs("test", level="ERROR"):
+            self.assertEqual(await fetcher.fetch("http://localhost/a/"), "")
+        self.assertEqual(self.requests, 3)
+        await fetcher.close()
+
+    async def test_client_error_is_not_retried(self):
+        fetcher = self.make_fetcher([404], retry_policy=RetryPolicy(max_retries=3))
+        with self.assertLogs("test", level="ERROR"):
+            self.assertEqual(await fetcher.fetch("http://localhost/a/"), "")
+        self.assertEqual(self.requests, 1)
+        await fetcher.close()
+
+    async def test_open_circuit_fails_fast(self):
+        fetcher = self.make_fetcher(
+            [503],
+            retry_policy=RetryPolicy(max_retries=0),
+            circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60),
+        )
+        with self.assertLogs("test", level="ERROR"):
+            for _ in range(4):
+                self.assertEqual(await fetcher.fetch("http://localhost/a/"), "")
+        self.assertEqual(self.requests, 2)
+        await fetcher.close()
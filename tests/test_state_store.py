@@ -0,0 +1,71 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from models.flyer_data import FlyerData
+from storage.state_store import StateStore
+
+
+def make_flyer(title: str, valid_to: str = "2099-01-31") -> FlyerData:
+    return FlyerData(title, "", "Kaufland", "2025-01-01", valid_to)
+
+
+class StateStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state.sqlite3")
+        self.store = StateStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def reopen(self) -> StateStore:
+        self.store.close()
+        self.store = StateStore(self.path)
+        return self.store
+
+    def test_committed_flyers_are_not_new_again(self):
+        flyers = self.store.filter_new_flyers([make_flyer("a"), make_flyer("a"), make_flyer("b")])
+        self.assertEqual([flyer.title for flyer in flyers], ["a", "b"])
+        self.store.record_flyers(flyers)
+        self.store.commit()
+        store = self.reopen()
+        self.assertEqual([flyer.title for flyer in store.filter_new_flyers([make_flyer("a"), make_flyer("c")])], ["c"])
+
+    def test_rollback_discards_staged_changes(self):
+        content_hash = StateStore.content_hash("<html></html>")
+        self.store.record_flyers(self.store.filter_new_flyers([make_flyer("a")]))
+        self.store.record_page("http://localhost/a/", content_hash)
+        self.assertTrue(self.store.is_page_unchanged("http://localhost/a/", content_hash))
+        self.store.rollback()
+        self.assertFalse(self.store.is_page_unchanged("http://localhost/a/", content_hash))
+        self.assertEqual(len(self.store.filter_new_flyers([make_flyer("a")])), 1)
+
+    def test_uncommitted_changes_are_lost_on_reopen(self):
+        self.store.record_page("http://localhost/a/", "hash")
+        store = self.reopen()
+        self.assertFalse(store.is_page_unchanged("http://localhost/a/", "hash"))
+
+    def test_changed_page_is_detected(self):
+        self.store.record_page("http://localhost/a/", "old")
+        self.store.commit()
+        self.assertTrue(self.store.is_page_unchanged("http://localhost/a/", "old"))
+        self.assertFalse(self.store.is_page_unchanged("http://localhost/a/", "new"))
+
+    def test_expired_flyers_are_reported_once_after_commit(self):
+        self.store.record_flyers([make_flyer("a", "2099-01-31"), make_flyer("b", "2099-03-31")])
+        self.store.commit()
+        self.assertEqual(self.store.pop_expired_flyers(date(2099, 1, 15)), [])
+        expired = self.store.pop_expired_flyers(date(2099, 2, 15))
+        self.assertEqual([(flyer.title, flyer.expired) for flyer in expired], [("a", True)])
+        self.assertEqual(self.store.pop_expired_flyers(date(2099, 2, 15)), [])
+        self.store.rollback()
+        self.assertEqual(len(self.store.pop_expired_flyers(date(2099, 2, 15))), 1)
+        self.store.commit()
+        self.assertEqual(self.reopen().pop_expired_flyers(date(2099, 2, 15)), [])
+
+    def test_flyer_expired_when_first_seen_is_not_reported_as_expired(self):
+        self.store.record_flyers([make_flyer("a", "2000-01-31")])
+        self.store.commit()
+        self.assertEqual(self.store.pop_expired_flyers(), [])
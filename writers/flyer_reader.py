@@ -0,0 +1,94 @@
+import csv
+import gzip
+import json
+from typing import IO, Iterator
+from models.flyer_data import FlyerData, FLYER_FIELDS
+
+
+def detect_format(path: str) -> str:
+    """
+    Detects the format of an output file from its extension.
+
+    Args:
+        path (str): Path of the output file, optionally ending with ".gz".
+
+    Returns:
+        str: "json", "ndjson" or "csv".
+
+    Raises:
+        ValueError: If the extension belongs to no known format.
+    """
+    name = path.removesuffix(".gz")
+    for output_format in ("ndjson", "json", "csv"):
+        if name.endswith("." + output_format):
+            return output_format
+    if name.endswith(".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Unknown output format of {path}")
+
+
+def open_output(path: str) -> IO:
+    """
+    Opens an output file written by a FlyerWriter for reading, decompressing ".gz" files.
+
+    Args:
+        path (str): Path of the output file.
+
+    Returns:
+        IO: The file opened in text mode.
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="UTF-8", newline="")
+    return open(path, encoding="UTF-8", newline="")
+
+
+def read_flyers(path: str) -> Iterator[FlyerData]:
+    """
+    Reads the flyers of an output file written by a FlyerWriter (JSON, NDJSON or CSV, optionally gzipped).
+
+    JSON arrays are loaded at once, NDJSON and CSV files are streamed line by line.
+
+    Args:
+        path (str): Path of the output file.
+
+    Yields:
+        FlyerData: The flyers in file order.
+
+    Raises:
+        ValueError: If the file is not a flyer output (e.g. a JSON file whose top level is not an array of flyer objects).
+    """
+    output_format = detect_format(path)
+    with open_output(path) as output_file:
+        if output_format == "json":
+            records = json.load(output_file)
+            if not isinstance(records, list):
+                raise ValueError(f"{path} does not contain a JSON array of flyers")
+            for record in records:
+                yield flyer_from_dict(record)
+        elif output_format == "ndjson":
+            for line in output_file:
+                if line.strip():
+                    yield flyer_from_dict(json.loads(line))
+        else:
+            for row in csv.DictReader(output_file):
+                row["categories"] = row["categories"].split(";") if row.get("categories") else []
+                row["expired"] = row.get("expired") == "True"
+                yield flyer_from_dict(row)
+
+
+def flyer_from_dict(record: dict) -> FlyerData:
+    """
+    Builds a FlyerData from a serialized record, ignoring unknown fields.
+
+    Args:
+        record (dict): The flyer's field values keyed by field name.
+
+    Returns:
+        FlyerData: The flyer.
+
+    Raises:
+        ValueError: If the record is not a dictionary.
+    """
+    if not isinstance(record, dict):
+        raise ValueError(f"Flyer record must be an object, got {type(record).__name__}")
+    return FlyerData(**{name: value for name, value in record.items() if name in FLYER_FIELDS})
@@ -0,0 +1,319 @@
+import os
+import csv
+import gzip
+import json
+import time
+from abc import ABC, abstractmethod
+from typing import IO, Iterable
+from models.flyer_data import FlyerData, FLYER_FIELDS
+from models.flyer_batch import FlyerBatch
+from storage.flyer_store import FlyerStore, StoreRun
+
+
+class FlyerWriter(ABC):
+    """
+    An abstract base class for incremental, atomically published flyer output files.
+
+    Flyers are appended to a temporary `<output_path>.part` file as they are produced and
+    the file is flushed periodically, so downstream consumers can tail it during the crawl.
+    Closing the writer renames the part file to `output_path` in one atomic step. If the
+    run fails, the part file with everything written so far is kept and `output_path` is
+    left untouched.
+
+    Attributes:
+        extension (str): Default file extension of the format.
+        _output_path (str): The final path of the output file.
+        _part_path (str): The path of the temporary file being written.
+        _compress (bool): Whether the output is gzip compressed.
+        _flush_every (int): Number of flyers after which the file is flushed.
+        _flush_interval (float): Seconds after which the file is flushed.
+        _file (IO): The open output file (None if not opened).
+        _written (int): Number of flyers written so far.
+
+    Methods:
+        open():
+            Opens the part file and writes the format header.
+
+        write(flyer: FlyerData):
+            Appends a single flyer.
+
+        write_many(flyers: Iterable[FlyerData]):
+            Appends several flyers.
+
+        write_batch(batch: FlyerBatch):
+            Appends all flyers of a columnar batch without materializing FlyerData objects.
+
+        close():
+            Writes the format footer and atomically publishes the file.
+
+        abort():
+            Closes the part file without publishing it.
+    """
+
+    extension = ""
+
+    def __init__(self, output_path: str, compress: bool = False, flush_every: int = 100, flush_interval: float = 1.0):
+        """
+        Initializes the FlyerWriter.
+
+        Args:
+            output_path (str): The path of the output file. ".gz" is appended when compressing and missing.
+            compress (bool, optional): Gzip-compresses the output. Defaults to False.
+            flush_every (int, optional): Number of flyers after which the file is flushed. Defaults to 100.
+            flush_interval (float, optional): Seconds after which the file is flushed. Defaults to 1.
+        """
+        if compress and not output_path.endswith(".gz"):
+            output_path += ".gz"
+        self._output_path = output_path
+        self._part_path = output_path + ".part"
+        self._compress = compress
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._file = None
+        self._written = 0
+        self._last_flush = 0.0
+
+    def __enter__(self) -> "FlyerWriter":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def get_output_path(self) -> str:
+        """
+        Retrieves the final path of the output file.
+
+        Returns:
+            str: The output path (including the ".gz" suffix when compressing).
+        """
+        return self._output_path
+
+    def get_written(self) -> int:
+        """
+        Retrieves the number of flyers written so far.
+
+        Returns:
+            int: The number of written flyers.
+        """
+        return self._written
+
+    def open(self):
+        """
+        Opens the part file and writes the format header.
+        """
+        directory = os.path.dirname(self._output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if self._compress:
+            self._file = gzip.open(self._part_path, "wt", encoding="UTF-8", newline="")
+        else:
+            self._file = open(self._part_path, "w", encoding="UTF-8", newline="")
+        self._last_flush = time.monotonic()
+        self._write_header(self._file)
+
+    def write(self, flyer: FlyerData):
+        """
+        Appends a single flyer, flushing the file periodically.
+
+        Args:
+            flyer (FlyerData): The flyer to write.
+        """
+        self._write_dict(flyer.to_dict())
+
+    def write_batch(self, batch: FlyerBatch):
+        """
+        Appends all flyers of a columnar batch without materializing FlyerData objects.
+
+        Args:
+            batch (FlyerBatch): The batch to write.
+        """
+        for record in batch.iter_dicts():
+            self._write_dict(record)
+
+    def _write_dict(self, record: dict):
+        self._write_record(self._file, record)
+        self._count_written()
+
+    def _count_written(self):
+        """
+        Counts a written flyer and flushes the file every `flush_every` flyers or `flush_interval` seconds.
+        """
+        self._written += 1
+        if self._written % self._flush_every == 0 or time.monotonic() - self._last_flush >= self._flush_interval:
+            self.flush()
+
+    def write_many(self, flyers: Iterable[FlyerData]):
+        """
+        Appends several flyers.
+
+        Args:
+            flyers (Iterable[FlyerData]): The flyers to write.
+        """
+        for flyer in flyers:
+            self.write(flyer)
+
+    def flush(self):
+        """
+        Flushes the buffered output to disk.
+        """
+        self._file.flush()
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        """
+        Writes the format footer, closes the part file and atomically renames it to the output path.
+        """
+        self._write_footer(self._file)
+        self._file.close()
+        self._file = None
+        os.replace(self._part_path, self._output_path)
+
+    def abort(self):
+        """
+        Closes the part file without publishing it, keeping the partial output for inspection.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_header(self, output_file: IO):
+        pass
+
+    def _write_footer(self, output_file: IO):
+        pass
+
+    @abstractmethod
+    def _write_record(self, output_file: IO, record: dict):
+        """
+        Serializes a single flyer into the output file.
+
+        Args:
+            output_file (IO): The open output file.
+            record (dict): The flyer's field values keyed by field name.
+        """
+        pass
+
+
+class JSONWriter(FlyerWriter):
+    """
+    Writes flyers as a single JSON array, streaming one element at a time.
+    """
+
+    extension = ".json"
+
+    def _write_header(self, output_file: IO):
+        output_file.write("[")
+
+    def _write_record(self, output_file: IO, record: dict):
+        if self._written:
+            output_file.write(", ")
+        output_file.write(json.dumps(record))
+
+    def _write_footer(self, output_file: IO):
+        output_file.write("]")
+
+
+class NDJSONWriter(FlyerWriter):
+    """
+    Writes flyers as newline-delimited JSON, one object per line.
+    """
+
+    extension = ".ndjson"
+
+    def _write_record(self, output_file: IO, record: dict):
+        output_file.write(json.dumps(record))
+        output_file.write("\n")
+
+
+class CSVWriter(FlyerWriter):
+    """
+    Writes flyers as CSV with a header row of the FlyerData field names.
+    """
+
+    extension = ".csv"
+
+    def _write_header(self, output_file: IO):
+        self._csv_writer = csv.writer(output_file)
+        self._csv_writer.writerow(FLYER_FIELDS)
+
+    def write_batch(self, batch: FlyerBatch):
+        for row in batch.iter_rows():
+            self._write_row(row)
+
+    def _write_record(self, output_file: IO, record: dict):
+        self._csv_writer.writerow(self._format_row(record.values()))
+
+    def _write_row(self, row: tuple):
+        self._csv_writer.writerow(self._format_row(row))
+        self._count_written()
+
+    def _format_row(self, values: Iterable) -> list:
+        return [";".join(value) if isinstance(value, (list, tuple)) else value for value in values]
+
+
+class StoreWriter(FlyerWriter):
+    """
+    Appends the flyers as a new run of a FlyerStore, `output_path` being the store directory.
+
+    Earlier runs are kept. Blocks are always compressed, so `compress` is ignored; the run
+    becomes visible to readers when the writer is closed, an aborted run is never visible.
+    """
+
+    extension = ".store"
+
+    def __init__(self, output_path: str, compress: bool = False, **kwargs):
+        super().__init__(output_path, **kwargs)
+        self._run: StoreRun = None
+
+    def open(self):
+        self._run = FlyerStore(self._output_path).begin_run()
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._run.commit()
+        self._run = None
+
+    def abort(self):
+        if self._run is not None:
+            self._run.abort()
+            self._run = None
+
+    def _write_record(self, output_file: IO, record: dict):
+        self._run.append(record)
+
+
+WRITERS = {
+    "json": JSONWriter,
+    "ndjson": NDJSONWriter,
+    "csv": CSVWriter,
+    "store": StoreWriter,
+}
+
+
+def get_writer(output_format: str, output_path: str, compress: bool = False, **kwargs) -> FlyerWriter:
+    """
+    Creates the writer for an output format.
+
+    Args:
+        output_format (str): One of the keys of `WRITERS` ("json", "ndjson", "csv" or "store").
+        output_path (str): The path of the output file.
+        compress (bool, optional): Gzip-compresses the output. Defaults to False.
+        **kwargs: Further keyword arguments of the writer (e.g. `flush_every`).
+
+    Returns:
+        FlyerWriter: The writer instance (not opened yet).
+
+    Raises:
+        ValueError: If the output format is unknown.
+    """
+    try:
+        writer_class = WRITERS[output_format]
+    except KeyError:
+        raise ValueError(f"Unknown output format '{output_format}', expected one of {', '.join(WRITERS)}")
+    return writer_class(output_path, compress=compress, **kwargs)